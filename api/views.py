@@ -1,4 +1,9 @@
+import hmac
+
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
 from django.utils.translation import gettext_lazy as _
+from django.views import View
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -6,6 +11,8 @@ from rest_framework.reverse import reverse
 from rest_framework.permissions import AllowAny
 from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
 
+from core.instrumentation import render
+
 
 class RootAPIView(APIView):
     permission_classes = (AllowAny,)
@@ -34,6 +41,10 @@ class RootAPIView(APIView):
                                                       format=format, current_app='ews'),
                 'disaster': reverse('ews_api:disaster-list', request=request,
                                     format=format, current_app='ews'),
+                'summary': reverse('ews_api:summary-list', request=request,
+                                   format=format, current_app='ews'),
+                'export-disaster': reverse('ews_api:export-disaster', request=request,
+                                           format=format, current_app='ews'),
             },
             'contribution': {
                 'report': reverse('contribution_api:report-list', request=request,
@@ -50,3 +61,34 @@ class RootAPIView(APIView):
                                       format=format, current_app='generic'),
             },
         })
+
+
+class MetricsView(View):
+    """
+    Prometheus text exposition of scraping task timing and counter.
+    Only for staff or `Authorization: Bearer <INSTRUMENTATION_TOKEN>`,
+    open to all when `INSTRUMENTATION_PUBLIC` set.
+    """
+
+    def has_access(self, request):
+        if getattr(settings, 'INSTRUMENTATION_PUBLIC', False):
+            return True
+
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return True
+
+        token = getattr(settings, 'INSTRUMENTATION_TOKEN', None)
+        return bool(token) and hmac.compare_digest(
+            request.headers.get('Authorization', ''),
+            'Bearer %s' % token
+        )
+
+    def get(self, request, *args, **kwargs):
+        if not self.has_access(request):
+            return HttpResponseForbidden()
+
+        return HttpResponse(
+            render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8'
+        )
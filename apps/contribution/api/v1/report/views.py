@@ -15,6 +15,7 @@ from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.exceptions import NotFound, ValidationError
 
 from core.loading import build_pagination
+from apps.generic.search import search
 from apps.contribution.mixins.permissions import IsActivityCreatorOrReadOnly
 
 from .serializers import CreateReportSerializer, ListReportSerializer, RetrieveReportSerializer, UpdateReportSerializer
@@ -52,7 +53,8 @@ class ReportAPIViewSet(BaseViewSet):
     -----
 
         {
-            "identifier": "101"
+            "identifier": "101",
+            "q": "banjir bekasi" // search, ordered by rank
         }
     """
     lookup_field = 'uuid'
@@ -114,6 +116,10 @@ class ReportAPIViewSet(BaseViewSet):
         if identifier:
             queryset = queryset.filter(identifier=identifier)
 
+        q = request.query_params.get('q')
+        if q:
+            queryset = search(queryset, q)
+
         paginator = LimitOffsetPagination()
         paginate_queryset = paginator.paginate_queryset(queryset, request)
         serializer = ListReportSerializer(
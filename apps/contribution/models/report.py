@@ -6,6 +6,7 @@ from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 from core.models import AbstractCommonField
+from core.normalizer import clean_location
 from core.constant import ConfirmationReaction, DisasterIdentifier
 
 
@@ -129,8 +130,6 @@ class AbstractReport(AbstractCommonField):
 
 
 class AbstractReportLocation(AbstractCommonField):
-    REMOVE_WORDS = ['Desa', 'Kelurahan', 'Kecamatan', 'Kabupaten', 'Provinsi']
-
     report = models.OneToOneField(
         'contribution.Report',
         related_name='location',
@@ -248,17 +247,4 @@ class AbstractReportLocation(AbstractCommonField):
         super().save(*args, **kwargs)
 
     def clean_words(self):
-        for r in self.REMOVE_WORDS:
-            if self.administrative_area:
-                self.administrative_area = self.administrative_area \
-                    .replace(r, '').strip()
-
-            if self.sub_administrative_area:
-                self.sub_administrative_area = self.sub_administrative_area \
-                    .replace(r, '').strip()
-
-            if self.locality:
-                self.locality = self.locality.replace(r, '').strip()
-
-            if self.sub_locality:
-                self.sub_locality = self.sub_locality.replace(r, '').strip()
+        clean_location(self)
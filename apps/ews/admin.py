@@ -26,3 +26,21 @@ class DisasterExtend(BaseEntityAdmin):
 admin.site.register(Disaster, DisasterExtend)
 admin.site.register(DisasterVictim)
 admin.site.register(DisasterDamage)
+admin.site.register(Checkpoint)
+
+
+class WeatherForecastAdmin(admin.ModelAdmin):
+    list_display = ('area_name', 'domain', 'parameter', 'forecast_at', 'value', 'unit',)
+    list_filter = ('domain', 'parameter',)
+    search_fields = ('area_name', 'area_code',)
+
+
+admin.site.register(WeatherForecast, WeatherForecastAdmin)
+
+
+class PollDecisionAdmin(admin.ModelAdmin):
+    list_display = ('source', 'found', 'quiet', 'previous_interval', 'interval', 'reason', 'create_at',)
+    list_filter = ('source', 'reason',)
+
+
+admin.site.register(PollDecision, PollDecisionAdmin)
@@ -5,6 +5,7 @@ from rest_framework import serializers
 
 Disaster = apps.get_registered_model('ews', 'Disaster')
 DisasterLocation = apps.get_registered_model('ews', 'DisasterLocation')
+DisasterAttachment = apps.get_registered_model('ews', 'DisasterAttachment')
 
 
 class BaseDisasterLocationSerializer(serializers.ModelSerializer):
@@ -13,8 +14,17 @@ class BaseDisasterLocationSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 
+class BaseDisasterAttachmentSerializer(serializers.ModelSerializer):
+    # `thumbnail` and `preview` is WebP, empty until processed
+    class Meta:
+        model = DisasterAttachment
+        fields = ('uuid', 'identifier', 'name', 'caption', 'file',
+                  'filesize', 'filemime', 'thumbnail', 'preview',)
+
+
 class BaseDisasterSerializer(serializers.ModelSerializer):
     locations = BaseDisasterLocationSerializer(many=True)
+    attachments = BaseDisasterAttachmentSerializer(many=True, read_only=True)
     location_plain = serializers.ListField(read_only=True)
     comment_count = serializers.IntegerField(read_only=True)
     _links = serializers.SerializerMethodField()
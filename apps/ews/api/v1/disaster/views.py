@@ -10,6 +10,7 @@ from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.exceptions import NotFound
 
 from core.loading import build_pagination
+from apps.generic.search import search
 
 from .serializers import ListDisasterSerializer, RetrieveDisasterSerializer
 
@@ -34,7 +35,8 @@ class DisasterAPIViewSet(BaseViewSet):
         {
             "identifier": "101",
             "status": "preliminary",
-            "source": "bmkg"
+            "source": "bmkg",
+            "q": "banjir bekasi" // search, ordered by rank
         }
 
     """
@@ -47,13 +49,14 @@ class DisasterAPIViewSet(BaseViewSet):
         queryset = Disaster.objects.all()
         queryset = queryset \
             .annotate(comment_count=Count('comments', distinct=True)) \
-            .prefetch_related('locations', 'comments') \
+            .prefetch_related('locations', 'comments', 'attachments') \
             .order_by('-occur_at')
 
         return queryset
 
     def list(self, request, format=None):
-        queryset = self.get_queryset()
+        # same event from other source only shown once
+        queryset = self.get_queryset().filter(canonical__isnull=True)
 
         identifier = request.query_params.get('identifier')
         status = request.query_params.get('status')
@@ -63,13 +66,21 @@ class DisasterAPIViewSet(BaseViewSet):
             queryset = queryset.filter(identifier=identifier)
 
         if status:
-            queryset = queryset.filter(eav__disaster_status=status)
+            # preliminary already confirmed shown by their final event
+            queryset = queryset.filter(
+                eav__disaster_status=status,
+                superseded_by__isnull=True
+            )
         else:
             queryset = queryset.exclude(eav__disaster_status='preliminary')
 
         if source:
             queryset = queryset.filter(source__icontains=source)
 
+        q = request.query_params.get('q')
+        if q:
+            queryset = search(queryset, q)
+
         paginator = LimitOffsetPagination()
         paginate_queryset = paginator.paginate_queryset(queryset, request)
         serializer = ListDisasterSerializer(
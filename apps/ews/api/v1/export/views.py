@@ -0,0 +1,60 @@
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.throttling import UserRateThrottle
+from rest_framework.exceptions import ValidationError
+
+from apps.ews import export
+
+
+class DisasterExportAPIView(APIView):
+    """
+    Download all disaster history in one file.
+
+    Param;
+
+        {
+            "output": "parquet", // or arrow
+            "period_from": "2020-01-01",
+            "period_to": "2021-01-01" // exclusive
+        }
+
+    """
+    permission_classes = (IsAuthenticated,)
+    throttle_classes = (UserRateThrottle,)
+
+    def _date(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+
+        if date is None:
+            raise ValidationError({name: "Use YYYY-MM-DD format"})
+        return date
+
+    def get(self, request, format=None):
+        # `format` used by DRF to choose renderer
+        output = request.query_params.get('output', 'parquet')
+        if output not in export.FORMATS:
+            raise ValidationError({'output': "Choose %s" % ', '.join(export.FORMATS)})
+
+        start = self._date('period_from')
+        end = self._date('period_to')
+
+        response = StreamingHttpResponse(
+            export.stream(output, start=start, end=end),
+            content_type=export.CONTENT_TYPES[output]
+        )
+        response['Content-Disposition'] = 'attachment; filename="disasters-%s.%s"' % (
+            timezone.now().strftime('%Y%m%d%H%M%S'),
+            output
+        )
+        return response
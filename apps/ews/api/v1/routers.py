@@ -3,9 +3,12 @@ from rest_framework.routers import DefaultRouter
 
 from .scraper.views import BMKG_TEWS_Realtime_ScraperAPIView, BMKG_TEWS_Recent_ScraperAPIView, BMKG_TEWS_ScraperAPIView, BNPB_DIBI_ScraperAPIView
 from .disaster.views import DisasterAPIViewSet
+from .summary.views import SummaryAPIViewSet
+from .export.views import DisasterExportAPIView
 
 router = DefaultRouter(trailing_slash=True)
 router.register('disasters', DisasterAPIViewSet, basename='disaster')
+router.register('summaries', SummaryAPIViewSet, basename='summary')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -17,4 +20,6 @@ urlpatterns = [
          name='scraper-bmkg-tews-recent'),
     path('scraper/bmkg-tews-realtime/', BMKG_TEWS_Realtime_ScraperAPIView.as_view(),
          name='scraper-bmkg-tews-realtime'),
+    path('exports/disasters/', DisasterExportAPIView.as_view(),
+         name='export-disaster'),
 ]
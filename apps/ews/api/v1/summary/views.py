@@ -0,0 +1,85 @@
+from django.core.cache import cache
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
+
+from rest_framework import status as response_status
+from rest_framework.permissions import AllowAny
+from rest_framework.throttling import UserRateThrottle, AnonRateThrottle
+from rest_framework.response import Response
+from rest_framework.exceptions import ValidationError
+
+from apps.ews import summary
+from apps.ews.conf import settings
+
+from ..disaster.views import BaseViewSet
+
+GROUPS = ('month', 'year', 'total')
+
+
+class SummaryAPIViewSet(BaseViewSet):
+    """
+    GET
+    -----
+
+        {
+            "kind": "victim",
+            "area": "32",
+            "period_from": "2020-01-01",
+            "period_to": "2021-12-31",
+            "group": "year"
+        }
+
+    `kind` is victim or damage, empty `area` mean national total.
+    `group` is month (default), year or total.
+    """
+
+    permission_classes = (AllowAny,)
+    throttle_classes = (AnonRateThrottle, UserRateThrottle,)
+
+    def _date(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+
+        if date is None:
+            raise ValidationError({name: "Use YYYY-MM-DD format"})
+        return date
+
+    def list(self, request, format=None):
+        kind = request.query_params.get('kind', 'victim')
+        area = request.query_params.get('area', summary.NATIONAL)
+        group = request.query_params.get('group', 'month')
+
+        if kind not in summary.KINDS:
+            raise ValidationError({'kind': "Choose %s" % ', '.join(summary.KINDS)})
+
+        if group not in GROUPS:
+            raise ValidationError({'group': "Choose %s" % ', '.join(GROUPS)})
+
+        start = self._date('period_from')
+        end = self._date('period_to')
+        params = {
+            'kind': kind,
+            'area': area,
+            'period_from': start or '',
+            'period_to': end or '',
+            'group': group,
+        }
+
+        # version changed by each summary update, old key just expire
+        key = 'ews-summary:%s:%s' % (summary.get_version(), urlencode(params))
+        results = cache.get(key)
+
+        if results is None:
+            results = summary.totals(kind, area=area, start=start, end=end, group=group)
+            cache.set(key, results, settings.EWS_SUMMARY_CACHE_TIMEOUT)
+
+        return Response(
+            {**params, 'results': results},
+            status=response_status.HTTP_200_OK
+        )
@@ -4,5 +4,41 @@ from appconf import AppConf
 
 
 class EWSAppConf(AppConf):
+    # preliminary and final earthquake considered same event
+    # when all of this tolerance match
+    QUAKE_MATCH_WINDOW = 180  # seconds
+    QUAKE_MATCH_DISTANCE = 100  # kilometer
+    QUAKE_MATCH_MAGNITUDE = 1.0
+
+    # cross source deduplication
+    DEDUPE_THRESHOLD = 0.5
+    DEDUPE_DISTANCE = 150  # kilometer
+    DEDUPE_LOCATION_WEIGHT = 0.6
+    DEDUPE_BATCH_SIZE = 2000
+
+    # BMKG province weather forecast, url or local directory
+    FORECAST_SOURCE = 'https://data.bmkg.go.id/DataMKG/MEWS/DigitalForecast/'
+    FORECAST_BATCH_SIZE = 5000
+
+    # adaptive polling, interval in seconds
+    # shorten when run found new event, back off when unchanged
+    POLL_SOURCES = {
+        'bmkg-realtime': {'min': 60, 'max': 900, 'initial': 300},
+        'bmkg-tews-recent': {'min': 120, 'max': 1800, 'initial': 600},
+        'bmkg-tews-feel': {'min': 300, 'max': 3600, 'initial': 1200},
+        'bnpb-dipi': {'min': 3600, 'max': 43200, 'initial': 14400},
+    }
+    POLL_SPEEDUP = 0.25
+    POLL_BACKOFF = 1.5
+
+    # victim and damage total API, seconds
+    SUMMARY_CACHE_TIMEOUT = 3600
+
+    # shakemap WebP derivative, longest side in pixel
+    SHAKEMAP_SIZES = {'thumbnail': 320, 'preview': 1024}
+    SHAKEMAP_QUALITY = 80
+    # process pool of `build_shakemap_derivatives`, None mean cpu count
+    SHAKEMAP_WORKERS = None
+
     class Meta:
         perefix = 'ews'
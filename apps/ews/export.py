@@ -0,0 +1,260 @@
+"""
+Disaster history as Parquet or Arrow IPC stream for analytics.
+
+One row per disaster location (disaster without location get one row
+with empty location column), `eav` attributes pivoted to column.
+Read by keyset chunk of disaster id so memory bounded by `chunk_size`.
+"""
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ImproperlyConfigured
+from django.utils import timezone
+
+from eav.models import Attribute, Value
+
+from apps.ews.utils import get_attributes
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover
+    pa = pq = None
+
+Disaster = apps.get_registered_model('ews', 'Disaster')
+DisasterLocation = apps.get_registered_model('ews', 'DisasterLocation')
+
+FORMATS = ('parquet', 'arrow')
+CONTENT_TYPES = {
+    'parquet': 'application/vnd.apache.parquet',
+    'arrow': 'application/vnd.apache.arrow.stream',
+}
+
+DISASTER_FIELDS = (
+    'id', 'uuid', 'identifier', 'title', 'occur_at', 'source',
+    'canonical_id', 'superseded_by_id',
+)
+
+LOCATION_FIELDS = (
+    'id', 'severity', 'mmi_min', 'mmi_max', 'country_code',
+    'administrative_area', 'administrative_area_code',
+    'sub_administrative_area', 'sub_administrative_area_code',
+    'locality', 'locality_code', 'latitude', 'longitude',
+)
+
+# low cardinality, dictionary encoded
+CATEGORICAL = {
+    'identifier', 'source', 'country_code',
+    'administrative_area', 'administrative_area_code',
+    'sub_administrative_area', 'sub_administrative_area_code',
+}
+
+
+def _types():
+    timestamp = pa.timestamp('us', tz='UTC')
+    return {
+        'id': pa.int64(),
+        'uuid': pa.string(),
+        'title': pa.string(),
+        'occur_at': timestamp,
+        'canonical_id': pa.int64(),
+        'superseded_by_id': pa.int64(),
+        'location_id': pa.int64(),
+        'severity': pa.string(),
+        'mmi_min': pa.int16(),
+        'mmi_max': pa.int16(),
+        'locality': pa.string(),
+        'locality_code': pa.string(),
+        'latitude': pa.float64(),
+        'longitude': pa.float64(),
+        Attribute.TYPE_INT: pa.int64(),
+        Attribute.TYPE_FLOAT: pa.float64(),
+        Attribute.TYPE_BOOLEAN: pa.bool_(),
+        Attribute.TYPE_DATE: timestamp,
+    }
+
+
+def get_attribute_columns():
+    """Slug and datatype of attributes used by disaster, ordered by slug"""
+    ct = ContentType.objects.get_for_model(Disaster)
+    return list(
+        Value.objects
+        .filter(entity_ct=ct)
+        .values_list('attribute__slug', 'attribute__datatype')
+        .order_by('attribute__slug')
+        .distinct()
+    )
+
+
+def get_schema(attribute_columns):
+    types = _types()
+    fields = list()
+    names = list(DISASTER_FIELDS) + ['location_id'] + list(LOCATION_FIELDS[1:])
+
+    for name in names:
+        if name in CATEGORICAL:
+            fields.append(pa.field(name, pa.dictionary(pa.int32(), pa.string())))
+        else:
+            fields.append(pa.field(name, types.get(name, pa.string())))
+
+    for slug, datatype in attribute_columns:
+        fields.append(pa.field(slug, types.get(datatype, pa.string())))
+
+    return pa.schema(fields)
+
+
+def _aware(value):
+    # date from param mean start of the day in local time
+    if not isinstance(value, timezone.datetime):
+        value = timezone.datetime.combine(value, timezone.datetime.min.time())
+    if timezone.is_naive(value):
+        value = timezone.make_aware(value)
+    return value
+
+
+def chunks(chunk_size=10000, start=None, end=None):
+    """Yield list of disaster values, ordered by id"""
+    queryset = Disaster.objects.order_by('id').values(*DISASTER_FIELDS)
+
+    if start:
+        queryset = queryset.filter(occur_at__gte=_aware(start))
+
+    if end:
+        queryset = queryset.filter(occur_at__lt=_aware(end))
+
+    last_id = 0
+    while True:
+        rows = list(queryset.filter(id__gt=last_id)[:chunk_size])
+        if not rows:
+            return
+
+        yield rows
+        last_id = rows[-1]['id']
+
+
+def _value(value, datatype):
+    # text like column take anything, eg; json or enum
+    if value is None or datatype in (
+        Attribute.TYPE_INT, Attribute.TYPE_FLOAT,
+        Attribute.TYPE_BOOLEAN, Attribute.TYPE_DATE
+    ):
+        return value
+    return str(value)
+
+
+def build_batch(rows, schema, attribute_columns):
+    """Disaster rows to one RecordBatch, location and attribute read in one query each"""
+    ids = [x['id'] for x in rows]
+    attributes = get_attributes(ids, [slug for slug, _ in attribute_columns])
+
+    locations = dict()
+    queryset = DisasterLocation.objects \
+        .filter(disaster_id__in=ids) \
+        .order_by('disaster_id', 'id') \
+        .values_list('disaster_id', *LOCATION_FIELDS)
+
+    for disaster_id, *location in queryset:
+        locations.setdefault(disaster_id, []).append(location)
+
+    columns = {x.name: list() for x in schema}
+    empty = [None] * len(LOCATION_FIELDS)
+    location_names = ['location_id'] + list(LOCATION_FIELDS[1:])
+
+    for row in rows:
+        attribute = attributes.get(row['id'], {})
+
+        for location in locations.get(row['id']) or [empty]:
+            for name in DISASTER_FIELDS:
+                value = row[name]
+                columns[name].append(str(value) if name == 'uuid' else value)
+
+            for name, value in zip(location_names, location):
+                columns[name].append(value)
+
+            for slug, datatype in attribute_columns:
+                columns[slug].append(_value(attribute.get(slug), datatype))
+
+    arrays = list()
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            arrays.append(
+                pa.array(columns[field.name], type=pa.string()).dictionary_encode()
+            )
+        else:
+            arrays.append(pa.array(columns[field.name], type=field.type))
+
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def _writer(sink, format):
+    if pa is None:
+        raise ImproperlyConfigured("Install pyarrow to export disaster")
+
+    if format not in FORMATS:
+        raise ValueError("Format must be one of %s" % ', '.join(FORMATS))
+
+    attribute_columns = get_attribute_columns()
+    schema = get_schema(attribute_columns)
+
+    if format == 'parquet':
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+    else:
+        # stream format, file format not allow dictionary changed per batch
+        writer = pa.ipc.new_stream(sink, schema)
+
+    return writer, schema, attribute_columns
+
+
+def export(sink, format='parquet', chunk_size=10000, start=None, end=None):
+    """
+    Write disaster history to `sink` (path or writable file object),
+    each chunk flushed as one row group / record batch.
+    Return number of rows written.
+    """
+    writer, schema, attribute_columns = _writer(sink, format)
+    total = 0
+
+    try:
+        for rows in chunks(chunk_size, start=start, end=end):
+            batch = build_batch(rows, schema, attribute_columns)
+            writer.write_batch(batch)
+            total += batch.num_rows
+    finally:
+        writer.close()
+
+    return total
+
+
+class _Pipe:
+    """File like object which only collect written bytes"""
+
+    def __init__(self):
+        self.buffer = list()
+        self.closed = False
+
+    def write(self, data):
+        self.buffer.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.buffer)
+        self.buffer = list()
+        return data
+
+
+def stream(format='parquet', chunk_size=10000, start=None, end=None):
+    """Same as `export()` but yield the file bytes after each chunk, for response"""
+    pipe = _Pipe()
+    writer, schema, attribute_columns = _writer(pipe, format)
+
+    for rows in chunks(chunk_size, start=start, end=end):
+        writer.write_batch(build_batch(rows, schema, attribute_columns))
+        yield pipe.drain()
+
+    writer.close()
+    yield pipe.drain()
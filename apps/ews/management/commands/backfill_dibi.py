@@ -0,0 +1,53 @@
+from celery import group
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from apps.ews.tasks import backfill_dibi_partition
+from core.constant import DisasterIdentifier
+
+Checkpoint = apps.get_registered_model('ews', 'Checkpoint')
+
+
+class Command(BaseCommand):
+    help = (
+        "Backfill DIBI archive, one task per (identifier, year) "
+        "split to page range tasks run by all ews-bulk workers"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--year-from', type=int, default=2000)
+        parser.add_argument('--year-to', type=int, default=timezone.now().year)
+        parser.add_argument(
+            '--identifier',
+            action='append',
+            choices=DisasterIdentifier.values,
+            help="Only this disaster code, can be repeated"
+        )
+        parser.add_argument('--pages-per-task', type=int, default=10)
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help="Remove checkpoint so all pages scraped again"
+        )
+
+    def handle(self, *args, **options):
+        if options.get('reset'):
+            deleted, _ = Checkpoint.objects \
+                .filter(name__startswith='dibi-backfill:') \
+                .delete()
+            self.stdout.write('%s checkpoint removed' % deleted)
+
+        identifiers = options.get('identifier') or DisasterIdentifier.values
+        years = range(options.get('year_from'), options.get('year_to') + 1)
+        pages = options.get('pages_per_task')
+
+        partitions = [
+            backfill_dibi_partition.s(identifier, year, pages)
+            for year in years for identifier in identifiers
+        ]
+        group(partitions).apply_async()
+
+        self.stdout.write(self.style.SUCCESS(
+            '%s partition queued' % len(partitions)
+        ))
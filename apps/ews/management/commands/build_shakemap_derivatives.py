@@ -0,0 +1,65 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from apps.ews.conf import settings
+from apps.ews.shakemap import (
+    DisasterAttachment,
+    get_checksum,
+    get_missing,
+    render,
+    save_derivatives
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Add checksum and WebP derivative to stored shakemap, "
+        "image resized in a process pool"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--workers', type=int, default=settings.EWS_SHAKEMAP_WORKERS)
+
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size')
+        queryset = DisasterAttachment.objects \
+            .filter(identifier='shakemap', file__gt='') \
+            .exclude(thumbnail__gt='') \
+            .order_by('id')
+
+        last_id = 0
+        total = 0
+
+        with ProcessPoolExecutor(max_workers=options.get('workers')) as executor:
+            while True:
+                objs = list(queryset.filter(id__gt=last_id)[:batch_size])
+                if len(objs) <= 0:
+                    break
+
+                last_id = objs[-1].id
+                jobs = list()
+
+                for obj in objs:
+                    try:
+                        with obj.file.open('rb') as f:
+                            data = f.read()
+                    except (FileNotFoundError, OSError) as e:
+                        self.stderr.write('%s: %s' % (obj.file.name, e))
+                        continue
+
+                    if not obj.checksum:
+                        obj.checksum = get_checksum(data)
+                        obj.save(update_fields=['checksum'])
+
+                    missing = get_missing(obj.checksum)
+                    jobs.append((obj, executor.submit(
+                        render, data, missing, settings.EWS_SHAKEMAP_QUALITY
+                    ) if missing else None))
+
+                for obj, job in jobs:
+                    save_derivatives(obj, job.result() if job else None)
+                    total += 1
+
+                self.stdout.write('%s shakemap done...' % total)
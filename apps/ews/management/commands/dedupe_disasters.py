@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ews.matcher.dedupe import CHECKPOINT, dedupe
+from apps.ews.utils import set_checkpoint
+
+
+class Command(BaseCommand):
+    help = "Link same disaster from different source to one canonical"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help="Start again from the first disaster"
+        )
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        if options.get('reset'):
+            set_checkpoint(CHECKPOINT, {'last_id': 0})
+
+        start = time.perf_counter()
+        linked = dedupe(batch_size=options.get('batch_size'))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            '%s disaster linked in %.2fs' % (linked, elapsed)
+        ))
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.utils.dateparse import parse_date
+
+from apps.ews.export import FORMATS, export
+
+
+class Command(BaseCommand):
+    help = "Export disaster, location and attribute history to Parquet or Arrow IPC stream file"
+
+    def add_arguments(self, parser):
+        parser.add_argument('out', help="Output file path")
+        parser.add_argument('--format', choices=FORMATS, default='parquet')
+        parser.add_argument('--chunk-size', type=int, default=10000)
+        parser.add_argument('--from', dest='start', type=parse_date,
+                            help="Occur at or after YYYY-MM-DD")
+        parser.add_argument('--to', dest='end', type=parse_date,
+                            help="Occur before YYYY-MM-DD")
+
+    def handle(self, *args, **options):
+        total = export(
+            options['out'],
+            format=options['format'],
+            chunk_size=options['chunk_size'],
+            start=options.get('start'),
+            end=options.get('end')
+        )
+        self.stdout.write('%s rows written to %s' % (total, options['out']))
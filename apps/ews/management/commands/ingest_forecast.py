@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ews.scraper.forecast import forecast
+
+
+class Command(BaseCommand):
+    help = "Ingest BMKG DigitalForecast XML of all province"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--source',
+            help="Base url or directory, default `EWS_FORECAST_SOURCE`"
+        )
+        parser.add_argument(
+            '--province',
+            action='append',
+            help="Only this province, eg; JawaBarat. Can be repeated"
+        )
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        total = forecast(
+            source=options.get('source'),
+            provinces=options.get('province'),
+            batch_size=options.get('batch_size'),
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            '%s forecast rows saved in %.2fs (%.0f rows/s)' % (
+                total, elapsed, total / elapsed if elapsed else 0
+            )
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from apps.ews.summary import KINDS, rebuild
+
+
+class Command(BaseCommand):
+    help = "Compute victim and damage summary again from raw table"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--kind',
+            action='append',
+            choices=list(KINDS),
+            help="Only this summary, can be repeated"
+        )
+
+    def handle(self, *args, **options):
+        result = rebuild(kinds=options.get('kind'))
+        for kind, count in result.items():
+            self.stdout.write('%s: %s rows' % (kind, count))
@@ -0,0 +1,33 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from apps.ews.matcher.quake import reconcile
+
+
+class Command(BaseCommand):
+    help = "Link preliminary earthquake with their confirmed version"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            help="Check final events from this date (YYYY-MM-DD)"
+        )
+
+    def handle(self, *args, **options):
+        since = options.get('since')
+        if since:
+            date = parse_date(since)
+            since = timezone.make_aware(
+                timezone.datetime(date.year, date.month, date.day)
+            )
+
+        start = time.perf_counter()
+        superseded = reconcile(since=since)
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            '%s preliminary superseded in %.2fs' % (superseded, elapsed)
+        ))
@@ -0,0 +1,317 @@
+import re
+
+from collections import defaultdict
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from apps.ews.conf import settings
+from apps.ews.utils import get_attributes, get_checkpoint, set_checkpoint
+from core.geo import haversine, to_float
+
+Disaster = apps.get_registered_model('ews', 'Disaster')
+DisasterLocation = apps.get_registered_model('ews', 'DisasterLocation')
+
+CHECKPOINT = 'dedupe'
+PRELIMINARY = 'preliminary'
+ATTRIBUTES = [
+    'disaster_source_origin',
+    'disaster_epicenter_latitude',
+    'disaster_epicenter_longitude',
+]
+
+# when duplicated, most trusted source become canonical
+ORIGIN_PRIORITY = [
+    'bnpb-dipi',
+    'bmkg-tews-recent',
+    'bmkg-tews-feel',
+    'bmkg-realtime',
+]
+
+STOP_WORDS = {'kab', 'kec', 'kel', 'des', 'kota', 'dan', 'yang', 'berada'}
+TOKEN_RE = re.compile(r'[a-z]+')
+
+
+def overlap(a, b):
+    """Overlap coefficient of two set, 0 when one of them empty"""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / min(len(a), len(b))
+
+
+def tokenize(text):
+    return {
+        x for x in TOKEN_RE.findall((text or '').lower())
+        if len(x) > 2 and x not in STOP_WORDS
+    }
+
+
+class Record:
+    __slots__ = ('id', 'identifier', 'day', 'canonical_id', 'origin',
+                 'tokens', 'names', 'provinces', 'points')
+
+    def __init__(self, id, identifier, occur_at, title, canonical_id):
+        self.id = id
+        self.identifier = identifier
+        self.day = timezone.localtime(occur_at).date() \
+            if timezone.is_aware(occur_at) else occur_at.date()
+        self.canonical_id = canonical_id
+        self.origin = None
+        self.tokens = tokenize(title)
+        self.names = set()
+        self.provinces = set()
+        self.points = list()
+
+    @property
+    def priority(self):
+        return get_priority(self.origin, self.id)
+
+
+def get_priority(origin, id):
+    """Lower is more trusted, older first on the same source"""
+    try:
+        index = ORIGIN_PRIORITY.index(origin)
+    except ValueError:
+        index = len(ORIGIN_PRIORITY)
+    return (index, id)
+
+
+def score(a, b):
+    """Similarity 0..1 from location overlap and title similarity"""
+    location = overlap(a.names, b.names)
+
+    if a.points and b.points:
+        km = min(
+            haversine(p[0], p[1], q[0], q[1])
+            for p in a.points for q in b.points
+        )
+        proximity = max(0.0, 1 - km / settings.EWS_DEDUPE_DISTANCE)
+        location = max(location, proximity)
+
+    text = overlap(a.tokens, b.tokens)
+    weight = settings.EWS_DEDUPE_LOCATION_WEIGHT
+    return weight * location + (1 - weight) * text
+
+
+def _day_ranges(days):
+    """Merge sorted days to contiguous [start, end) datetime ranges"""
+    ranges = list()
+
+    for day in sorted(days):
+        start = timezone.make_aware(
+            timezone.datetime(day.year, day.month, day.day)
+        )
+        end = start + timedelta(days=1)
+
+        if ranges and ranges[-1][1] >= start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    return ranges
+
+
+def _candidates(queryset, news):
+    """All disasters in the same (identifier, day) with new disasters"""
+    identifiers = {x.identifier for x in news}
+    ranges = _day_ranges({x.day for x in news})
+    rows = list()
+
+    # keep each query short, don't send thousands OR at once
+    for i in range(0, len(ranges), 100):
+        condition = reduce(or_, [
+            Q(occur_at__gte=start, occur_at__lt=end)
+            for start, end in ranges[i:i + 100]
+        ])
+
+        rows.extend(
+            queryset
+            .filter(condition, identifier__in=identifiers)
+            .values_list('id', 'identifier', 'occur_at', 'title', 'canonical_id')
+        )
+
+    records = {x[0]: Record(*x) for x in rows}
+    attributes = get_attributes(records.keys(), ATTRIBUTES)
+
+    for id, attribute in attributes.items():
+        record = records[id]
+        record.origin = attribute.get('disaster_source_origin')
+
+        latitude = to_float(attribute.get('disaster_epicenter_latitude'))
+        longitude = to_float(attribute.get('disaster_epicenter_longitude'))
+        if latitude and longitude:
+            record.points.append((latitude, longitude))
+
+    locations = DisasterLocation.objects \
+        .filter(disaster_id__in=records.keys()) \
+        .values_list(
+            'disaster_id',
+            'administrative_area',
+            'administrative_area_code',
+            'sub_administrative_area',
+            'locality',
+            'latitude',
+            'longitude',
+        )
+
+    for id, area, area_code, sub_area, locality, lat, lon in locations:
+        record = records[id]
+        record.names.update(
+            x.upper().strip() for x in (area, sub_area, locality) if x
+        )
+
+        if area_code:
+            record.provinces.add(area_code)
+
+        if lat and lon:
+            record.points.append((lat, lon))
+
+    return records
+
+
+def _pairs(records, new_ids):
+    """
+    Candidate pairs blocked by (identifier, day, province code).
+    Disaster without province code (BMKG) compared with all
+    disaster in the same (identifier, day).
+    """
+    groups = defaultdict(list)
+    for record in records.values():
+        groups[(record.identifier, record.day)].append(record)
+
+    pairs = set()
+
+    for items in groups.values():
+        blocks = defaultdict(list)
+        uncoded = list()
+
+        for record in items:
+            if record.provinces:
+                for code in record.provinces:
+                    blocks[code].append(record)
+            else:
+                uncoded.append(record)
+
+        comparisons = [
+            (a, b) for block in blocks.values()
+            for i, a in enumerate(block) for b in block[i + 1:]
+        ]
+        comparisons.extend(
+            (a, b) for a in uncoded for b in items if a.id != b.id
+        )
+
+        for a, b in comparisons:
+            if a.id not in new_ids and b.id not in new_ids:
+                continue
+
+            # only cross source counted as duplicate
+            if a.origin == b.origin:
+                continue
+
+            pairs.add((min(a.id, b.id), max(a.id, b.id)))
+
+    return pairs
+
+
+@transaction.atomic
+def _link(records, matches):
+    parent = dict()
+
+    def find(x):
+        while parent.get(x, x) != x:
+            x = parent[x]
+        return x
+
+    for a, b in matches:
+        parent.setdefault(a, a)
+        parent.setdefault(b, b)
+        parent[find(a)] = find(b)
+
+    groups = defaultdict(list)
+    for id in parent:
+        groups[find(id)].append(records[id])
+
+    # current canonical may not a candidate, only its source needed
+    outside = {
+        x.canonical_id for x in records.values()
+        if x.canonical_id and x.canonical_id not in records
+    }
+    origins = {
+        id: x.get('disaster_source_origin')
+        for id, x in get_attributes(outside, ATTRIBUTES[:1]).items()
+    }
+
+    def priority(id):
+        record = records.get(id)
+        return get_priority(record.origin if record else origins.get(id), id)
+
+    changed = list()
+    moved = 0
+
+    for members in groups.values():
+        # members and their current canonical, most trusted win
+        ids = {x.id for x in members} | {x.canonical_id for x in members if x.canonical_id}
+        canonical_id = min(ids, key=priority)
+
+        for id in ids:
+            target = canonical_id if id != canonical_id else None
+            if id not in records or records[id].canonical_id != target:
+                changed.append(Disaster(id=id, canonical_id=target))
+
+        # others still point to the old canonical, no chain left
+        moved += Disaster.objects \
+            .filter(canonical_id__in=ids - {canonical_id}) \
+            .exclude(id__in=ids) \
+            .update(canonical_id=canonical_id)
+
+    Disaster.objects.bulk_update(changed, fields=['canonical'])
+    return len(changed) + moved
+
+
+def dedupe(batch_size=None):
+    """
+    Link same event scraped from different source with `canonical`.
+
+    Incremental, only disaster after last checkpoint compared
+    with their blocking candidates.
+    """
+    batch_size = batch_size or settings.EWS_DEDUPE_BATCH_SIZE
+    threshold = settings.EWS_DEDUPE_THRESHOLD
+    last_id = get_checkpoint(CHECKPOINT).get('last_id', 0)
+    linked = 0
+
+    queryset = Disaster.objects \
+        .filter(superseded_by__isnull=True) \
+        .exclude(eav__disaster_status=PRELIMINARY)
+
+    while True:
+        rows = list(
+            queryset
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', 'identifier', 'occur_at', 'title', 'canonical_id')
+            [:batch_size]
+        )
+
+        if len(rows) <= 0:
+            break
+
+        news = [Record(*x) for x in rows]
+        records = _candidates(queryset, news)
+        new_ids = {x.id for x in news}
+
+        matches = [
+            (a, b) for a, b in _pairs(records, new_ids)
+            if score(records[a], records[b]) >= threshold
+        ]
+
+        linked += _link(records, matches)
+        last_id = rows[-1][0]
+        set_checkpoint(CHECKPOINT, {'last_id': last_id})
+
+    return linked
@@ -0,0 +1,164 @@
+from bisect import bisect_left, bisect_right
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from apps.ews.conf import settings
+from apps.ews.utils import get_attributes
+from core.geo import haversine, to_float
+
+Disaster = apps.get_registered_model('ews', 'Disaster')
+
+PRELIMINARY = 'preliminary'
+ATTRIBUTES = [
+    'disaster_epicenter_latitude',
+    'disaster_epicenter_longitude',
+    'disaster_magnitude',
+]
+
+
+def _events(queryset):
+    """Return [(timestamp, id, latitude, longitude, magnitude)] sorted by time"""
+    rows = list(queryset.values_list('id', 'occur_at'))
+    attributes = get_attributes([x[0] for x in rows], ATTRIBUTES)
+    events = list()
+
+    for id, occur_at in rows:
+        attribute = attributes.get(id, {})
+        latitude = to_float(attribute.get('disaster_epicenter_latitude'))
+        longitude = to_float(attribute.get('disaster_epicenter_longitude'))
+        magnitude = to_float(attribute.get('disaster_magnitude'))
+
+        # can't compared without epicenter
+        if latitude is None or longitude is None:
+            continue
+
+        events.append((
+            occur_at.timestamp(),
+            id,
+            latitude,
+            longitude,
+            magnitude
+        ))
+
+    return sorted(events)
+
+
+def match(finals, preliminaries, window=None, distance=None, magnitude=None):
+    """
+    Pair each final event with one preliminary event.
+
+    `preliminaries` must sorted by timestamp, candidates for a final
+    event taken from that index with bisect so only events inside
+    time window compared.
+
+    Return; [(final_id, preliminary_id)]
+    """
+    window = window or settings.EWS_QUAKE_MATCH_WINDOW
+    distance = distance or settings.EWS_QUAKE_MATCH_DISTANCE
+    magnitude = magnitude or settings.EWS_QUAKE_MATCH_MAGNITUDE
+
+    times = [x[0] for x in preliminaries]
+    candidates = list()
+
+    for t, final_id, lat, lon, mag in finals:
+        start = bisect_left(times, t - window)
+        end = bisect_right(times, t + window)
+
+        for p_t, p_id, p_lat, p_lon, p_mag in preliminaries[start:end]:
+            if mag is not None and p_mag is not None \
+                    and abs(mag - p_mag) > magnitude:
+                continue
+
+            km = haversine(lat, lon, p_lat, p_lon)
+            if km > distance:
+                continue
+
+            # normalized score, lower is better
+            score = abs(t - p_t) / window + km / distance
+            candidates.append((score, final_id, p_id))
+
+    # greedy by best score, one preliminary for one final
+    pairs = list()
+    used_finals = set()
+    used_preliminaries = set()
+
+    for score, final_id, p_id in sorted(candidates):
+        if final_id in used_finals or p_id in used_preliminaries:
+            continue
+
+        used_finals.add(final_id)
+        used_preliminaries.add(p_id)
+        pairs.append((final_id, p_id))
+
+    return pairs
+
+
+@transaction.atomic
+def supersede(pairs):
+    """
+    Mark preliminary as superseded by final event then move
+    user contribution (comments, confirmations) to final event
+    """
+    if len(pairs) <= 0:
+        return 0
+
+    Comment = apps.get_registered_model('contribution', 'Comment')
+    Confirmation = apps.get_registered_model('contribution', 'Confirmation')
+    ct = ContentType.objects.get_for_model(Disaster)
+
+    preliminary_objs = Disaster.objects.in_bulk([x[1] for x in pairs])
+    for final_id, p_id in pairs:
+        obj = preliminary_objs[p_id]
+        obj.superseded_by_id = final_id
+
+    Disaster.objects.bulk_update(
+        preliminary_objs.values(),
+        fields=['superseded_by']
+    )
+
+    moved = Case(*[
+        When(object_id=str(p_id), then=Value(str(final_id)))
+        for final_id, p_id in pairs
+    ])
+
+    for model in (Comment, Confirmation):
+        model.objects \
+            .filter(content_type=ct, object_id__in=[str(x[1]) for x in pairs]) \
+            .update(object_id=moved)
+
+    return len(pairs)
+
+
+def reconcile(since=None):
+    """
+    Link preliminary earthquake (`bmkg-realtime`) with their
+    confirmed version from `quake` and `quake_recent`.
+
+    Only final events from `since` (default last 2 days) checked.
+    """
+    window = settings.EWS_QUAKE_MATCH_WINDOW
+    since = since or timezone.now() - timedelta(days=2)
+
+    queryset = Disaster.objects \
+        .filter(identifier=Disaster._Identifier.DIS108) \
+        .filter(superseded_by__isnull=True)
+
+    finals = queryset \
+        .filter(occur_at__gte=since) \
+        .exclude(eav__disaster_status=PRELIMINARY)
+
+    # already linked final event no need checked again
+    finals = finals.filter(supersedes__isnull=True)
+
+    preliminaries = queryset.filter(
+        occur_at__gte=since - timedelta(seconds=window),
+        eav__disaster_status=PRELIMINARY
+    )
+
+    pairs = match(_events(finals), _events(preliminaries))
+    return supersede(pairs)
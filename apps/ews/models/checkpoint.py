@@ -0,0 +1,23 @@
+from django.db import models
+
+from core.models import AbstractCommonField
+
+
+class AbstractCheckpoint(AbstractCommonField):
+    """
+    Last position of long running job
+    so the next run can continue from there.
+
+    Example;
+    `name` set to `dedupe`
+    `value` set to `{"last_id": 1024}`
+    """
+    name = models.CharField(max_length=255, unique=True)
+    value = models.JSONField(default=dict, blank=True)
+
+    class Meta:
+        app_label = 'ews'
+        abstract = True
+
+    def __str__(self) -> str:
+        return self.name
@@ -8,6 +8,7 @@ from django.contrib.contenttypes.fields import GenericForeignKey
 from django.contrib.contenttypes.models import ContentType
 
 from core.models import AbstractCommonField
+from core.normalizer import clean_location, parse_mmi
 from core.constant import (
     DamageClassify,
     DamageLevel,
@@ -75,6 +76,26 @@ class AbstractDisaster(AbstractCommonField):
         'associated_object_id'
     )
 
+    # preliminary earthquake replaced by the confirmed one
+    # see `apps.ews.matcher.quake`
+    superseded_by = models.ForeignKey(
+        'self',
+        related_name='supersedes',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+
+    # same event scraped from other source point to one canonical
+    # see `apps.ews.matcher.dedupe`
+    canonical = models.ForeignKey(
+        'self',
+        related_name='duplicates',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True
+    )
+
     class Meta:
         app_label = 'ews'
         abstract = True
@@ -92,8 +113,6 @@ class AbstractDisaster(AbstractCommonField):
 
 
 class AbstractDisasterLocation(AbstractCommonField):
-    REMOVE_WORDS = ['Desa', 'Kelurahan', 'Kecamatan', 'Kabupaten', 'Provinsi']
-
     disaster = models.ForeignKey(
         'ews.Disaster',
         related_name='locations',
@@ -102,6 +121,10 @@ class AbstractDisasterLocation(AbstractCommonField):
 
     severity = models.CharField(max_length=255, null=True, blank=True)
 
+    # numeric range of MMI severity, `III-IV` become 3 and 4
+    mmi_min = models.PositiveSmallIntegerField(null=True, blank=True)
+    mmi_max = models.PositiveSmallIntegerField(null=True, blank=True)
+
     country = models.CharField(
         null=True,
         blank=True,
@@ -198,6 +221,17 @@ class AbstractDisasterLocation(AbstractCommonField):
     latitude = models.FloatField(default=Decimal(0.0), db_index=True)
     longitude = models.FloatField(default=Decimal(0.0), db_index=True)
 
+    # most specific area resolved from gazetteer
+    area = models.ForeignKey(
+        'generic.AdministrativeArea',
+        related_name='disaster_locations',
+        to_field='code',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True
+    )
+
     class Meta:
         app_label = 'ews'
         abstract = True
@@ -213,20 +247,10 @@ class AbstractDisasterLocation(AbstractCommonField):
         super().save(*args, **kwargs)
 
     def clean_words(self):
-        for r in self.REMOVE_WORDS:
-            if self.administrative_area:
-                self.administrative_area = self.administrative_area \
-                    .replace(r, '').strip()
-
-            if self.sub_administrative_area:
-                self.sub_administrative_area = self.sub_administrative_area \
-                    .replace(r, '').strip()
-
-            if self.locality:
-                self.locality = self.locality.replace(r, '').strip()
+        clean_location(self)
 
-            if self.sub_locality:
-                self.sub_locality = self.sub_locality.replace(r, '').strip()
+        if self.severity and self.mmi_min is None:
+            self.mmi_min, self.mmi_max = parse_mmi(self.severity)
 
 
 class AbstractDisasterVictim(AbstractCommonField):
@@ -234,7 +258,7 @@ class AbstractDisasterVictim(AbstractCommonField):
     _AgeGroup = VictimAgeGroup
     _Classify = VictimClassify
 
-    disaster = models.OneToOneField(
+    disaster = models.ForeignKey(
         'ews.Disaster',
         related_name='victims',
         on_delete=models.CASCADE
@@ -280,7 +304,7 @@ class AbstractDisasterDamage(AbstractCommonField):
     _Level = DamageLevel
     _Metric = DamageMetric
 
-    disaster = models.OneToOneField(
+    disaster = models.ForeignKey(
         'ews.Disaster',
         related_name='damages',
         on_delete=models.CASCADE
@@ -302,7 +326,8 @@ class AbstractDisasterDamage(AbstractCommonField):
         default=_Level.DAL999
     )
 
-    amount = models.IntegerField(default=0)
+    # hectare and kilometer may has fraction
+    amount = models.DecimalField(max_digits=18, decimal_places=4, default=0)
     metric = models.CharField(
         max_length=3,
         choices=_Metric.choices,
@@ -368,6 +393,19 @@ class AbstractDisasterAttachment(AbstractCommonField):
     identifier = models.CharField(max_length=255, null=True, blank=True)
     caption = models.TextField(null=True, blank=True)
 
+    # sha256 of file content, same content share the stored file
+    checksum = models.CharField(
+        max_length=64,
+        editable=False,
+        null=True,
+        blank=True,
+        db_index=True
+    )
+
+    # WebP derivative, see `apps.ews.shakemap`
+    thumbnail = models.FileField(editable=False, null=True, blank=True)
+    preview = models.FileField(editable=False, null=True, blank=True)
+
     class Meta:
         app_label = 'ews'
         abstract = True
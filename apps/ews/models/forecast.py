@@ -0,0 +1,35 @@
+from django.db import models
+
+
+class AbstractWeatherForecast(models.Model):
+    """
+    One value of BMKG DigitalForecast parameter at a time,
+    eg; humidity `hu` of Kota Bandung at 2021-10-23 06:00 is 80 (%).
+
+    Not extend `AbstractCommonField`, each province file produce
+    thousands rows and replaced every issue so history not needed.
+    """
+    domain = models.CharField(max_length=255, db_index=True)
+    area_code = models.CharField(max_length=25)
+    area_name = models.CharField(max_length=255)
+    area_type = models.CharField(max_length=25, null=True, blank=True)
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    parameter = models.CharField(max_length=25)
+    timerange = models.CharField(max_length=25)
+    forecast_at = models.DateTimeField()
+    value = models.CharField(max_length=255, null=True, blank=True)
+    unit = models.CharField(max_length=25, null=True, blank=True)
+
+    issued_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'ews'
+        abstract = True
+        indexes = [
+            models.Index(fields=['area_code', 'parameter', 'forecast_at']),
+        ]
+
+    def __str__(self) -> str:
+        return '{} {} {}'.format(self.area_name, self.parameter, self.forecast_at)
@@ -2,6 +2,10 @@ from core.loading import is_model_registered
 from simple_history.models import HistoricalRecords
 
 from .disaster import *
+from .checkpoint import *
+from .forecast import *
+from .polling import *
+from .summary import *
 
 __all__ = list()
 
@@ -46,3 +50,43 @@ if not is_model_registered('ews', 'DisasterAttachment'):
             pass
 
     __all__.append('DisasterAttachment')
+
+
+if not is_model_registered('ews', 'Checkpoint'):
+    class Checkpoint(AbstractCheckpoint):
+        class Meta(AbstractCheckpoint.Meta):
+            pass
+
+    __all__.append('Checkpoint')
+
+
+if not is_model_registered('ews', 'WeatherForecast'):
+    class WeatherForecast(AbstractWeatherForecast):
+        class Meta(AbstractWeatherForecast.Meta):
+            pass
+
+    __all__.append('WeatherForecast')
+
+
+if not is_model_registered('ews', 'PollDecision'):
+    class PollDecision(AbstractPollDecision):
+        class Meta(AbstractPollDecision.Meta):
+            pass
+
+    __all__.append('PollDecision')
+
+
+if not is_model_registered('ews', 'VictimSummary'):
+    class VictimSummary(AbstractVictimSummary):
+        class Meta(AbstractVictimSummary.Meta):
+            pass
+
+    __all__.append('VictimSummary')
+
+
+if not is_model_registered('ews', 'DamageSummary'):
+    class DamageSummary(AbstractDamageSummary):
+        class Meta(AbstractDamageSummary.Meta):
+            pass
+
+    __all__.append('DamageSummary')
@@ -0,0 +1,30 @@
+from django.db import models
+
+
+class AbstractPollDecision(models.Model):
+    """
+    Interval chosen by adaptive scheduler after each scraping,
+    kept to tune `EWS_POLL_SOURCES` bounds.
+    """
+    source = models.CharField(max_length=255, db_index=True)
+    found = models.IntegerField(default=0)
+    quiet = models.IntegerField(
+        default=0,
+        help_text="Consecutive runs without new event"
+    )
+    previous_interval = models.IntegerField()
+    interval = models.IntegerField()
+    reason = models.CharField(max_length=255)
+    create_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        app_label = 'ews'
+        abstract = True
+        ordering = ['-create_at']
+
+    def __str__(self) -> str:
+        return '{} {}s -> {}s'.format(
+            self.source,
+            self.previous_interval,
+            self.interval
+        )
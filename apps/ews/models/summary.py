@@ -0,0 +1,67 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from core.constant import (
+    DamageClassify,
+    DamageLevel,
+    DamageMetric,
+    VictimClassify
+)
+
+
+class AbstractVictimSummary(models.Model):
+    """
+    Total victim per month, province and classify.
+    Province code empty mean national total.
+
+    Maintained by `apps.ews.summary`, don't edit by hand.
+    """
+    _Classify = VictimClassify
+
+    period = models.DateField(help_text=_("First day of month"))
+    area_code = models.CharField(max_length=25, blank=True, default='')
+    classify = models.CharField(max_length=3, choices=_Classify.choices)
+    amount = models.BigIntegerField(default=0)
+
+    class Meta:
+        app_label = 'ews'
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=['area_code', 'period', 'classify'],
+                name='ews_victim_summary_unique'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return '{} {} {}'.format(self.period, self.area_code, self.amount)
+
+
+class AbstractDamageSummary(models.Model):
+    """
+    Total damage per month, province, classify and level.
+    Metric part of the key so unit and hectare not summed together.
+    """
+    _Classify = DamageClassify
+    _Level = DamageLevel
+    _Metric = DamageMetric
+
+    period = models.DateField(help_text=_("First day of month"))
+    area_code = models.CharField(max_length=25, blank=True, default='')
+    classify = models.CharField(max_length=3, choices=_Classify.choices)
+    level = models.CharField(max_length=3, choices=_Level.choices)
+    metric = models.CharField(max_length=3, choices=_Metric.choices)
+    amount = models.DecimalField(max_digits=22, decimal_places=4, default=0)
+
+    class Meta:
+        app_label = 'ews'
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=['area_code', 'period', 'classify', 'level', 'metric'],
+                name='ews_damage_summary_unique'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return '{} {} {}'.format(self.period, self.area_code, self.amount)
@@ -0,0 +1,71 @@
+from django.apps import apps
+from django.core.cache import cache
+
+from apps.ews.conf import settings
+from apps.ews.utils import get_checkpoint, set_checkpoint
+
+CHECKPOINT = 'poll:%s'
+CACHE_KEY = 'ews-poll:%s'
+
+
+def get_bounds(source):
+    return settings.EWS_POLL_SOURCES[source]
+
+
+def get_state(source):
+    """Return {'interval': seconds, 'quiet': runs}"""
+    state = cache.get(CACHE_KEY % source)
+    if state is None:
+        state = get_checkpoint(CHECKPOINT % source)
+        state.setdefault('interval', get_bounds(source)['initial'])
+        state.setdefault('quiet', 0)
+        cache.set(CACHE_KEY % source, state, None)
+    return state
+
+
+def get_interval(source):
+    return get_state(source)['interval']
+
+
+def next_interval(interval, found, bounds):
+    if found > 0:
+        interval = interval * settings.EWS_POLL_SPEEDUP
+    else:
+        interval = interval * settings.EWS_POLL_BACKOFF
+
+    return int(min(bounds['max'], max(bounds['min'], interval)))
+
+
+def record(source, found):
+    """
+    Called after each scraping with number of new event,
+    save next interval and log the decision.
+    """
+    PollDecision = apps.get_registered_model('ews', 'PollDecision')
+
+    state = get_state(source)
+    previous = state['interval']
+    interval = next_interval(previous, found or 0, get_bounds(source))
+    quiet = 0 if found else state['quiet'] + 1
+
+    if found:
+        reason = 'found'
+    elif interval == previous:
+        reason = 'max'
+    else:
+        reason = 'backoff'
+
+    state = {'interval': interval, 'quiet': quiet}
+    set_checkpoint(CHECKPOINT % source, state)
+    cache.set(CACHE_KEY % source, state, None)
+
+    PollDecision.objects.create(
+        source=source,
+        found=found or 0,
+        quiet=quiet,
+        previous_interval=previous,
+        interval=interval,
+        reason=reason
+    )
+
+    return interval
@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+from celery.schedules import schedule
+
+# imported by `config.celery` before django ready,
+# so django and models only touched when beat ask the interval
+
+
+class adaptive(schedule):
+    """
+    Beat schedule which interval follow `record()` decision,
+    eg; 'schedule': adaptive('bmkg-realtime')
+    """
+
+    def __init__(self, source, app=None):
+        self.source = source
+        super().__init__(app=app)
+
+    @property
+    def run_every(self):
+        from apps.ews.polling import get_interval
+        return timedelta(seconds=get_interval(self.source))
+
+    @run_every.setter
+    def run_every(self, value):
+        # fixed by `record()`, ignore value from `schedule`
+        pass
+
+    def __repr__(self):
+        return '<adaptive: {0.source}>'.format(self)
+
+    def __reduce__(self):
+        return self.__class__, (self.source,)
+
+    def __eq__(self, other):
+        if isinstance(other, adaptive):
+            return self.source == other.source
+        return NotImplemented
+
+    def __hash__(self):
+        return hash(self.source)
@@ -1,21 +1,25 @@
 import pytz
 import requests
-import requests  # to get image from the web
-import shutil  # to save it locally
-import os
 
 from bs4 import BeautifulSoup
+from celery.utils.log import get_task_logger
 from collections import defaultdict
 
 from django.db import transaction
 from django.utils import timezone
 from django.apps import apps
-from django.core.files import File
-from django.conf import settings
+
+from apps.ews.shakemap import attach_shakemap
+from apps.generic.gazetteer import get_gazetteer
+from apps.generic import search
+from apps.generic.geocoder import get_geocoder
+from core.instrumentation import incr, span
+from core.normalizer import parse_felt
 
 Disaster = apps.get_registered_model('ews', 'Disaster')
 DisasterLocation = apps.get_registered_model('ews', 'DisasterLocation')
-DisasterAttachment = apps.get_registered_model('ews', 'DisasterAttachment')
+
+logger = get_task_logger(__name__)
 
 
 @transaction.atomic
@@ -29,8 +33,11 @@ def quake():
     Result: 20211023095158.mmi.jpg
     """
     url = 'https://data.bmkg.go.id/DataMKG/TEWS/gempadirasakan.json'
-    r = requests.get(url)
-    res = r.json()
+    with span('fetch'):
+        r = requests.get(url)
+
+    with span('parse'):
+        res = r.json()
     info_gempa = res.get('Infogempa', {})
     gempa = info_gempa.get('gempa', {})
     shakemap_base_url = 'https://data.bmkg.go.id/DataMKG/TEWS/'
@@ -99,25 +106,8 @@ def quake():
 
         depth = numbers[0]
 
-        # locations, don't forget clean white space before save to db
-        locations = location.split(',')
-        locations_clean = [loc.strip().replace(' - ', '-')
-                           for loc in locations]
-
-        # separate level and location name
-        levels = [loc.split(' ')[0] for loc in locations_clean]
-
-        names = list()
-        for loc in locations_clean:
-            REMOVE_WORDS = ['Des.', 'Kel.', 'Kec.', 'Kab.']
-            for r in REMOVE_WORDS:
-                loc = loc.replace(r, '').strip()
-
-            l = loc.split(' ')
-            l.pop(0)
-            l = [i for i in l if i]
-
-            names.append(' '.join(l))
+        # locations, list of (severity, name, mmi_min, mmi_max)
+        felts = parse_felt(location)
 
         disaster_data = {
             'occur_at': local_datetime,
@@ -136,7 +126,10 @@ def quake():
             ) \
             .exclude(eav__disaster_status=eav_disaster_status)
 
-        if local_datetime > last_saved_dt and not checker.exists():
+        with span('dedupe'):
+            is_new = local_datetime > last_saved_dt and not checker.exists()
+
+        if is_new:
             obj = Disaster(**disaster_data)
             disaster_objs.append(obj)
 
@@ -150,26 +143,25 @@ def quake():
             })
 
             # collect locations
-            disaster_locations[index].append({
-                'names': names,
-                'levels': levels,
-            })
+            disaster_locations[index].extend(felts)
 
     if len(disaster_locations) > 0:
-        for index in disaster_locations:
-            names = disaster_locations[index][0]['names']
-            levels = disaster_locations[index][0]['levels']
+        gazetteer = get_gazetteer()
 
-            for i, name in enumerate(names):
-                severity = levels[i]
+        for index in disaster_locations:
+            felts = disaster_locations[index]
 
+            for severity, name, mmi_min, mmi_max in felts:
                 # build location object
                 # latitude and longitude set when user show disaster detail
                 obj = DisasterLocation(
                     administrative_area=name,
-                    severity=severity
+                    severity=severity,
+                    mmi_min=mmi_min,
+                    mmi_max=mmi_max
                 )
 
+                gazetteer.locate(obj, gazetteer.resolve_regency(name))
                 location_objs[index].append(obj)
 
     # Bulk create
@@ -177,9 +169,12 @@ def quake():
     new_disaster_objs = sorted(disaster_objs, key=lambda d: d.occur_at)
 
     try:
-        Disaster.objects.bulk_create(new_disaster_objs, ignore_conflicts=False)
-    except Exception as e:
-        print(e)
+        with span('write'):
+            Disaster.objects.bulk_create(new_disaster_objs, ignore_conflicts=False)
+        incr('disasters_created', len(new_disaster_objs))
+    except Exception:
+        incr('errors', stage='write')
+        logger.exception('bulk create disaster failed')
 
     latest_disaster_objs = Disaster.objects \
         .order_by('-id')[:len(disaster_objs)]
@@ -193,7 +188,8 @@ def quake():
                 value = attributes[key]
                 setattr(obj.eav, key, value)
 
-            obj.eav.save()
+            with span('eav'):
+                obj.eav.save()
 
         # set location
         locations = location_objs[index]
@@ -201,42 +197,24 @@ def quake():
             setattr(x, 'disaster', obj)
 
         try:
-            DisasterLocation.objects.bulk_create(
-                locations,
-                ignore_conflicts=True
-            )
-        except Exception as e:
-            print(e)
-
-        # Set up the image URL and filename
-        filename = shakemap_url.split("/")[-1]
-
-        # Open the url image, set stream to True, this will return the stream content.
-        r = requests.get(shakemap_url, stream=True)
-
-        # Check if the image was retrieved successfully
-        if r.status_code == 200:
-            # Set decode_content value to True, otherwise the downloaded image file's size will be zero.
-            r.raw.decode_content = True
-
-            # Retrieve file from root path
-            filepath = os.path.join(settings.PROJECT_PATH, filename)
+            with span('write'):
+                DisasterLocation.objects.bulk_create(
+                    locations,
+                    ignore_conflicts=True
+                )
+        except Exception:
+            incr('errors', stage='write')
+            logger.exception('bulk create disaster location failed')
 
-            # Open a local file with wb ( write binary ) permission.
-            with open(filename, 'wb') as f:
-                shutil.copyfileobj(r.raw, f)
+        with span('attachment'):
+            # downloaded, deduplicated and resized by `process_shakemap` task
+            attach_shakemap(obj, shakemap_url)
 
-            with open(filepath, 'rb') as f:
-                fobj = File(f)
-                attachment = DisasterAttachment.objects.create(
-                    disaster=obj,
-                    identifier='shakemap'
-                )
-                attachment.file.save(filename, fobj)
+    # bulk create skip signal
+    with span('search'):
+        search.index(latest_disaster_objs)
 
-            # delete unused file
-            if os.path.exists(filepath):
-                os.remove(filepath)
+    return len(disaster_objs)
 
 
 @transaction.atomic
@@ -250,8 +228,11 @@ def quake_recent():
     Result: 20211023095158.mmi.jpg
     """
     url = 'https://data.bmkg.go.id/DataMKG/TEWS/autogempa.json'
-    r = requests.get(url)
-    res = r.json()
+    with span('fetch'):
+        r = requests.get(url)
+
+    with span('parse'):
+        res = r.json()
     info_gempa = res.get('Infogempa', {})
     gempa = [info_gempa.get('gempa', {})]
     shakemap_base_url = 'https://data.bmkg.go.id/DataMKG/TEWS/'
@@ -323,25 +304,8 @@ def quake_recent():
 
         depth = numbers[0]
 
-        # locations, don't forget clean white space before save to db
-        locations = location.split(',')
-        locations_clean = [loc.strip().replace(' - ', '-')
-                           for loc in locations]
-
-        # separate level and location name
-        levels = [loc.split(' ')[0] for loc in locations_clean]
-
-        names = list()
-        for loc in locations_clean:
-            REMOVE_WORDS = ['Des.', 'Kel.', 'Kec.', 'Kab.']
-            for r in REMOVE_WORDS:
-                loc = loc.replace(r, '').strip()
-
-            l = loc.split(' ')
-            l.pop(0)
-            l = [i for i in l if i]
-
-            names.append(' '.join(l))
+        # locations, list of (severity, name, mmi_min, mmi_max)
+        felts = parse_felt(location)
 
         disaster_data = {
             'occur_at': local_datetime,
@@ -360,7 +324,10 @@ def quake_recent():
             ) \
             .exclude(eav__disaster_status=eav_disaster_status)
 
-        if local_datetime > last_saved_dt and not checker.exists():
+        with span('dedupe'):
+            is_new = local_datetime > last_saved_dt and not checker.exists()
+
+        if is_new:
             obj = Disaster(**disaster_data)
             disaster_objs.append(obj)
 
@@ -375,26 +342,25 @@ def quake_recent():
             })
 
             # collect locations
-            disaster_locations[index].append({
-                'names': names,
-                'levels': levels,
-            })
+            disaster_locations[index].extend(felts)
 
     if len(disaster_locations) > 0:
-        for index in disaster_locations:
-            names = disaster_locations[index][0]['names']
-            levels = disaster_locations[index][0]['levels']
+        gazetteer = get_gazetteer()
 
-            for i, name in enumerate(names):
-                severity = levels[i]
+        for index in disaster_locations:
+            felts = disaster_locations[index]
 
+            for severity, name, mmi_min, mmi_max in felts:
                 # build location object
                 # latitude and longitude set when user show disaster detail
                 obj = DisasterLocation(
                     administrative_area=name,
-                    severity=severity
+                    severity=severity,
+                    mmi_min=mmi_min,
+                    mmi_max=mmi_max
                 )
 
+                gazetteer.locate(obj, gazetteer.resolve_regency(name))
                 location_objs[index].append(obj)
 
     # Bulk create
@@ -402,9 +368,12 @@ def quake_recent():
     new_disaster_objs = sorted(disaster_objs, key=lambda d: d.occur_at)
 
     try:
-        Disaster.objects.bulk_create(new_disaster_objs, ignore_conflicts=False)
-    except Exception as e:
-        print(e)
+        with span('write'):
+            Disaster.objects.bulk_create(new_disaster_objs, ignore_conflicts=False)
+        incr('disasters_created', len(new_disaster_objs))
+    except Exception:
+        incr('errors', stage='write')
+        logger.exception('bulk create disaster failed')
 
     latest_disaster_objs = Disaster.objects \
         .order_by('-id')[:len(disaster_objs)]
@@ -418,7 +387,8 @@ def quake_recent():
                 value = attributes[key]
                 setattr(obj.eav, key, value)
 
-            obj.eav.save()
+            with span('eav'):
+                obj.eav.save()
 
         # set location
         locations = location_objs[index]
@@ -426,50 +396,35 @@ def quake_recent():
             setattr(x, 'disaster', obj)
 
         try:
-            DisasterLocation.objects.bulk_create(
-                locations,
-                ignore_conflicts=True
-            )
-        except Exception as e:
-            print(e)
-
-        # Set up the image URL and filename
-        filename = shakemap_url.split("/")[-1]
-
-        # Open the url image, set stream to True, this will return the stream content.
-        r = requests.get(shakemap_url, stream=True)
-
-        # Check if the image was retrieved successfully
-        if r.status_code == 200:
-            # Set decode_content value to True, otherwise the downloaded image file's size will be zero.
-            r.raw.decode_content = True
-
-            # Retrieve file from root path
-            filepath = os.path.join(settings.PROJECT_PATH, filename)
+            with span('write'):
+                DisasterLocation.objects.bulk_create(
+                    locations,
+                    ignore_conflicts=True
+                )
+        except Exception:
+            incr('errors', stage='write')
+            logger.exception('bulk create disaster location failed')
 
-            # Open a local file with wb ( write binary ) permission.
-            with open(filename, 'wb') as f:
-                shutil.copyfileobj(r.raw, f)
+        with span('attachment'):
+            # downloaded, deduplicated and resized by `process_shakemap` task
+            attach_shakemap(obj, shakemap_url)
 
-            with open(filepath, 'rb') as f:
-                fobj = File(f)
-                attachment = DisasterAttachment.objects.create(
-                    disaster=obj,
-                    identifier='shakemap'
-                )
-                attachment.file.save(filename, fobj)
+    # bulk create skip signal
+    with span('search'):
+        search.index(latest_disaster_objs)
 
-            # delete unused file
-            if os.path.exists(filepath):
-                os.remove(filepath)
+    return len(disaster_objs)
 
 
 @transaction.atomic
 def quake_realtime():
     url = 'https://inatews.bmkg.go.id/?act=realtimeev'
     param = {}
-    page = requests.get(url, params=param, verify=False)
-    soup = BeautifulSoup(page.content, "html.parser")
+    with span('fetch'):
+        page = requests.get(url, params=param, verify=False)
+
+    with span('parse'):
+        soup = BeautifulSoup(page.content, "html.parser")
     results = soup.find_all('form', {'name': 'myform'})
 
     disaster_objs = list()
@@ -477,6 +432,8 @@ def quake_realtime():
     location_objs = defaultdict(list)
     local_timezone = pytz.timezone('Asia/Jakarta')
     eav_disaster_status = 'preliminary'
+    geocoder = get_geocoder()
+    gazetteer = get_gazetteer()
 
     # last saved disaster
     last_saved = Disaster.objects \
@@ -529,7 +486,10 @@ def quake_realtime():
                     eav__disaster_status=status
                 )
 
-            if local_datetime > last_saved_dt and not checker.exists():
+            with span('dedupe'):
+                is_new = local_datetime > last_saved_dt and not checker.exists()
+
+            if is_new:
                 data = {
                     'title': area,
                     'occur_at': local_datetime,
@@ -553,6 +513,9 @@ def quake_realtime():
 
                 # collect location
                 obj = DisasterLocation(latitude=lintang, longitude=bujur,)
+                if geocoder:
+                    geocoder.fill(obj, gazetteer)
+
                 location_objs[index].append(obj)
 
     if len(disaster_objs) > 0:
@@ -560,12 +523,15 @@ def quake_realtime():
         new_disaster_objs = sorted(disaster_objs, key=lambda d: d.occur_at)
 
         try:
-            Disaster.objects.bulk_create(
-                new_disaster_objs,
-                ignore_conflicts=False
-            )
-        except Exception as e:
-            print(e)
+            with span('write'):
+                Disaster.objects.bulk_create(
+                    new_disaster_objs,
+                    ignore_conflicts=False
+                )
+            incr('disasters_created', len(new_disaster_objs))
+        except Exception:
+            incr('errors', stage='write')
+            logger.exception('bulk create disaster failed')
 
     latest_disaster_objs = Disaster.objects \
         .order_by('-id')[:len(disaster_objs)]
@@ -584,7 +550,8 @@ def quake_realtime():
                     else:
                         setattr(obj.eav, key, value)
 
-                obj.eav.save()
+                with span('eav'):
+                    obj.eav.save()
 
         # set location
         if len(location_objs) > 0:
@@ -593,9 +560,17 @@ def quake_realtime():
                 setattr(loc, 'disaster', obj)
 
             try:
-                DisasterLocation.objects.bulk_create(
-                    locations,
-                    ignore_conflicts=True
-                )
-            except Exception as e:
-                print(e)
+                with span('write'):
+                    DisasterLocation.objects.bulk_create(
+                        locations,
+                        ignore_conflicts=True
+                    )
+            except Exception:
+                incr('errors', stage='write')
+                logger.exception('bulk create disaster location failed')
+
+    # bulk create skip signal
+    with span('search'):
+        search.index(latest_disaster_objs)
+
+    return len(disaster_objs)
@@ -1,15 +1,84 @@
+import re
 import requests
 
+from decimal import Decimal
+
 from django.utils import timezone
 from django.apps import apps
 from django.db import transaction
 
 from bs4 import BeautifulSoup
+from celery.utils.log import get_task_logger
 from collections import defaultdict
-from core.constant import DisasterIdentifier
+from core.constant import (
+    DamageClassify,
+    DamageLevel,
+    DamageMetric,
+    DamageVariety,
+    DisasterIdentifier,
+    VictimClassify
+)
+from core.instrumentation import incr, span
+from apps.ews import summary
+from apps.generic import search
+from apps.generic.gazetteer import get_gazetteer
 
 Disaster = apps.get_registered_model('ews', 'Disaster')
 DisasterLocation = apps.get_registered_model('ews', 'DisasterLocation')
+DisasterVictim = apps.get_registered_model('ews', 'DisasterVictim')
+DisasterDamage = apps.get_registered_model('ews', 'DisasterDamage')
+
+logger = get_task_logger(__name__)
+
+URL = "https://dibi.bnpb.go.id/xdibi"
+START_RE = re.compile(r'[?&]start=(\d+)')
+
+# indonesian number, dot group thousand and comma is decimal;
+# `1.250.000,5`, a dot not followed by exactly 3 digit is decimal
+GROUPED_RE = re.compile(r'^\d{1,3}(\.\d{3})+(,\d+)?$')
+NUMBER_RE = re.compile(r'^\d+([.,]\d+)?$')
+
+# no data filled, same as empty
+PLACEHOLDERS = {'-', '--', '\u2013', '\u2014'}
+
+# input id in detail page casualty table
+VICTIM_FIELDS = {
+    'meninggal': VictimClassify.VIC101,
+    'hilang': VictimClassify.VIC102,
+    'terluka': VictimClassify.VIC103,
+    'menderita': VictimClassify.VIC104,
+    'mengungsi': VictimClassify.VIC105,
+}
+
+# input id in detail page damage table; (classify, variety, level, metric)
+_UNIT = DamageMetric.DAM102
+_HA = DamageMetric.DAM101
+_KM = DamageMetric.DAM103
+
+DAMAGE_FIELDS = {
+    'rumah_rusak_berat': (DamageClassify.DAC101, DamageVariety.DAV101, DamageLevel.DAL103, _UNIT),
+    'rumah_rusak_sedang': (DamageClassify.DAC101, DamageVariety.DAV101, DamageLevel.DAL102, _UNIT),
+    'rumah_rusak_ringan': (DamageClassify.DAC101, DamageVariety.DAV101, DamageLevel.DAL101, _UNIT),
+    'rumah_terendam': (DamageClassify.DAC101, DamageVariety.DAV101, DamageLevel.DAL999, _UNIT),
+    'fasilitas_pendidikan': (DamageClassify.DAC101, DamageVariety.DAV102, DamageLevel.DAL999, _UNIT),
+    'fasilitas_peribadatan': (DamageClassify.DAC101, DamageVariety.DAV103, DamageLevel.DAL999, _UNIT),
+    'fasilitas_kesehatan': (DamageClassify.DAC101, DamageVariety.DAV104, DamageLevel.DAL999, _UNIT),
+    'perkantoran': (DamageClassify.DAC101, DamageVariety.DAV105, DamageLevel.DAL999, _UNIT),
+    'fasilitas_umum': (DamageClassify.DAC101, DamageVariety.DAV106, DamageLevel.DAL999, _UNIT),
+    'jembatan': (DamageClassify.DAC101, DamageVariety.DAV107, DamageLevel.DAL999, _UNIT),
+    'pabrik': (DamageClassify.DAC101, DamageVariety.DAV108, DamageLevel.DAL999, _UNIT),
+    'pertokoan': (DamageClassify.DAC101, DamageVariety.DAV109, DamageLevel.DAL999, _UNIT),
+    'sawah': (DamageClassify.DAC102, DamageVariety.DAV110, DamageLevel.DAL999, _HA),
+    'kebun': (DamageClassify.DAC102, DamageVariety.DAV111, DamageLevel.DAL999, _HA),
+    'perkebunan': (DamageClassify.DAC102, DamageVariety.DAV112, DamageLevel.DAL999, _HA),
+    'lahan': (DamageClassify.DAC102, DamageVariety.DAV113, DamageLevel.DAL999, _HA),
+    'hutan': (DamageClassify.DAC102, DamageVariety.DAV114, DamageLevel.DAL999, _HA),
+    'kolam': (DamageClassify.DAC102, DamageVariety.DAV115, DamageLevel.DAL999, _HA),
+    'irigasi': (DamageClassify.DAC101, DamageVariety.DAV116, DamageLevel.DAL999, _KM),
+    'jalan': (DamageClassify.DAC101, DamageVariety.DAV117, DamageLevel.DAL999, _KM),
+    # filled in million rupiah, as the variety say
+    'kerugian': (DamageClassify.DAC103, DamageVariety.DAV118, DamageLevel.DAL999, DamageMetric.DAM105),
+}
 
 
 def tup_to_dict(tup, dict):
@@ -18,306 +87,504 @@ def tup_to_dict(tup, dict):
     return dict
 
 
-@transaction.atomic
-def dibi(param={}, request=None):
-    ALL = False
-    URL = "https://dibi.bnpb.go.id/xdibi"
-
-    identifier = param.get('identifier', '')  # default scrape all
-    start = param.get('start', 0)
-    fetch = param.get('fetch', None)
-
-    if request and request.user.is_superuser and fetch == 'all':
-        ALL = True
-
+def listing(identifier='', year='', start=0):
+    """
+    Rows of DIBI listing page, each row has `href`, `code` and `date`.
+    Return (rows, soup), soup used to read pagination.
+    """
     param = {
         'pr': '',
         'kb': '',
         'jn': identifier,
-        'th': '',
+        'th': year,
         'bl': '',
         'tb': 2,
         'st': 3,
         'start': start
     }
-    page = requests.get(URL, params=param, verify=False)
-    soup = BeautifulSoup(page.content, "html.parser")
-    results = soup.find(id='mytabel').findChildren('tr')
-    hrefs = list()
-    incidents = list()
-
-    # last saved disaster
-    last_saved = Disaster.objects.exclude(eav__disaster_status='preliminary')
-    if identifier:
-        last_saved = last_saved.filter(identifier=identifier)
-
-    last_saved = last_saved.order_by('id').last()
+    with span('fetch'):
+        page = requests.get(URL, params=param, verify=False)
 
-    future_date = timezone.datetime(int(1900), int(12), int(31))
-    last_scrapped = last_saved.occur_at if last_saved else future_date
+    with span('parse'):
+        soup = BeautifulSoup(page.content, "html.parser")
 
-    dictionary = {}
-    disaster_incidents = tup_to_dict(DisasterIdentifier.choices, dictionary)
+    results = soup.find(id='mytabel').findChildren('tr')
+    disaster_incidents = tup_to_dict(DisasterIdentifier.choices, {})
+    rows = list()
 
     for tr in results:
         # get href
-        _href = None
         _a = tr.find('a', {'title': 'Detail Bencana'})
-        if _a:
-            _href = _a['href']
+        if not _a:
+            continue
 
         # get incident name
+        _code = None
         _incident = tr.findAll('td')[3::3]
         if len(_incident) > 0:
             _name = _incident[0].get_text().lower()
-            _code = disaster_incidents.get(_name)
-
-            d = {
-                'label': _name,
-                'code': _code[0],
-            }
-            incidents.append(d)
+            _code = disaster_incidents.get(_name, [DisasterIdentifier.DIS999])[0]
 
         # by date
-        _date = tr.findAll('td')[1::1]
-        if len(_date) > 0:
-            x = _date[0]
+        _date = None
+        _dates = tr.findAll('td')[1::1]
+        if len(_dates) > 0:
+            x = _dates[0]
             year = x.find('span', {'title': 'Tahun'}).get_text()
             month = x.find('span', {'title': 'Bulan'}).get_text()
             day = x.find('span', {'title': 'Tanggal'}).get_text()
-            date = timezone.datetime(int(year), int(month), int(day)).date()
-            today = timezone.datetime.today().date()
+            _date = timezone.datetime(int(year), int(month), int(day)).date()
 
-            if _href:
-                if ALL:
-                    hrefs.append(_href)
-                else:
-                    if today == date and last_scrapped.date() < today:
-                        hrefs.append(_href)
+        rows.append({'href': _a['href'], 'code': _code, 'date': _date})
 
-    disaster_objs = list()
-    locations = list()
+    return rows, soup
 
-    # check has new data
-    if len(hrefs) <= 0:
-        return False
 
-    for index, href in enumerate(hrefs):
+def offsets(soup):
+    """All `start` offset from listing pagination link, include 0"""
+    found = {0}
+    for a in soup.find_all('a', href=True):
+        match = START_RE.search(a['href'])
+        if match:
+            found.add(int(match.group(1)))
+    return sorted(found)
+
+
+def _number(value):
+    """`1.250` -> 1250, `2.5` and `2,5` -> 2.5, empty or invalid -> None"""
+    value = (value or '').strip()
+
+    if GROUPED_RE.match(value):
+        value = value.replace('.', '')
+    elif not NUMBER_RE.match(value):
+        return None
+
+    return Decimal(value.replace(',', '.'))
+
+
+def _amount(value):
+    """
+    Amount of `value`, damage in hectare or kilometer may has
+    fraction. Empty or placeholder -> 0, invalid -> None.
+    """
+    value = (value or '').strip()
+    if not value or value in PLACEHOLDERS:
+        return 0
+    return _number(value)
+
+
+def impacts(soup):
+    """
+    Victim and damage from detail page casualty and damage table,
+    read all input once instead `soup.find` per field.
+    """
+    values = {
+        x['id']: x.get('value')
+        for x in soup.find_all('input', id=True)
+        if x['id'] in VICTIM_FIELDS or x['id'] in DAMAGE_FIELDS
+    }
+
+    victims = list()
+    damages = list()
+
+    for field, value in values.items():
+        amount = _amount(value)
+        if amount is None:
+            incr('errors', stage='parse')
+            continue
+
+        if amount <= 0:
+            continue
+
+        if field in VICTIM_FIELDS:
+            # people counted whole
+            if amount != amount.to_integral_value():
+                incr('errors', stage='parse')
+                continue
+
+            victims.append({
+                'classify': VICTIM_FIELDS[field],
+                'amount': int(amount),
+            })
+        else:
+            classify, variety, level, metric = DAMAGE_FIELDS[field]
+            damages.append({
+                'classify': classify,
+                'variety': variety,
+                'level': level,
+                'metric': metric,
+                'amount': amount,
+            })
+
+    return {'victims': victims, 'damages': damages}
+
+
+def detail(href, code):
+    """Read DIBI detail page, return (disaster data, location, impacts)"""
+    with span('fetch'):
         url = requests.get(href, verify=False)
+
+    with span('parse'):
         soup = BeautifulSoup(url.content, "html.parser")
-        incident_identifier = incidents[index]
-
-        nama_kejadian = soup.find(id='nama_kejadian').get('value')
-        latitude = soup.find(id='latitude').get('value')
-        longitude = soup.find(id='longitude').get('value')
-        keterangan = soup.find(id='keterangan').get_text()
-        sumber = soup.find(id='sumber').get('value')
-        tgl = soup.find(id='tgl').get('value')
-        id_jenis_bencana = soup.find(id='id_jenis_bencana').get('value')
-        prop = soup.find_all('input', {'name': 'prop'})[0].get('value')
-        kab = soup.find_all('input', {'name': 'kab'})[0].get('value')
-        penyebab = soup.find(id='penyebab').get_text()
-        kronologis = soup.find(id='kronologis').get_text()
-
-        # province name and code
-        prop_list = prop.split('.')
-        prop_name = prop_list[1].strip()
-        prop_code = prop_list[0].strip()
-
-        # city name and code
-        kab_list = kab.split('.')
-        kab_name = kab_list[1].strip()
-        kab_code = kab_list[0].strip()
-
-        locality = defaultdict(list)
-        sub_locality = defaultdict(list)
-
-        location = {
-            'latitude': latitude,
-            'longitude': longitude,
-            'administrative_area': {
-                'name': prop_name,
-                'code': prop_code,
-            },
-            'sub_administrative_area': {
-                'name': kab_name,
-                'code': kab_code,
-            },
-        }
 
-        states = soup.find(id='hal3').find_all('li')
-        kec_name = None
-        kec_code = None
-        des_name = None
-        des_code = None
+    nama_kejadian = soup.find(id='nama_kejadian').get('value')
+    latitude = soup.find(id='latitude').get('value')
+    longitude = soup.find(id='longitude').get('value')
+    keterangan = soup.find(id='keterangan').get_text()
+    sumber = soup.find(id='sumber').get('value')
+    tgl = soup.find(id='tgl').get('value')
+    prop = soup.find_all('input', {'name': 'prop'})[0].get('value')
+    kab = soup.find_all('input', {'name': 'kab'})[0].get('value')
+    penyebab = soup.find(id='penyebab').get_text()
+    kronologis = soup.find(id='kronologis').get_text()
+
+    # province name and code
+    prop_list = prop.split('.')
+    prop_name = prop_list[1].strip()
+    prop_code = prop_list[0].strip()
+
+    # city name and code
+    kab_list = kab.split('.')
+    kab_name = kab_list[1].strip()
+    kab_code = kab_list[0].strip()
+
+    locality = defaultdict(list)
+    sub_locality = defaultdict(list)
+
+    location = {
+        'latitude': latitude,
+        'longitude': longitude,
+        'administrative_area': {
+            'name': prop_name,
+            'code': prop_code,
+        },
+        'sub_administrative_area': {
+            'name': kab_name,
+            'code': kab_code,
+        },
+    }
 
-        for state in states:
-            state_name = state.get_text()
-            state_name_list = state_name.split('.')
+    states = soup.find(id='hal3').find_all('li')
+    kec_code = None
 
-            # kecamatan
-            locality[kab_code]
+    for state in states:
+        state_name = state.get_text()
+        state_name_list = state_name.split('.')
 
-            if 'Kec.' in state_name:
-                kec_name = state_name_list[2].strip()
-                kec_code = state_name_list[0].strip()
+        # kecamatan
+        locality[kab_code]
 
-                locality[kab_code].append({
-                    'name': kec_name,
-                    'code': kec_code,
-                })
+        if 'Kec.' in state_name:
+            kec_name = state_name_list[2].strip()
+            kec_code = state_name_list[0].strip()
 
-            location.update({
-                'locality': locality
+            locality[kab_code].append({
+                'name': kec_name,
+                'code': kec_code,
             })
 
-            # desa
-            sub_locality[kec_code]
+        location.update({
+            'locality': locality
+        })
 
-            if 'Desa' in state_name:
-                des_name = state_name_list[1].replace('Desa', '').strip()
-                des_code = state_name_list[0].strip()
+        # desa
+        sub_locality[kec_code]
 
-                sub_locality[kec_code].append({
-                    'name': des_name,
-                    'code': des_code,
-                })
+        if 'Desa' in state_name:
+            des_name = state_name_list[1].replace('Desa', '').strip()
+            des_code = state_name_list[0].strip()
 
-            location.update({
-                'sub_locality': sub_locality
+            sub_locality[kec_code].append({
+                'name': des_name,
+                'code': des_code,
             })
 
+        location.update({
+            'sub_locality': sub_locality
+        })
+
+    data = {
+        'identifier': code,
+        'title': nama_kejadian,
+        'occur_at': tgl,
+        'source': sumber,
+        'description': keterangan,
+        'reason': penyebab,
+        'chronology': kronologis,
+    }
+
+    with span('parse'):
+        impact = impacts(soup)
+
+    return data, location, impact
+
+
+def _key(identifier, title, occur_at):
+    if isinstance(occur_at, str):
+        occur_at = timezone.datetime.strptime(occur_at, '%Y-%m-%d')
+    elif timezone.is_aware(occur_at):
+        occur_at = timezone.localtime(occur_at)
+    return (identifier, title, occur_at.date())
+
+
+def _build_locations(obj, y):
+    latitude = y.get('latitude')
+    longitude = y.get('longitude')
+    level_1 = y.get('administrative_area')
+    level_2 = y.get('sub_administrative_area')
+    level_3 = y.get('locality')
+    level_4 = y.get('sub_locality')
+
+    _l1_name = level_1.get('name')
+    _l1_code = level_1.get('code')
+
+    _l2_name = level_2.get('name')
+    _l2_code = level_2.get('code')
+
+    _common_location = {
+        'disaster': obj,
+        'country': 'Indonesia'.upper(),
+        'country_code': 'ID',
+
+        'latitude': latitude,
+        'longitude': longitude,
+
+        'administrative_area': _l1_name.upper(),
+        'administrative_area_code': _l1_code,
+
+        'sub_administrative_area': _l2_name.upper(),
+        'sub_administrative_area_code': _l2_code,
+    }
+
+    objs = list()
+
+    if level_3:
+        for l3 in level_3.get(_l2_code):
+            _l3_code = l3.get('code')
+            l4 = level_4.get(_l3_code)
+
+            if not l4:
+                objs.append(DisasterLocation(
+                    **_common_location,
+
+                    locality=l3.get('name'),
+                    locality_code=_l3_code,
+                ))
+            else:
+                for _l4 in l4:
+                    objs.append(DisasterLocation(
+                        **_common_location,
+
+                        locality=l3.get('name'),
+                        locality_code=_l3_code,
+
+                        sub_locality=_l4.get('name'),
+                        sub_locality_code=_l4.get('code'),
+                    ))
+    else:
+        objs.append(DisasterLocation(**_common_location))
+
+    return objs
+
+
+@transaction.atomic
+def save(items):
+    """
+    Create disaster from list of (data, location, impacts), skip the existing one
+    so safe to run again with the same page. Return number created.
+    """
+    disaster_objs = list()
+    locations = dict()
+    impact_by_key = dict()
+
+    for data, location, impact in items:
         # check exists in database or not
-        occur_at = timezone.datetime.strptime(tgl, '%Y-%m-%d')
+        occur_at = timezone.datetime.strptime(data['occur_at'], '%Y-%m-%d')
 
         checker = Disaster.objects.filter(
-            identifier=incident_identifier.get('code'),
-            title=nama_kejadian,
+            identifier=data['identifier'],
+            title=data['title'],
             occur_at=occur_at
         ).exclude(eav__disaster_status='preliminary')
 
-        if not checker.exists():
-            disaster_obj = Disaster(
-                identifier=incident_identifier.get('code'),
-                title=nama_kejadian,
-                occur_at=tgl,
-                source=sumber,
-                description=keterangan,
-                reason=penyebab,
-                chronology=kronologis
-            )
+        with span('dedupe'):
+            is_new = not checker.exists()
 
-            disaster_objs.append(disaster_obj)
-            locations.append(location)
+        key = _key(data['identifier'], data['title'], data['occur_at'])
+        if is_new and key not in locations:
+            disaster_objs.append(Disaster(**data))
+            locations[key] = location
+            impact_by_key[key] = impact
 
     # stop her if not data to be created
     if len(disaster_objs) <= 0:
-        return False
+        return 0
 
     # insert disaster to database
     # sorted by occur_at
     new_disaster_objs = sorted(disaster_objs, key=lambda d: d.occur_at)
 
     try:
-        Disaster.objects.bulk_create(new_disaster_objs, ignore_conflicts=False)
-    except Exception as e:
-        print(e)
+        with span('write'):
+            Disaster.objects.bulk_create(new_disaster_objs, ignore_conflicts=False)
+        incr('disasters_created', len(new_disaster_objs))
+    except Exception:
+        incr('errors', stage='write')
+        logger.exception('bulk create disaster failed')
+
+    # read back by natural key, other worker may insert at the same time
+    # so `order_by('-id')[:n]` not safe
+    created_objs = Disaster.objects \
+        .filter(
+            identifier__in={x.identifier for x in disaster_objs},
+            title__in={x.title for x in disaster_objs},
+            locations__isnull=True
+        ) \
+        .exclude(eav__disaster_status='preliminary')
 
     disaster_location_objs = list()
-    latest_disaster_objs = Disaster.objects.order_by('-id')[:10]
-
-    for index, obj in enumerate(latest_disaster_objs):
-        try:
-            y = locations[index]
-        except IndexError:
-            y = None
-
-        if y:
-            latitude = y.get('latitude')
-            longitude = y.get('longitude')
-            level_1 = y.get('administrative_area')
-            level_2 = y.get('sub_administrative_area')
-            level_3 = y.get('locality')
-            level_4 = y.get('sub_locality')
-
-            _l1_name = level_1.get('name')
-            _l1_code = level_1.get('code')
-
-            _l2_name = level_2.get('name')
-            _l2_code = level_2.get('code')
-
-            _common_location = {
-                'disaster': obj,
-                'country': 'Indonesia'.upper(),
-                'country_code': 'ID',
-
-                'latitude': latitude,
-                'longitude': longitude,
-
-                'administrative_area': _l1_name.upper(),
-                'administrative_area_code': _l1_code,
-
-                'sub_administrative_area': _l2_name.upper(),
-                'sub_administrative_area_code': _l2_code,
-            }
-
-            if level_3:
-                for l3 in level_3.get(_l2_code):
-                    _l3_code = l3.get('code')
-                    l4 = level_4.get(_l3_code)
-
-                    if not l4:
-                        location_obj = DisasterLocation(
-                            **_common_location,
-
-                            locality=l3.get('name'),
-                            locality_code=_l3_code,
-                        )
-
-                        disaster_location_objs.append(location_obj)
-                    else:
-                        for _l4 in l4:
-                            _l4_code = _l4.get('code')
-                            location_obj = DisasterLocation(
-                                **_common_location,
-
-                                locality=l3.get('name'),
-                                locality_code=_l3_code,
-
-                                sub_locality=_l4.get('name'),
-                                sub_locality_code=_l4_code,
-                            )
-
-                            disaster_location_objs.append(location_obj)
-            else:
-                location_obj = DisasterLocation(**_common_location)
-                disaster_location_objs.append(location_obj)
-
-            # set attribute
-            attributes = {
-                'disaster_source_origin': 'bnpb-dipi',
-            }
+    victim_objs = list()
+    damage_objs = list()
+
+    for obj in created_objs:
+        key = _key(obj.identifier, obj.title, obj.occur_at)
+        y = locations.pop(key, None)
+        if not y:
+            continue
+
+        disaster_location_objs.extend(_build_locations(obj, y))
+
+        impact = impact_by_key.get(key, {})
+        victim_objs.extend(
+            DisasterVictim(disaster=obj, **x) for x in impact.get('victims', [])
+        )
+        damage_objs.extend(
+            DisasterDamage(disaster=obj, **x) for x in impact.get('damages', [])
+        )
+
+        # set attribute
+        attributes = {
+            'disaster_source_origin': 'bnpb-dipi',
+        }
 
-            if obj.identifier == Disaster._Identifier.DIS108:
-                attributes.update({
-                    'disaster_epicenter_latitude': latitude,
-                    'disaster_epicenter_longitude': longitude,
-                })
+        if obj.identifier == Disaster._Identifier.DIS108:
+            attributes.update({
+                'disaster_epicenter_latitude': y.get('latitude'),
+                'disaster_epicenter_longitude': y.get('longitude'),
+            })
 
-            for key in attributes:
-                value = attributes[key]
-                setattr(obj.eav, key, value)
+        for key in attributes:
+            value = attributes[key]
+            setattr(obj.eav, key, value)
 
+        with span('eav'):
             obj.eav.save()
 
+    # link to gazetteer by code, no query needed
+    gazetteer = get_gazetteer()
+    for location_obj in disaster_location_objs:
+        area = gazetteer.most_specific(
+            location_obj.sub_locality_code,
+            location_obj.locality_code,
+            location_obj.sub_administrative_area_code,
+            location_obj.administrative_area_code,
+        )
+        gazetteer.locate(location_obj, area)
+
     # insert disaster location
     if len(disaster_location_objs) > 0:
         try:
-            DisasterLocation.objects.bulk_create(
-                disaster_location_objs,
-                ignore_conflicts=False
+            with span('write'):
+                DisasterLocation.objects.bulk_create(
+                    disaster_location_objs,
+                    ignore_conflicts=False
+                )
+        except Exception:
+            incr('errors', stage='write')
+            logger.exception('bulk create disaster location failed')
+
+    # bulk create skip signal
+    with span('search'):
+        search.index(created_objs)
+
+    # insert victim and damage
+    try:
+        with span('write'):
+            DisasterVictim.objects.bulk_create(victim_objs)
+            DisasterDamage.objects.bulk_create(damage_objs)
+    except Exception:
+        incr('errors', stage='write')
+        logger.exception('bulk create victim and damage failed')
+    else:
+        # province is the first location, same as `summary.rebuild()`
+        areas = dict()
+        for location_obj in disaster_location_objs:
+            areas.setdefault(
+                location_obj.disaster_id,
+                location_obj.administrative_area_code
             )
-        except Exception as e:
-            print(e)
 
-    return True
+        summary.add(victim_objs, damage_objs, areas=areas)
+
+    # number of new disaster, used by adaptive polling
+    return len(disaster_objs)
+
+
+def dibi(param={}, request=None):
+    ALL = False
+
+    identifier = param.get('identifier', '')  # default scrape all
+    start = param.get('start', 0)
+    fetch = param.get('fetch', None)
+
+    if request and request.user.is_superuser and fetch == 'all':
+        ALL = True
+
+    rows, _soup = listing(identifier=identifier, start=start)
+
+    # last saved disaster
+    last_saved = Disaster.objects.exclude(eav__disaster_status='preliminary')
+    if identifier:
+        last_saved = last_saved.filter(identifier=identifier)
+
+    last_saved = last_saved.order_by('id').last()
+
+    future_date = timezone.datetime(int(1900), int(12), int(31))
+    last_scrapped = last_saved.occur_at if last_saved else future_date
+    today = timezone.datetime.today().date()
+
+    rows = [
+        x for x in rows
+        if ALL or (today == x['date'] and last_scrapped.date() < today)
+    ]
+
+    # check has new data
+    if len(rows) <= 0:
+        return 0
+
+    return save([detail(x['href'], x['code']) for x in rows])
+
+
+def dibi_pages(identifier='', year='', start=0, end=None, on_page=None):
+    """
+    Scrape listing from offset `start` until `end` (exclusive)
+    or until listing empty. `on_page(next_offset, created)` called
+    after each page saved, used to checkpoint.
+    Return number of disaster created.
+    """
+    offset = start
+    total = 0
+
+    while end is None or offset < end:
+        rows, _soup = listing(identifier=identifier, year=year, start=offset)
+        if len(rows) <= 0:
+            break
+
+        created = save([detail(x['href'], x['code']) for x in rows])
+        total += created
+        offset += len(rows)
+
+        if on_page:
+            on_page(offset, created)
+
+    return total
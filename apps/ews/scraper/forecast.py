@@ -0,0 +1,189 @@
+import os
+import pytz
+import requests
+
+from xml.etree.ElementTree import ParseError, iterparse
+
+from celery.utils.log import get_task_logger
+from urllib3.exceptions import HTTPError
+
+from django.apps import apps
+from django.db import transaction
+from django.utils import timezone
+
+from apps.ews.conf import settings
+from core.instrumentation import incr, span
+
+WeatherForecast = apps.get_registered_model('ews', 'WeatherForecast')
+
+logger = get_task_logger(__name__)
+
+# DigitalForecast-<Province>.xml
+PROVINCES = [
+    'Aceh', 'Bali', 'BangkaBelitung', 'Banten', 'Bengkulu',
+    'DIYogyakarta', 'DKIJakarta', 'Gorontalo', 'Jambi', 'JawaBarat',
+    'JawaTengah', 'JawaTimur', 'KalimantanBarat', 'KalimantanSelatan',
+    'KalimantanTengah', 'KalimantanTimur', 'KalimantanUtara',
+    'KepulauanRiau', 'Lampung', 'Maluku', 'MalukuUtara',
+    'NusaTenggaraBarat', 'NusaTenggaraTimur', 'Papua', 'PapuaBarat',
+    'Riau', 'SulawesiBarat', 'SulawesiSelatan', 'SulawesiTengah',
+    'SulawesiTenggara', 'SulawesiUtara', 'SumateraBarat',
+    'SumateraSelatan', 'SumateraUtara',
+]
+
+LANG = '{http://www.w3.org/XML/1998/namespace}lang'
+
+
+def _datetime(value, format):
+    try:
+        value = timezone.datetime.strptime(value.strip(), format)
+    except (AttributeError, ValueError):
+        return None
+    return value.replace(tzinfo=pytz.utc)
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse(stream):
+    """
+    Yield forecast row as dict from DigitalForecast XML.
+
+    Streaming, each <timerange> cleared after read and each <area>
+    removed from <forecast> so memory stay bounded whatever file size.
+    """
+    forecast = None
+    issued_at = None
+    area = None
+    parameter = None
+
+    for event, elem in iterparse(stream, events=('start', 'end')):
+        tag = elem.tag
+
+        if event == 'start':
+            if tag == 'forecast':
+                forecast = elem
+            elif tag == 'area':
+                area = {
+                    'domain': elem.get('domain') or forecast.get('domain'),
+                    'area_code': elem.get('id'),
+                    'area_name': elem.get('description'),
+                    'area_type': elem.get('type'),
+                    'latitude': _float(elem.get('latitude')),
+                    'longitude': _float(elem.get('longitude')),
+                    'issued_at': issued_at,
+                }
+            elif tag == 'parameter':
+                parameter = elem.get('id')
+            continue
+
+        if tag == 'timestamp':
+            issued_at = _datetime(elem.text, '%Y%m%d%H%M%S')
+
+        elif tag == 'name' and area is not None:
+            # prefer Indonesian name
+            if elem.get(LANG) == 'id_ID' and elem.text:
+                area['area_name'] = elem.text.strip()
+
+        elif tag == 'timerange' and area is not None:
+            # first value is the main unit, eg; C for temperature
+            value = elem.find('value')
+            if value is not None:
+                yield {
+                    **area,
+                    'parameter': parameter,
+                    'timerange': elem.get('type'),
+                    'forecast_at': _datetime(elem.get('datetime'), '%Y%m%d%H%M'),
+                    'value': (value.text or '').strip() or None,
+                    'unit': value.get('unit'),
+                }
+            elem.clear()
+
+        elif tag == 'area':
+            area = None
+            if forecast is not None:
+                forecast.remove(elem)
+            elem.clear()
+
+
+def _open(source):
+    if source.startswith('http://') or source.startswith('https://'):
+        r = requests.get(source, stream=True, timeout=60)
+        r.raise_for_status()
+        r.raw.decode_content = True
+        return r.raw
+    return open(source, 'rb')
+
+
+@transaction.atomic
+def ingest(source, batch_size=None):
+    """
+    Replace forecast of the province in `source` (url or file path).
+    Return number of rows created.
+    """
+    batch_size = batch_size or settings.EWS_FORECAST_BATCH_SIZE
+    domains = set()
+    objs = list()
+    total = 0
+
+    stream = _open(source)
+    try:
+        for row in parse(stream):
+            if row['forecast_at'] is None:
+                continue
+
+            # old issue removed once per province
+            if row['domain'] not in domains:
+                domains.add(row['domain'])
+                WeatherForecast.objects.filter(domain=row['domain']).delete()
+
+            objs.append(WeatherForecast(**row))
+            if len(objs) >= batch_size:
+                with span('write'):
+                    WeatherForecast.objects.bulk_create(objs)
+                total += len(objs)
+                objs = list()
+    finally:
+        stream.close()
+
+    if len(objs) > 0:
+        with span('write'):
+            WeatherForecast.objects.bulk_create(objs)
+        total += len(objs)
+
+    incr('forecast_rows_created', total)
+    return total
+
+
+def forecast(source=None, provinces=None, batch_size=None):
+    """
+    Ingest all province files from `source`, base url or
+    directory contain DigitalForecast-<Province>.xml
+    """
+    source = source or settings.EWS_FORECAST_SOURCE
+    total = 0
+
+    for province in provinces or PROVINCES:
+        filename = 'DigitalForecast-%s.xml' % province
+        if source.startswith('http://') or source.startswith('https://'):
+            path = source.rstrip('/') + '/' + filename
+        else:
+            path = os.path.join(source, filename)
+            if not os.path.exists(path):
+                continue
+
+        # one bad file not abort the rest, its province rolled back
+        try:
+            total += ingest(path, batch_size=batch_size)
+        except requests.RequestException as e:
+            incr('errors', stage='fetch')
+            logger.warning('fetch %s failed: %s' % (filename, e))
+        except (ParseError, HTTPError, OSError) as e:
+            incr('errors', stage='parse')
+            logger.warning('parse %s failed: %s' % (filename, e))
+
+    return total
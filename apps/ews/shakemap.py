@@ -0,0 +1,149 @@
+"""
+Shakemap download, content hash deduplication and WebP derivative.
+
+Scraper only create the attachment row, `process_shakemap` task fill
+it after commit. The same event from `quake` and `quake_recent` (same
+name or same content) reuse the stored file instead saved again, and
+derivative named by content hash so generated once for all.
+"""
+import hashlib
+import io
+import mimetypes
+
+from functools import partial
+
+import requests
+
+from django.apps import apps
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+
+from apps.ews.conf import settings
+
+DisasterAttachment = apps.get_registered_model('ews', 'DisasterAttachment')
+
+DERIVATIVE_PATH = 'attachment/derivative/%s/%s-%s.webp'
+
+
+def get_checksum(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def get_derivative_name(checksum, name):
+    return DERIVATIVE_PATH % (checksum[:2], checksum, name)
+
+
+def render(data, sizes, quality=80):
+    """
+    Image bytes to {name: WebP bytes}, each fit inside `sizes[name]` pixel.
+    Not touch django so can run in process pool.
+    """
+    from PIL import Image
+
+    result = dict()
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert('RGB')
+
+        for name, size in sizes.items():
+            resized = image.copy()
+            resized.thumbnail((size, size), Image.LANCZOS)
+
+            output = io.BytesIO()
+            resized.save(output, 'WEBP', quality=quality, method=4)
+            result[name] = output.getvalue()
+
+    return result
+
+
+def get_missing(checksum):
+    """Derivative sizes not stored yet for this content"""
+    return {
+        name: size for name, size in settings.EWS_SHAKEMAP_SIZES.items()
+        if not default_storage.exists(get_derivative_name(checksum, name))
+    }
+
+
+def save_derivatives(attachment, rendered=None):
+    """Store `rendered` and point attachment to all derivatives of its content"""
+    for name, content in (rendered or {}).items():
+        path = get_derivative_name(attachment.checksum, name)
+        if not default_storage.exists(path):
+            default_storage.save(path, ContentFile(content))
+
+    for name in settings.EWS_SHAKEMAP_SIZES:
+        setattr(attachment, name, get_derivative_name(attachment.checksum, name))
+
+    attachment.save(update_fields=list(settings.EWS_SHAKEMAP_SIZES))
+
+
+def copy_from(attachment, source):
+    """Share stored file and derivative of `source`"""
+    attachment.file.name = source.file.name
+    attachment.checksum = source.checksum
+    attachment.filemime = source.filemime
+    attachment.thumbnail.name = source.thumbnail.name
+    attachment.preview.name = source.preview.name
+    attachment.save()
+
+
+def store(attachment, data, filename):
+    """Save `data` as attachment file, reuse stored file of the same content"""
+    attachment.checksum = get_checksum(data)
+    attachment.filemime = mimetypes.guess_type(filename)[0]
+
+    existing = DisasterAttachment.objects \
+        .filter(checksum=attachment.checksum) \
+        .exclude(pk=attachment.pk) \
+        .filter(file__gt='') \
+        .first()
+
+    if existing:
+        attachment.file.name = existing.file.name
+    else:
+        attachment.file.save(filename, ContentFile(data), save=False)
+
+    attachment.save()
+    return existing is None
+
+
+def process(attachment_id, url):
+    """Download, dedupe and make derivative of one attachment"""
+    attachment = DisasterAttachment.objects.get(pk=attachment_id)
+
+    # same shakemap already processed for other scraper
+    existing = DisasterAttachment.objects \
+        .filter(identifier=attachment.identifier, name=attachment.name) \
+        .exclude(pk=attachment.pk) \
+        .exclude(checksum__isnull=True) \
+        .filter(thumbnail__gt='') \
+        .first()
+
+    if existing:
+        copy_from(attachment, existing)
+        return False
+
+    r = requests.get(url, timeout=30)
+    r.raise_for_status()
+    data = r.content
+
+    stored = store(attachment, data, attachment.name or url.split('/')[-1])
+
+    missing = get_missing(attachment.checksum)
+    rendered = render(data, missing, settings.EWS_SHAKEMAP_QUALITY) if missing else None
+    save_derivatives(attachment, rendered)
+    return stored
+
+
+def attach_shakemap(disaster, url):
+    """Create shakemap attachment of `disaster`, file filled by task after commit"""
+    from apps.ews.tasks import process_shakemap
+
+    attachment = DisasterAttachment.objects.create(
+        disaster=disaster,
+        identifier='shakemap',
+        name=url.split('/')[-1]
+    )
+
+    transaction.on_commit(partial(process_shakemap.delay, attachment.id, url))
+    return attachment
@@ -0,0 +1,251 @@
+"""
+Victim and damage total per month and province.
+
+Scraper call `add()` right after victim and damage created so the
+summary table always up to date, API only read the summary table.
+`rebuild()` compute all from raw table, run nightly to fix drift
+from admin edit or deleted disaster.
+"""
+import numpy as np
+
+from django.apps import apps
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import DateField, DecimalField, F, Sum
+from django.db.models.functions import ExtractYear, TruncMonth
+from django.utils import timezone
+
+from core.instrumentation import span
+
+DisasterLocation = apps.get_registered_model('ews', 'DisasterLocation')
+DisasterVictim = apps.get_registered_model('ews', 'DisasterVictim')
+DisasterDamage = apps.get_registered_model('ews', 'DisasterDamage')
+VictimSummary = apps.get_registered_model('ews', 'VictimSummary')
+DamageSummary = apps.get_registered_model('ews', 'DamageSummary')
+Checkpoint = apps.get_registered_model('ews', 'Checkpoint')
+
+NATIONAL = ''
+VERSION_KEY = 'ews-summary:version'
+
+# checkpoint row locked by `add` and `rebuild`
+LOCK = 'ews-summary'
+
+# kind: (raw model, summary model, key fields after period and area_code)
+KINDS = {
+    'victim': (DisasterVictim, VictimSummary, ('classify',)),
+    'damage': (DisasterDamage, DamageSummary, ('classify', 'level', 'metric')),
+}
+
+
+def get_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_version():
+    """Invalidate all cached API response"""
+    cache.add(VERSION_KEY, 1, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def lock():
+    """Serialize `add` and `rebuild`, held until transaction end"""
+    Checkpoint.objects.get_or_create(name=LOCK)
+    Checkpoint.objects.select_for_update().get(name=LOCK)
+
+
+def get_period(value):
+    """Datetime -> first day of the month in local time"""
+    if timezone.is_aware(value):
+        value = timezone.localtime(value)
+    return value.date().replace(day=1)
+
+
+def get_areas(disaster_ids):
+    """Province code of each disaster, taken from the first location"""
+    areas = dict()
+    queryset = DisasterLocation.objects \
+        .filter(disaster_id__in=disaster_ids) \
+        .order_by('disaster_id', 'id') \
+        .values_list('disaster_id', 'administrative_area_code')
+
+    for disaster_id, code in queryset.iterator():
+        areas.setdefault(disaster_id, code or NATIONAL)
+    return areas
+
+
+def _apply(model, totals):
+    for key, amount in totals.items():
+        lookup = dict(key)
+        updated = model.objects.filter(**lookup) \
+            .update(amount=F('amount') + amount)
+
+        if updated:
+            continue
+
+        try:
+            with transaction.atomic():
+                model.objects.create(amount=amount, **lookup)
+        except IntegrityError:
+            # created by other worker
+            model.objects.filter(**lookup).update(amount=F('amount') + amount)
+
+
+def add(victim_objs=None, damage_objs=None, areas=None):
+    """
+    Add new victim and damage to summary, `areas` is {disaster_id: province code}
+    when already known by caller, otherwise read from location.
+    """
+    objs = {'victim': victim_objs or [], 'damage': damage_objs or []}
+    if not any(objs.values()):
+        return
+
+    if areas is None:
+        areas = get_areas({x.disaster_id for v in objs.values() for x in v})
+
+    with span('summary'), transaction.atomic():
+        # rebuild not delete this increment
+        lock()
+
+        for kind, items in objs.items():
+            _, model, fields = KINDS[kind]
+            totals = dict()
+
+            for obj in items:
+                if not obj.amount:
+                    continue
+
+                period = get_period(obj.disaster.occur_at)
+                values = tuple((f, getattr(obj, f)) for f in fields)
+
+                for area in {areas.get(obj.disaster_id) or NATIONAL, NATIONAL}:
+                    key = (('period', period), ('area_code', area)) + values
+                    totals[key] = totals.get(key, 0) + obj.amount
+
+            _apply(model, totals)
+
+        # request before commit not cache old total under new version
+        transaction.on_commit(bump_version)
+
+
+def reduce(keys, amounts):
+    """
+    Sum `amounts` of the same key row, vectorized.
+    `keys` is 2d string array, return (unique keys, totals)
+    """
+    uniques, inverse = np.unique(keys, axis=0, return_inverse=True)
+    inverse = inverse.ravel()
+
+    # sort by group then sum each contiguous block, exact for int64
+    # and Decimal where bincount weights go through float
+    order = np.argsort(inverse, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(inverse[order]) != 0])
+    totals = np.add.reduceat(amounts[order], starts)
+    return uniques, totals
+
+
+def compute(kind):
+    """All summary rows of `kind` from raw table, not saved"""
+    raw, model, fields = KINDS[kind]
+    rows = list(
+        raw.objects
+        .exclude(amount=0)
+        .annotate(period=TruncMonth('disaster__occur_at', output_field=DateField()))
+        .values_list('period', 'disaster_id', *fields, 'amount')
+        .iterator()
+    )
+
+    if not rows:
+        return []
+
+    areas = get_areas({x[1] for x in rows})
+    keys = np.array(
+        [(x[0].isoformat(), areas.get(x[1]) or NATIONAL, *x[2:-1]) for x in rows],
+        dtype=str
+    )
+    # damage amount is Decimal, summed exactly as object
+    decimal = isinstance(raw._meta.get_field('amount'), DecimalField)
+    amounts = np.array([x[-1] for x in rows], dtype=object if decimal else np.int64)
+
+    # national is the same rows with empty area
+    national = keys.copy()
+    national[:, 1] = NATIONAL
+    provincial = keys[:, 1] != NATIONAL
+
+    keys = np.concatenate((keys[provincial], national))
+    amounts = np.concatenate((amounts[provincial], amounts))
+    uniques, totals = reduce(keys, amounts)
+
+    return [
+        model(
+            period=timezone.datetime.strptime(key[0], '%Y-%m-%d').date(),
+            area_code=key[1],
+            amount=total,
+            **dict(zip(fields, key[2:]))
+        )
+        for key, total in zip(uniques.tolist(), totals.tolist())
+    ]
+
+
+def rebuild(kinds=None):
+    """Replace summary table with total from raw table, return rows per kind"""
+    result = dict()
+
+    for kind in kinds or KINDS:
+        _, model, _ = KINDS[kind]
+
+        # computed under lock, `add` meanwhile wait and counted after
+        with transaction.atomic():
+            lock()
+            objs = compute(kind)
+            model.objects.all().delete()
+            model.objects.bulk_create(objs, batch_size=1000)
+
+            transaction.on_commit(bump_version)
+
+        result[kind] = len(objs)
+
+    return result
+
+
+def totals(kind, area=NATIONAL, start=None, end=None, group='month'):
+    """
+    Read total from summary table, `group` is month, year or total.
+    Period of month grouped row is `YYYY-MM-DD`, year is `YYYY`.
+    """
+    _, model, fields = KINDS[kind]
+    queryset = model.objects.filter(area_code=area)
+
+    if start:
+        queryset = queryset.filter(period__gte=start)
+
+    if end:
+        queryset = queryset.filter(period__lte=end)
+
+    if group == 'month':
+        queryset = queryset \
+            .values('period', *fields, 'amount') \
+            .order_by('period', *fields)
+
+        return [{**x, 'period': x['period'].isoformat()} for x in queryset]
+
+    if group == 'year':
+        queryset = queryset \
+            .annotate(year=ExtractYear('period')) \
+            .values('year', *fields) \
+            .annotate(total=Sum('amount')) \
+            .order_by('year', *fields)
+
+        return [
+            {'period': str(x['year']), **{f: x[f] for f in fields}, 'amount': x['total']}
+            for x in queryset
+        ]
+
+    queryset = queryset \
+        .values(*fields) \
+        .annotate(total=Sum('amount')) \
+        .order_by(*fields)
+
+    return [{**{f: x[f] for f in fields}, 'amount': x['total']} for x in queryset]
@@ -1,8 +1,19 @@
-from celery import shared_task
+import requests
+
+from celery import chord, shared_task
 from celery.utils.log import get_task_logger
 
-from .scraper.bnpb import dibi
+from core.instrumentation import collect, span
+
+from .scraper.bnpb import dibi, dibi_pages, listing, offsets
 from .scraper.bmkg import quake, quake_realtime, quake_recent
+from .scraper.forecast import forecast
+from .matcher.quake import reconcile
+from .matcher.dedupe import dedupe
+from .polling import record
+from .shakemap import process
+from .summary import rebuild
+from .utils import get_checkpoint, set_checkpoint
 
 logger = get_task_logger(__name__)
 
@@ -11,25 +22,190 @@ logger = get_task_logger(__name__)
 def scraping_bnpb_dipi():
     logger.info('scraping bnpb dipi...')
 
-    scrape = dibi()
-    if scrape is None:
-        logger.info('has data...')
-    logger.info('no data...')
+    with collect(task='scraping_bnpb_dipi') as metrics:
+        found = dibi()
+        logger.info('%s new disaster...' % found)
+
+        interval = record('bnpb-dipi', found)
+        logger.info('next poll in %ss...' % interval)
+
+        # own queue, not hold the scraping worker
+        dedupe_disaster.delay()
+
+    return {'found': found, 'metrics': metrics.snapshot()}
 
 
 @shared_task(name='scraping_bmkg_quake')
 def scraping_bmkg_quake():
     logger.info('scraping bmkg quake...')
-    quake()
+
+    with collect(task='scraping_bmkg_quake') as metrics:
+        found = quake()
+        logger.info('%s new quake, next poll in %ss...' % (
+            found, record('bmkg-tews-feel', found)
+        ))
+
+        reconcile_bmkg_quake.delay()
+
+    return {'found': found, 'metrics': metrics.snapshot()}
 
 
 @shared_task(name='scraping_bmkg_quake_recent')
 def scraping_bmkg_quake_recent():
     logger.info('scraping bmkg quake recent...')
-    quake_recent()
+
+    with collect(task='scraping_bmkg_quake_recent') as metrics:
+        found = quake_recent()
+        logger.info('%s new quake, next poll in %ss...' % (
+            found, record('bmkg-tews-recent', found)
+        ))
+
+        reconcile_bmkg_quake.delay()
+
+    return {'found': found, 'metrics': metrics.snapshot()}
 
 
 @shared_task(name='scraping_bmkg_quake_realtime')
 def scraping_bmkg_quake_realtime():
     logger.info('scraping bmkg quake realtime...')
-    quake_realtime()
+
+    with collect(task='scraping_bmkg_quake_realtime') as metrics:
+        found = quake_realtime()
+        logger.info('%s new quake, next poll in %ss...' % (
+            found, record('bmkg-realtime', found)
+        ))
+
+    return {'found': found, 'metrics': metrics.snapshot()}
+
+
+@shared_task(name='scraping_bmkg_forecast')
+def scraping_bmkg_forecast():
+    logger.info('scraping bmkg forecast...')
+
+    with collect(task='scraping_bmkg_forecast') as metrics:
+        total = forecast()
+        logger.info('%s forecast rows saved...' % total)
+
+    return {'found': total, 'metrics': metrics.snapshot()}
+
+
+@shared_task(name='reconcile_bmkg_quake')
+def reconcile_bmkg_quake():
+    logger.info('reconcile bmkg quake...')
+
+    with collect(task='reconcile_bmkg_quake') as metrics:
+        with span('reconcile'):
+            superseded = reconcile()
+        logger.info('%s preliminary superseded...' % superseded)
+
+        dedupe_disaster.delay()
+
+    return {'superseded': superseded, 'metrics': metrics.snapshot()}
+
+
+@shared_task(name='dedupe_disaster')
+def dedupe_disaster():
+    logger.info('dedupe disaster...')
+
+    with collect(task='dedupe_disaster') as metrics:
+        with span('dedupe'):
+            linked = dedupe()
+        logger.info('%s disaster linked to canonical...' % linked)
+
+    return {'linked': linked, 'metrics': metrics.snapshot()}
+
+
+@shared_task(
+    name='process_shakemap',
+    autoretry_for=(requests.RequestException,),
+    retry_backoff=True,
+    max_retries=5
+)
+def process_shakemap(attachment_id, url):
+    with collect(task='process_shakemap') as metrics:
+        with span('attachment'):
+            stored = process(attachment_id, url)
+
+    return {'stored': stored, 'metrics': metrics.snapshot()}
+
+
+@shared_task(name='rebuild_disaster_summary')
+def rebuild_disaster_summary():
+    logger.info('rebuild victim and damage summary...')
+
+    with collect(task='rebuild_disaster_summary') as metrics:
+        with span('summary'):
+            result = rebuild()
+        logger.info('%s summary rows created...' % result)
+
+    return {**result, 'metrics': metrics.snapshot()}
+
+
+@shared_task(name='backfill_dibi_partition')
+def backfill_dibi_partition(identifier, year, pages_per_task=10):
+    """
+    Split listing of one (identifier, year) to page range tasks,
+    page size and last offset read from the first page.
+    """
+    name = 'dibi-backfill:%s:%s' % (identifier, year)
+    if get_checkpoint(name).get('done'):
+        return name
+
+    rows, soup = listing(identifier=identifier, year=year)
+    size = len(rows)
+    if size <= 0:
+        set_checkpoint(name, {'done': True, 'created': 0})
+        return name
+
+    last = max(offsets(soup))
+    step = size * pages_per_task
+    tasks = [
+        backfill_dibi_pages.s(identifier, year, start, start + step)
+        for start in range(0, last + size, step)
+    ]
+
+    logger.info('%s split to %s tasks...' % (name, len(tasks)))
+    chord(tasks)(backfill_dibi_done.s(identifier, year))
+    return name
+
+
+@shared_task(
+    name='backfill_dibi_pages',
+    autoretry_for=(requests.RequestException,),
+    retry_backoff=True,
+    max_retries=5
+)
+def backfill_dibi_pages(identifier, year, start, end):
+    """Resume from checkpoint, existing disaster skipped so safe to retry"""
+    name = 'dibi-backfill:%s:%s:%s' % (identifier, year, start)
+    state = get_checkpoint(name, {'next': start, 'created': 0})
+    if state.get('done'):
+        return state['created']
+
+    def on_page(offset, created):
+        state['next'] = offset
+        state['created'] += created
+        set_checkpoint(name, state)
+
+    with collect(task='backfill_dibi_pages'):
+        dibi_pages(
+            identifier=identifier,
+            year=year,
+            start=state['next'],
+            end=end,
+            on_page=on_page
+        )
+
+    state['done'] = True
+    set_checkpoint(name, state)
+    return state['created']
+
+
+@shared_task(name='backfill_dibi_done')
+def backfill_dibi_done(results, identifier, year):
+    name = 'dibi-backfill:%s:%s' % (identifier, year)
+    created = sum(x or 0 for x in results)
+
+    set_checkpoint(name, {'done': True, 'created': created})
+    logger.info('%s done, %s disaster created...' % (name, created))
+    return created
@@ -0,0 +1,58 @@
+from collections import defaultdict
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+
+from eav.models import Value
+
+
+def get_attributes(ids, slugs=None):
+    """
+    Read `eav` attributes of many disasters in one query
+    instead `obj.eav` per disaster.
+
+    Return; {disaster_id: {slug: value}}
+    """
+    Disaster = apps.get_registered_model('ews', 'Disaster')
+    ct = ContentType.objects.get_for_model(Disaster)
+    attributes = defaultdict(dict)
+
+    queryset = Value.objects.filter(entity_ct=ct, entity_id__in=list(ids))
+    if slugs:
+        queryset = queryset.filter(attribute__slug__in=slugs)
+
+    values = queryset.values_list(
+        'entity_id',
+        'attribute__slug',
+        'value_text',
+        'value_float',
+        'value_int',
+        'value_bool',
+        'value_date',
+        'value_enum__value',
+    )
+
+    for entity_id, slug, *typed in values:
+        value = next((x for x in typed if x is not None), None)
+        attributes[entity_id][slug] = value
+
+    return attributes
+
+
+def get_checkpoint(name, default=None):
+    Checkpoint = apps.get_registered_model('ews', 'Checkpoint')
+
+    try:
+        return Checkpoint.objects.get(name=name).value
+    except Checkpoint.DoesNotExist:
+        return default if default is not None else dict()
+
+
+def set_checkpoint(name, value):
+    Checkpoint = apps.get_registered_model('ews', 'Checkpoint')
+    obj, _created = Checkpoint.objects.update_or_create(
+        name=name,
+        defaults={'value': value}
+    )
+
+    return obj
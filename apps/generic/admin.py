@@ -15,6 +15,14 @@ class LocationAdmin(admin.ModelAdmin):
     inlines = (ImpactInline,)
 
 
+class AdministrativeAreaAdmin(admin.ModelAdmin):
+    model = AdministrativeArea
+    list_display = ('code', 'name', 'level',)
+    list_filter = ('level',)
+    search_fields = ('code', 'name',)
+    raw_id_fields = ('parent',)
+
+
 admin.site.register(Activity)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Attachment)
@@ -22,3 +30,4 @@ admin.site.register(Comment)
 admin.site.register(Reaction)
 admin.site.register(Confirmation)
 admin.site.register(Impact)
+admin.site.register(AdministrativeArea, AdministrativeAreaAdmin)
@@ -1,5 +1,5 @@
-from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.apps import AppConfig, apps
+from django.db.models.signals import post_delete, post_save
 
 
 class GenericConfig(AppConfig):
@@ -8,7 +8,17 @@ class GenericConfig(AppConfig):
     label = 'generic'
 
     def ready(self):
-        from .signals import create_comment, create_confirmation, create_reaction
+        from .conf import settings
+        from .search import get_location_models
+        from .signals import (
+            create_comment,
+            create_confirmation,
+            create_reaction,
+            delete_search,
+            release_blob,
+            update_search,
+            update_search_location
+        )
 
         post_save.connect(
             create_comment,
@@ -27,3 +37,38 @@ class GenericConfig(AppConfig):
             sender=self.get_model('Reaction'),
             dispatch_uid='create_reaction'
         )
+
+        post_delete.connect(
+            release_blob,
+            sender=self.get_model('Attachment'),
+            dispatch_uid='release_blob'
+        )
+
+        # keep search document up to date, bulk create call `search.index()`
+        for label in settings.GENERIC_SEARCH_MODELS:
+            model = apps.get_model(label)
+
+            post_save.connect(
+                update_search,
+                sender=model,
+                dispatch_uid='update_search_%s' % label
+            )
+
+            post_delete.connect(
+                delete_search,
+                sender=model,
+                dispatch_uid='delete_search_%s' % label
+            )
+
+        for model in get_location_models():
+            post_save.connect(
+                update_search_location,
+                sender=model,
+                dispatch_uid='update_search_location_%s' % model._meta.label
+            )
+
+            post_delete.connect(
+                update_search_location,
+                sender=model,
+                dispatch_uid='delete_search_location_%s' % model._meta.label
+            )
@@ -0,0 +1,90 @@
+"""
+Content addressed attachment file.
+
+Upload hashed by chunk (never read whole to memory), stored once as
+`Blob` under its sha256 and shared by every attachment with the same
+content. Attachment clone is a new row pointing to the same blob.
+`refcount` follow attachment create and delete, blob nobody use
+removed by `collect_garbage()` after `GENERIC_BLOB_GC_GRACE`.
+"""
+import hashlib
+import os
+
+from datetime import timedelta
+
+from django.apps import apps
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, F, OuterRef
+from django.utils import timezone
+
+from apps.generic.conf import settings
+
+Blob = apps.get_registered_model('generic', 'Blob')
+Attachment = apps.get_registered_model('generic', 'Attachment')
+
+
+def get_checksum(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def store(file):
+    """Return blob of `file` content, stored when not exists yet"""
+    checksum = get_checksum(file)
+
+    # touch so garbage collector not remove it before acquired
+    if Blob.objects.filter(checksum=checksum).update(update_at=timezone.now()):
+        return Blob.objects.get(checksum=checksum)
+
+    blob = Blob(checksum=checksum, size=file.size)
+    blob.file.save(os.path.basename(file.name), file, save=False)
+
+    try:
+        with transaction.atomic():
+            blob.save()
+    except IntegrityError:
+        # stored by other request in the meantime
+        blob.file.delete(save=False)
+        blob = Blob.objects.get(checksum=checksum)
+
+    return blob
+
+
+def acquire(blob_id):
+    Blob.objects \
+        .filter(pk=blob_id) \
+        .update(refcount=F('refcount') + 1, update_at=timezone.now())
+
+
+def release(blob_id):
+    Blob.objects \
+        .filter(pk=blob_id, refcount__gt=0) \
+        .update(refcount=F('refcount') - 1, update_at=timezone.now())
+
+
+def collect_garbage(grace=None):
+    """Remove blob row and file nobody use, return number removed"""
+    grace = settings.GENERIC_BLOB_GC_GRACE if grace is None else grace
+    used = Attachment.objects.filter(blob=OuterRef('pk'))
+    queryset = Blob.objects \
+        .filter(refcount=0, update_at__lt=timezone.now() - timedelta(seconds=grace)) \
+        .exclude(Exists(used))
+
+    removed = 0
+    for blob_id in queryset.values_list('id', flat=True).iterator():
+        with transaction.atomic():
+            # checked again under lock, may be acquired meanwhile
+            blob = queryset.select_for_update().filter(pk=blob_id).first()
+            if blob is None:
+                continue
+
+            name = blob.file.name
+            blob.delete()
+            transaction.on_commit(lambda name=name: Blob.file.field.storage.delete(name))
+            removed += 1
+
+    return removed
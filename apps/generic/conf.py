@@ -0,0 +1,37 @@
+# https://pypi.org/project/django-appconf/
+from django.conf import settings  # noqa
+from appconf import AppConf
+
+
+class GenericAppConf(AppConf):
+    # directory build by `python manage.py build_geocoder`
+    GEOCODER_INDEX = None
+
+    # `index` work on all database, `fulltext` use MySQL FULLTEXT
+    # after `python manage.py build_search_index --fulltext`
+    SEARCH_BACKEND = 'index'
+
+    # searchable model, title field and location name weighted more
+    SEARCH_MODELS = {
+        'ews.Disaster': {
+            'title': ['title'],
+            'body': ['description', 'chronology', 'reason'],
+            'locations': 'locations',
+        },
+        'threat.Hazard': {
+            'title': ['incident'],
+            'body': ['description', 'chronology', 'reason'],
+            'locations': 'locations',
+        },
+        'contribution.Report': {
+            'title': ['title'],
+            'body': ['description', 'chronology', 'reason', 'necessary'],
+            'locations': 'location',
+        },
+    }
+
+    # blob without attachment kept this long (seconds) before removed
+    BLOB_GC_GRACE = 3600
+
+    class Meta:
+        perefix = 'generic'
@@ -0,0 +1,189 @@
+import re
+import time
+
+from collections import defaultdict, namedtuple
+
+from django.apps import apps
+from django.core.cache import cache
+
+from core.constant import AreaLevel
+
+Area = namedtuple('Area', 'code name level parent latitude longitude')
+
+PREFIX_RE = re.compile(
+    r'^(PROVINSI|PROV\.?|KABUPATEN|KAB\.?|KOTA|KECAMATAN|KEC\.?|'
+    r'KELURAHAN|KEL\.?|DESA|DES\.?)\s+'
+)
+SPACE_RE = re.compile(r'\s+')
+
+VERSION_KEY = 'generic-gazetteer:version'
+
+# seconds shared version not checked again, row loop not hit cache each call
+CHECK_INTERVAL = 30
+
+# BPS style code length or Kemendagri style dotted parts
+LEVEL_BY_LENGTH = {
+    2: AreaLevel.ARL101,
+    4: AreaLevel.ARL102,
+    7: AreaLevel.ARL103,
+    10: AreaLevel.ARL104,
+}
+LEVEL_BY_PARTS = {
+    1: AreaLevel.ARL101,
+    2: AreaLevel.ARL102,
+    3: AreaLevel.ARL103,
+    4: AreaLevel.ARL104,
+}
+
+
+def get_level(code):
+    if '.' in code:
+        return LEVEL_BY_PARTS.get(len(code.split('.')))
+    return LEVEL_BY_LENGTH.get(len(code))
+
+
+def normalize(name):
+    """`Kab. Bandung Barat ` -> `BANDUNG BARAT`"""
+    name = SPACE_RE.sub(' ', (name or '').upper()).strip()
+    return PREFIX_RE.sub('', name)
+
+
+class Gazetteer:
+    """
+    In memory index of `AdministrativeArea`, loaded once
+    so ingest resolve name and code without query per row.
+    """
+
+    def __init__(self, areas=()):
+        self.by_code = dict()
+        self.by_name = defaultdict(list)
+
+        for area in areas:
+            self.add(Area(*area))
+
+    def __len__(self):
+        return len(self.by_code)
+
+    @classmethod
+    def from_db(cls):
+        AdministrativeArea = apps.get_registered_model(
+            'generic',
+            'AdministrativeArea'
+        )
+
+        areas = AdministrativeArea.objects \
+            .values_list('code', 'name', 'level', 'parent_id',
+                         'latitude', 'longitude') \
+            .iterator(chunk_size=5000)
+
+        return cls(areas)
+
+    def add(self, area):
+        self.by_code[area.code] = area
+        self.by_name[normalize(area.name)].append(area)
+
+    def get(self, code):
+        return self.by_code.get(code)
+
+    def most_specific(self, *codes):
+        """First known area from codes, pass village code first"""
+        for code in codes:
+            area = self.get(code) if code else None
+            if area:
+                return area
+        return None
+
+    def ancestors(self, code):
+        """Return area and their parents, from village to province"""
+        area = self.get(code)
+        while area:
+            yield area
+            area = self.get(area.parent)
+
+    def resolve(self, name, level=None, parent=None):
+        """
+        Find area by name. `parent` code (any level above) make
+        result precise because name like `BANDUNG` not unique.
+        """
+        candidates = self.by_name.get(normalize(name), [])
+
+        if level:
+            candidates = [x for x in candidates if x.level == level]
+
+        if parent:
+            candidates = [
+                x for x in candidates
+                if any(y.code == parent for y in self.ancestors(x.parent))
+            ]
+
+        if len(candidates) > 1 and name:
+            # `Kota Bekasi` and `Kabupaten Bekasi` has same name
+            is_city = name.upper().strip().startswith('KOTA')
+            preferred = [
+                x for x in candidates
+                if x.name.upper().startswith('KOTA') == is_city
+            ]
+            candidates = preferred or candidates
+
+        return candidates[0] if candidates else None
+
+    def resolve_regency(self, name):
+        return self.resolve(name, level=AreaLevel.ARL102) \
+            or self.resolve(name)
+
+    def locate(self, location, area):
+        """Link location to area, centroid used when has no coordinate"""
+        if not area:
+            return location
+
+        location.area_id = area.code
+        if not location.latitude and not location.longitude:
+            location.latitude = area.latitude
+            location.longitude = area.longitude
+
+        return location
+
+
+# (version, checked at, gazetteer) of this process
+_gazetteer = None
+
+
+def get_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_version():
+    """All process reload gazetteer on next use"""
+    cache.add(VERSION_KEY, 1, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def get_gazetteer():
+    """
+    Gazetteer of this process, reloaded when version in shared cache
+    changed. Version checked at most once per `CHECK_INTERVAL`.
+    """
+    global _gazetteer
+
+    now = time.monotonic()
+    if _gazetteer is not None and now - _gazetteer[1] < CHECK_INTERVAL:
+        return _gazetteer[2]
+
+    version = get_version()
+    if _gazetteer is None or _gazetteer[0] != version:
+        # empty one kept too, `load_gazetteer` bump the version
+        _gazetteer = (version, now, Gazetteer.from_db())
+    else:
+        _gazetteer = (version, now, _gazetteer[2])
+    return _gazetteer[2]
+
+
+def reload():
+    global _gazetteer
+
+    bump_version()
+    _gazetteer = None
+    return get_gazetteer()
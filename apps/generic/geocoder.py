@@ -0,0 +1,216 @@
+import json
+import math
+import os
+
+import numpy as np
+
+from apps.generic.conf import settings
+from apps.generic.gazetteer import get_gazetteer, get_level
+from core.constant import AreaLevel
+from core.geo import to_float
+
+# packed index, each file loaded with numpy memory map
+FILES = ('edges', 'ranges', 'bboxes', 'codes', 'levels',
+         'cell_offsets', 'cell_items', 'grid')
+
+# location field filled for each level
+LEVEL_FIELDS = {
+    AreaLevel.ARL101: 'administrative_area',
+    AreaLevel.ARL102: 'sub_administrative_area',
+    AreaLevel.ARL103: 'locality',
+    AreaLevel.ARL104: 'sub_locality',
+}
+
+
+def _rings(geometry):
+    if geometry['type'] == 'Polygon':
+        return geometry['coordinates']
+    if geometry['type'] == 'MultiPolygon':
+        return [ring for polygon in geometry['coordinates'] for ring in polygon]
+    return []
+
+
+def build(path, out, cell=0.1, code_property='code', level_property='level'):
+    """
+    Pack GeoJSON boundaries to directory `out`.
+
+    Each feature become edges (x1, y1, x2, y2) with their bbox,
+    a fixed lat/lon grid point to features whose bbox touch the cell.
+    """
+    with open(path, encoding='utf-8') as f:
+        features = json.load(f).get('features', [])
+
+    edges = list()
+    ranges = list()
+    bboxes = list()
+    codes = list()
+    levels = list()
+
+    for feature in features:
+        properties = feature.get('properties') or {}
+        code = str(properties.get(code_property, '')).strip()
+        rings = _rings(feature.get('geometry') or {})
+        if not code or not rings:
+            continue
+
+        start = len(edges)
+        for ring in rings:
+            edges.extend(
+                (a[0], a[1], b[0], b[1]) for a, b in zip(ring, ring[1:])
+            )
+
+        points = np.array([p[:2] for ring in rings for p in ring])
+        ranges.append((start, len(edges)))
+        bboxes.append((
+            points[:, 0].min(), points[:, 1].min(),
+            points[:, 0].max(), points[:, 1].max()
+        ))
+        codes.append(code)
+        levels.append(str(properties.get(level_property) or get_level(code) or ''))
+
+    bboxes = np.array(bboxes, dtype=np.float64)
+    min_x, min_y = bboxes[:, 0].min(), bboxes[:, 1].min()
+    nx = int(math.ceil((bboxes[:, 2].max() - min_x) / cell)) + 1
+    ny = int(math.ceil((bboxes[:, 3].max() - min_y) / cell)) + 1
+
+    cells = list()
+    items = list()
+    for index, (x1, y1, x2, y2) in enumerate(bboxes):
+        ix = np.arange(int((x1 - min_x) // cell), int((x2 - min_x) // cell) + 1)
+        iy = np.arange(int((y1 - min_y) // cell), int((y2 - min_y) // cell) + 1)
+        ids = (iy[:, None] * nx + ix[None, :]).ravel()
+        cells.append(ids)
+        items.append(np.full(len(ids), index))
+
+    cells = np.concatenate(cells)
+    items = np.concatenate(items)
+    order = np.argsort(cells, kind='stable')
+
+    arrays = {
+        'edges': np.array(edges, dtype=np.float64),
+        'ranges': np.array(ranges, dtype=np.int64),
+        'bboxes': bboxes,
+        'codes': np.array(codes),
+        'levels': np.array(levels),
+        'cell_offsets': np.concatenate(([0], np.cumsum(
+            np.bincount(cells, minlength=nx * ny)
+        ))).astype(np.int64),
+        'cell_items': items[order].astype(np.int32),
+        'grid': np.array([min_x, min_y, cell, nx, ny], dtype=np.float64),
+    }
+
+    os.makedirs(out, exist_ok=True)
+    for name in FILES:
+        np.save(os.path.join(out, '%s.npy' % name), arrays[name])
+
+    return len(codes)
+
+
+class Geocoder:
+    def __init__(self, path):
+        for name in FILES:
+            array = np.load(
+                os.path.join(path, '%s.npy' % name),
+                mmap_mode='r'
+            )
+            setattr(self, name, array)
+
+        min_x, min_y, cell, nx, ny = self.grid
+        self.min_x = min_x
+        self.min_y = min_y
+        self.cell = cell
+        self.nx = int(nx)
+        self.ny = int(ny)
+
+    def _candidates(self, x, y):
+        ix = int((x - self.min_x) // self.cell)
+        iy = int((y - self.min_y) // self.cell)
+        if not (0 <= ix < self.nx and 0 <= iy < self.ny):
+            return []
+
+        cell = iy * self.nx + ix
+        start, end = self.cell_offsets[cell], self.cell_offsets[cell + 1]
+        return self.cell_items[start:end]
+
+    def _contains(self, index, x, y):
+        # even-odd ray casting, holes and multi part handled by parity
+        start, end = self.ranges[index]
+        x1, y1, x2, y2 = np.asarray(self.edges[start:end]).T
+        crossing = (y1 > y) != (y2 > y)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            at_x = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+
+        return np.count_nonzero(crossing & (x < at_x)) % 2 == 1
+
+    def lookup(self, latitude, longitude):
+        """Return {level: code} of areas contain the point"""
+        x, y = longitude, latitude
+        result = dict()
+
+        for index in self._candidates(x, y):
+            level = str(self.levels[index])
+            if level in result:
+                continue
+
+            bx1, by1, bx2, by2 = self.bboxes[index]
+            if not (bx1 <= x <= bx2 and by1 <= y <= by2):
+                continue
+
+            if self._contains(index, x, y):
+                result[level] = str(self.codes[index])
+
+        return result
+
+    def lookup_many(self, points):
+        return [self.lookup(lat, lon) for lat, lon in points]
+
+    def fill(self, location, gazetteer=None):
+        """
+        Set area name and code to location from their coordinate.
+        Return True when location changed. Pass `gazetteer` when
+        filling many location, taken once by caller.
+        """
+        latitude = to_float(location.latitude)
+        longitude = to_float(location.longitude)
+        if not latitude and not longitude:
+            return False
+
+        found = self.lookup(latitude, longitude)
+        if not found:
+            return False
+
+        if gazetteer is None:
+            gazetteer = get_gazetteer()
+
+        for level, field in LEVEL_FIELDS.items():
+            code = found.get(level)
+            if not code:
+                continue
+
+            area = gazetteer.get(code)
+            setattr(location, '%s_code' % field, code)
+            if area:
+                setattr(location, field, area.name)
+
+        # most specific area, only for location has `area` link
+        if hasattr(location, 'area_id'):
+            for level in reversed(list(LEVEL_FIELDS)):
+                if found.get(level) and gazetteer.get(found[level]):
+                    location.area_id = found[level]
+                    break
+
+        return True
+
+
+_geocoder = None
+
+
+def get_geocoder():
+    """Return None when index not build yet"""
+    global _geocoder
+
+    path = settings.GENERIC_GEOCODER_INDEX
+    if _geocoder is None and path and os.path.isdir(path):
+        _geocoder = Geocoder(path)
+    return _geocoder
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.generic.blob import Attachment, acquire, store
+
+
+class Command(BaseCommand):
+    help = "Move attachment uploaded before blob storage to blob, same content stored once"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--delete-old',
+            action='store_true',
+            help="Delete old file when no attachment use it anymore"
+        )
+
+    def handle(self, *args, **options):
+        queryset = Attachment.objects \
+            .filter(blob__isnull=True, file__gt='') \
+            .order_by('id')
+
+        total = 0
+        missing = 0
+        last_id = 0
+
+        while True:
+            objs = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not objs:
+                break
+
+            last_id = objs[-1].id
+            for obj in objs:
+                old = obj.file.name
+                if not obj.file.storage.exists(old):
+                    missing += 1
+                    continue
+
+                with transaction.atomic():
+                    with obj.file.open('rb') as f:
+                        blob = store(f)
+
+                    Attachment.objects \
+                        .filter(pk=obj.pk) \
+                        .update(blob=blob, file=blob.file.name)
+                    acquire(blob.id)
+
+                # clone made before share the same old file
+                if options['delete_old'] and not Attachment.objects.filter(file=old).exists():
+                    obj.file.storage.delete(old)
+
+                total += 1
+
+        self.stdout.write('%s attachment moved to blob, %s file missing' % (total, missing))
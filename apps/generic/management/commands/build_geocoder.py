@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.generic.conf import settings
+from apps.generic.geocoder import build
+
+
+class Command(BaseCommand):
+    help = "Pack GeoJSON administrative boundaries as reverse geocoder index"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument(
+            '--out',
+            default=settings.GENERIC_GEOCODER_INDEX,
+            help="Index directory, default `GENERIC_GEOCODER_INDEX`"
+        )
+        parser.add_argument('--cell', type=float, default=0.1)
+        parser.add_argument('--code-property', default='code')
+        parser.add_argument('--level-property', default='level')
+
+    def handle(self, *args, **options):
+        out = options.get('out')
+        if not out:
+            raise CommandError("Set --out or GENERIC_GEOCODER_INDEX")
+
+        start = time.perf_counter()
+        total = build(
+            options.get('path'),
+            out,
+            cell=options.get('cell'),
+            code_property=options.get('code_property'),
+            level_property=options.get('level_property'),
+        )
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            '%s boundaries packed to %s in %.2fs' % (total, out, elapsed)
+        ))
@@ -0,0 +1,71 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.generic.conf import settings
+from apps.generic.search import FULLTEXT_INDEX, SearchDocument, index
+
+
+class Command(BaseCommand):
+    help = "Index all disaster, hazard and report text for search"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--model',
+            action='append',
+            choices=list(settings.GENERIC_SEARCH_MODELS),
+            help="Only this model, can be repeated"
+        )
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--fulltext',
+            action='store_true',
+            help="Add MySQL FULLTEXT index, then set GENERIC_SEARCH_BACKEND = 'fulltext'"
+        )
+
+    def add_fulltext(self):
+        if connection.vendor != 'mysql':
+            raise CommandError("FULLTEXT index only for MySQL")
+
+        table = SearchDocument._meta.db_table
+        with connection.cursor() as cursor:
+            constraints = connection.introspection.get_constraints(cursor, table)
+            if FULLTEXT_INDEX in constraints:
+                self.stdout.write('%s already exists' % FULLTEXT_INDEX)
+                return
+
+            cursor.execute(
+                'ALTER TABLE %s ADD FULLTEXT INDEX %s (title, body)' % (
+                    connection.ops.quote_name(table),
+                    connection.ops.quote_name(FULLTEXT_INDEX)
+                )
+            )
+        self.stdout.write('%s created' % FULLTEXT_INDEX)
+
+    def handle(self, *args, **options):
+        if options.get('fulltext'):
+            self.add_fulltext()
+
+        batch_size = options.get('batch_size')
+
+        for label in options.get('model') or settings.GENERIC_SEARCH_MODELS:
+            model = apps.get_model(label)
+            queryset = model.objects.order_by('pk')
+
+            start = time.perf_counter()
+            last_id = 0
+            total = 0
+
+            while True:
+                objs = list(queryset.filter(pk__gt=last_id)[:batch_size])
+                if len(objs) <= 0:
+                    break
+
+                total += index(objs)
+                last_id = objs[-1].pk
+
+            self.stdout.write('%s: %s indexed in %.1fs' % (
+                label, total, time.perf_counter() - start
+            ))
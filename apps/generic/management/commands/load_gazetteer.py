@@ -0,0 +1,65 @@
+import csv
+
+from django.apps import apps
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from apps.generic.gazetteer import get_level, reload
+from core.geo import to_float
+
+AdministrativeArea = apps.get_registered_model('generic', 'AdministrativeArea')
+
+
+class Command(BaseCommand):
+    help = """
+    Load administrative areas from csv.
+    Columns: code,name,parent,latitude,longitude (level optional)
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        batch_size = options.get('batch_size')
+        existing = AdministrativeArea.objects.in_bulk(field_name='code')
+        fields = ['name', 'level', 'parent', 'latitude', 'longitude']
+        creates = list()
+        updates = list()
+
+        with open(options.get('path'), newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                code = row.get('code', '').strip()
+                if not code:
+                    continue
+
+                data = {
+                    'name': row.get('name', '').strip(),
+                    'level': row.get('level') or get_level(code),
+                    'parent_id': row.get('parent', '').strip() or None,
+                    'latitude': to_float(row.get('latitude'), 0.0),
+                    'longitude': to_float(row.get('longitude'), 0.0),
+                }
+
+                obj = existing.get(code)
+                if obj:
+                    for key, value in data.items():
+                        setattr(obj, key, value)
+                    updates.append(obj)
+                else:
+                    creates.append(AdministrativeArea(code=code, **data))
+
+        AdministrativeArea.objects.bulk_create(creates, batch_size=batch_size)
+        AdministrativeArea.objects.bulk_update(
+            updates,
+            fields=fields,
+            batch_size=batch_size
+        )
+
+        # all process use fresh data once committed
+        transaction.on_commit(reload)
+
+        self.stdout.write(self.style.SUCCESS(
+            '%s created, %s updated' % (len(creates), len(updates))
+        ))
@@ -0,0 +1,68 @@
+import time
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from apps.generic.gazetteer import get_gazetteer
+from apps.generic.geocoder import LEVEL_FIELDS, get_geocoder
+
+MODELS = (
+    ('generic', 'Location'),
+    ('ews', 'DisasterLocation'),
+    ('contribution', 'ReportLocation'),
+)
+
+
+class Command(BaseCommand):
+    help = "Fill area name and code of locations which only has coordinate"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        geocoder = get_geocoder()
+        if not geocoder:
+            raise CommandError("Geocoder index not found, run build_geocoder")
+
+        batch_size = options.get('batch_size')
+
+        for app_label, model_name in MODELS:
+            model = apps.get_registered_model(app_label, model_name)
+            fields = [
+                f for level in LEVEL_FIELDS.values()
+                for f in (level, '%s_code' % level)
+            ]
+            if hasattr(model, 'area'):
+                fields.append('area')
+
+            queryset = model.objects \
+                .filter(Q(administrative_area__isnull=True) | Q(administrative_area='')) \
+                .exclude(latitude=0, longitude=0) \
+                .order_by('id')
+
+            start = time.perf_counter()
+            last_id = 0
+            total = 0
+
+            while True:
+                objs = list(queryset.filter(id__gt=last_id)[:batch_size])
+                if len(objs) <= 0:
+                    break
+
+                gazetteer = get_gazetteer()
+                changed = [x for x in objs if geocoder.fill(x, gazetteer)]
+
+                # `bulk_update` skip `save()` so terms not cleaned twice
+                with transaction.atomic():
+                    model.objects.bulk_update(changed, fields=fields)
+
+                total += len(changed)
+                last_id = objs[-1].id
+
+            self.stdout.write(self.style.SUCCESS(
+                '%s: %s filled in %.2fs' % (
+                    model_name, total, time.perf_counter() - start
+                )
+            ))
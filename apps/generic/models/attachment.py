@@ -2,7 +2,7 @@ import os
 
 from django.contrib.contenttypes.fields import GenericForeignKey, GenericRelation
 from django.contrib.contenttypes.models import ContentType
-from django.db import models
+from django.db import models, transaction
 
 from core.models import AbstractCommonField
 
@@ -26,6 +26,15 @@ class AbstractAttachment(AbstractCommonField):
         null=True,
         blank=True
     )
+    # stored content, `file` point to the blob file
+    blob = models.ForeignKey(
+        'generic.Blob',
+        on_delete=models.PROTECT,
+        related_name='attachments',
+        editable=False,
+        null=True,
+        blank=True
+    )
     filename = models.CharField(
         max_length=255,
         editable=False,
@@ -65,11 +74,36 @@ class AbstractAttachment(AbstractCommonField):
     def __str__(self) -> str:
         return self.name
 
+    @transaction.atomic
     def save(self, *args, **kwargs):
+        from apps.generic import blob
+
         if not self.name and self.file:
             self.name = os.path.basename(self.file.name)
 
         if self.file:
             self.filesize = self.file.size
 
+        adding = self._state.adding or self.pk is None
+        uploaded = bool(self.file) and not self.file._committed
+        previous_blob_id = None
+
+        # new upload, same content stored once
+        if uploaded:
+            if not adding:
+                previous_blob_id = type(self).objects \
+                    .filter(pk=self.pk) \
+                    .values_list('blob_id', flat=True) \
+                    .first()
+
+            self.blob = blob.store(self.file)
+            self.file = self.blob.file.name
+
         super().save(*args, **kwargs)
+
+        # new row, include clone of other attachment, or replaced file
+        if self.blob_id and (adding or (uploaded and previous_blob_id != self.blob_id)):
+            blob.acquire(self.blob_id)
+
+        if uploaded and previous_blob_id and previous_blob_id != self.blob_id:
+            blob.release(previous_blob_id)
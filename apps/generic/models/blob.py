@@ -0,0 +1,30 @@
+import os
+
+from django.db import models
+
+
+def get_blob_upload_path(instance, filename):
+    ext = os.path.splitext(filename)[1].lower()
+    return 'blob/%s/%s%s' % (instance.checksum[:2], instance.checksum, ext)
+
+
+class AbstractBlob(models.Model):
+    """
+    Stored file content addressed by sha256, attachment with the same
+    content point to one blob. `refcount` is number of attachment use it,
+    blob with zero refcount removed by `collect_blob_garbage` task.
+    """
+    checksum = models.CharField(max_length=64, unique=True)
+    file = models.FileField(upload_to=get_blob_upload_path, max_length=255)
+    size = models.BigIntegerField(default=0)
+    refcount = models.PositiveIntegerField(default=0, db_index=True)
+
+    create_at = models.DateTimeField(auto_now_add=True)
+    update_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        app_label = 'generic'
+        abstract = True
+
+    def __str__(self) -> str:
+        return self.checksum
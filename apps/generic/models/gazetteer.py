@@ -0,0 +1,45 @@
+from decimal import Decimal
+
+from django.db import models
+
+from core.constant import AreaLevel
+from core.models import AbstractCommonField
+
+
+class AbstractAdministrativeArea(AbstractCommonField):
+    """
+    Indonesian administrative units loaded from csv
+    with `python manage.py load_gazetteer <file>`
+
+    `code` follow the code used by DIBI, so code scraped
+    can linked directly without lookup by name.
+    """
+    _Level = AreaLevel
+
+    code = models.CharField(max_length=25, unique=True)
+    name = models.CharField(max_length=255, db_index=True)
+    level = models.CharField(
+        max_length=3,
+        choices=_Level.choices,
+        db_index=True
+    )
+    parent = models.ForeignKey(
+        'self',
+        related_name='children',
+        to_field='code',
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        null=True,
+        blank=True
+    )
+
+    # centroid
+    latitude = models.FloatField(default=Decimal(0.0))
+    longitude = models.FloatField(default=Decimal(0.0))
+
+    class Meta:
+        app_label = 'generic'
+        abstract = True
+
+    def __str__(self) -> str:
+        return '{} {}'.format(self.code, self.name)
@@ -6,14 +6,7 @@ from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 
 from core.models import AbstractCommonField, BulkCreateReturnIdManager
-
-REMOVED_TERMS = [
-    'Desa',
-    'Kelurahan',
-    'Kecamatan',
-    'Kabupaten',
-    'Provinsi'
-]
+from core.normalizer import clean_location
 
 
 class LocationManager(BulkCreateReturnIdManager, models.Manager):
@@ -154,17 +147,4 @@ class AbstractLocation(AbstractCommonField):
         super().save(*args, **kwargs)
 
     def clean_terms(self):
-        for r in REMOVED_TERMS:
-            if self.administrative_area:
-                self.administrative_area = self.administrative_area \
-                    .replace(r, '').strip()
-
-            if self.sub_administrative_area:
-                self.sub_administrative_area = self.sub_administrative_area \
-                    .replace(r, '').strip()
-
-            if self.locality:
-                self.locality = self.locality.replace(r, '').strip()
-
-            if self.sub_locality:
-                self.sub_locality = self.sub_locality.replace(r, '').strip()
+        clean_location(self)
@@ -7,6 +7,9 @@ from .comment import *
 from .confirmation import *
 from .reaction import *
 from .impact import *
+from .gazetteer import *
+from .search import *
+from .blob import *
 
 __all__ = list()
 
@@ -35,6 +38,14 @@ if not is_model_registered('generic', 'Attachment'):
     __all__.append('Attachment')
 
 
+if not is_model_registered('generic', 'Blob'):
+    class Blob(AbstractBlob):
+        class Meta(AbstractBlob.Meta):
+            pass
+
+    __all__.append('Blob')
+
+
 if not is_model_registered('generic', 'Comment'):
     class Comment(AbstractComment):
         class Meta(AbstractComment.Meta):
@@ -65,3 +76,27 @@ if not is_model_registered('generic', 'Impact'):
             pass
 
     __all__.append('Impact')
+
+
+if not is_model_registered('generic', 'AdministrativeArea'):
+    class AdministrativeArea(AbstractAdministrativeArea):
+        class Meta(AbstractAdministrativeArea.Meta):
+            pass
+
+    __all__.append('AdministrativeArea')
+
+
+if not is_model_registered('generic', 'SearchDocument'):
+    class SearchDocument(AbstractSearchDocument):
+        class Meta(AbstractSearchDocument.Meta):
+            pass
+
+    __all__.append('SearchDocument')
+
+
+if not is_model_registered('generic', 'SearchToken'):
+    class SearchToken(AbstractSearchToken):
+        class Meta(AbstractSearchToken.Meta):
+            pass
+
+    __all__.append('SearchToken')
@@ -0,0 +1,62 @@
+from django.db import models
+
+
+class AbstractSearchDocument(models.Model):
+    """
+    Searchable text of disaster, hazard and report, one row per object.
+    `title` contain title and location name, `body` the long text.
+
+    On MySQL `python manage.py build_search_index --fulltext` add
+    FULLTEXT index to (title, body) and search use MATCH ... AGAINST.
+    """
+    content_type = models.ForeignKey(
+        'contenttypes.ContentType',
+        on_delete=models.CASCADE
+    )
+    object_id = models.PositiveBigIntegerField()
+    title = models.TextField(blank=True, default='')
+    body = models.TextField(blank=True, default='')
+
+    class Meta:
+        app_label = 'generic'
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=['content_type', 'object_id'],
+                name='generic_search_document_unique'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.title
+
+
+class AbstractSearchToken(models.Model):
+    """
+    Inverted index used when FULLTEXT not available,
+    `weight` is count of the token, title counted more.
+    """
+    content_type = models.ForeignKey(
+        'contenttypes.ContentType',
+        on_delete=models.CASCADE
+    )
+    object_id = models.PositiveBigIntegerField()
+    token = models.CharField(max_length=64)
+    weight = models.PositiveSmallIntegerField(default=1)
+
+    class Meta:
+        app_label = 'generic'
+        abstract = True
+        indexes = [
+            models.Index(
+                fields=['token', 'content_type', 'object_id'],
+                name='generic_search_token_idx'
+            ),
+            models.Index(
+                fields=['content_type', 'object_id'],
+                name='generic_search_object_idx'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return self.token
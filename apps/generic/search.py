@@ -0,0 +1,219 @@
+"""
+Full text search over disaster, hazard and report.
+
+Each object has one `SearchDocument` (title + location name, body)
+kept up to date by signal and by scraper after bulk create. With
+`GENERIC_SEARCH_BACKEND = 'fulltext'` on MySQL the document searched
+with MATCH ... AGAINST, otherwise by `SearchToken` inverted index.
+
+    queryset = search(Disaster.objects.all(), 'banjir bekasi')
+    queryset.first().search_rank
+"""
+import re
+
+from collections import Counter
+
+from django.apps import apps
+from django.contrib.contenttypes.fields import GenericRelation
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist
+from django.db import connection, transaction
+from django.db.models import Exists, F, OuterRef, Subquery, prefetch_related_objects
+from django.db.models.expressions import RawSQL
+
+from apps.generic.conf import settings
+from core.normalizer import clean_area
+
+SearchDocument = apps.get_registered_model('generic', 'SearchDocument')
+SearchToken = apps.get_registered_model('generic', 'SearchToken')
+
+TOKEN_RE = re.compile(r'\w+')
+TOKEN_LENGTH = 64
+TITLE_WEIGHT = 4
+MAX_WEIGHT = 32767
+
+# too common to be useful, also ignored by MySQL FULLTEXT min length
+STOPWORDS = frozenset([
+    'di', 'ke', 'dan', 'yang', 'dari', 'pada', 'untuk', 'dengan',
+    'akibat', 'oleh', 'ini', 'itu', 'atau', 'juga', 'telah', 'sudah',
+])
+
+LOCATION_FIELDS = (
+    'administrative_area',
+    'sub_administrative_area',
+    'locality',
+    'sub_locality',
+)
+
+FULLTEXT_INDEX = 'generic_search_fulltext'
+
+
+def tokenize(text):
+    """`Banjir di Kota Bekasi` -> ['banjir', 'kota', 'bekasi']"""
+    return [
+        x[:TOKEN_LENGTH] for x in TOKEN_RE.findall((text or '').lower())
+        if len(x) > 1 and x not in STOPWORDS
+    ]
+
+
+def is_fulltext():
+    return settings.GENERIC_SEARCH_BACKEND == 'fulltext' and connection.vendor == 'mysql'
+
+
+def get_spec(model):
+    return settings.GENERIC_SEARCH_MODELS.get(model._meta.label)
+
+
+def _locations(obj, name):
+    try:
+        value = getattr(obj, name)
+    except ObjectDoesNotExist:
+        # reverse one to one not created yet
+        return []
+
+    return value.all() if hasattr(value, 'all') else [value]
+
+
+def document(obj, spec):
+    """Return (title, body) text of `obj`"""
+    title = [getattr(obj, x, None) for x in spec.get('title', [])]
+    body = [getattr(obj, x, None) for x in spec.get('body', [])]
+
+    if spec.get('locations'):
+        for location in _locations(obj, spec['locations']):
+            title.extend(clean_area(getattr(location, x, None)) for x in LOCATION_FIELDS)
+
+    # same province written once for many locations
+    title = dict.fromkeys(x for x in title if x)
+    return ' '.join(title), '\n'.join(x for x in body if x)
+
+
+def index(objs):
+    """Create or replace search document of `objs`, all from the same model"""
+    objs = [x for x in objs if x.pk]
+    if not objs:
+        return 0
+
+    model = objs[0]._meta.concrete_model
+    spec = get_spec(model)
+    if not spec:
+        return 0
+
+    if spec.get('locations'):
+        prefetch_related_objects(objs, spec['locations'])
+
+    ct = ContentType.objects.get_for_model(model)
+    ids = [x.pk for x in objs]
+    fulltext = is_fulltext()
+    document_objs = list()
+    token_objs = list()
+
+    for obj in objs:
+        title, body = document(obj, spec)
+        document_objs.append(
+            SearchDocument(content_type=ct, object_id=obj.pk, title=title, body=body)
+        )
+
+        # MySQL maintain their own index
+        if fulltext:
+            continue
+
+        weights = Counter()
+        for token in tokenize(title):
+            weights[token] += TITLE_WEIGHT
+        for token in tokenize(body):
+            weights[token] += 1
+
+        token_objs.extend(
+            SearchToken(
+                content_type=ct,
+                object_id=obj.pk,
+                token=token,
+                weight=min(weight, MAX_WEIGHT)
+            )
+            for token, weight in weights.items()
+        )
+
+    with transaction.atomic():
+        SearchDocument.objects.filter(content_type=ct, object_id__in=ids).delete()
+        SearchToken.objects.filter(content_type=ct, object_id__in=ids).delete()
+        SearchDocument.objects.bulk_create(document_objs, batch_size=1000)
+        SearchToken.objects.bulk_create(token_objs, batch_size=5000)
+
+    return len(document_objs)
+
+
+def remove(model, ids):
+    ct = ContentType.objects.get_for_model(model)
+    SearchDocument.objects.filter(content_type=ct, object_id__in=ids).delete()
+    SearchToken.objects.filter(content_type=ct, object_id__in=ids).delete()
+
+
+def get_location_parent(instance):
+    """Return (model, id) of object which `instance` is the location of"""
+    for label, spec in settings.GENERIC_SEARCH_MODELS.items():
+        if not spec.get('locations'):
+            continue
+
+        model = apps.get_model(label)
+        field = model._meta.get_field(spec['locations'])
+        if not isinstance(instance, field.related_model):
+            continue
+
+        if isinstance(field, GenericRelation):
+            if instance.content_type_id == ContentType.objects.get_for_model(model).id:
+                return model, instance.object_id
+        else:
+            return model, getattr(instance, field.field.attname)
+
+    return None, None
+
+
+def get_location_models():
+    result = set()
+    for label, spec in settings.GENERIC_SEARCH_MODELS.items():
+        if spec.get('locations'):
+            model = apps.get_model(label)
+            result.add(model._meta.get_field(spec['locations']).related_model)
+    return result
+
+
+def search(queryset, q):
+    """
+    Filter `queryset` to object match all words of `q`,
+    annotated with `search_rank` and ordered by it.
+    """
+    tokens = list(dict.fromkeys(tokenize(q)))
+    if not tokens:
+        return queryset.none()
+
+    ct = ContentType.objects.get_for_model(queryset.model)
+
+    if is_fulltext():
+        against = ' '.join('+%s' % x for x in tokens)
+        matches = SearchDocument.objects \
+            .filter(content_type=ct) \
+            .annotate(rank=RawSQL(
+                'MATCH (title, body) AGAINST (%s IN BOOLEAN MODE)',
+                (against,)
+            )) \
+            .filter(rank__gt=0)
+    else:
+        # posting of the first token, each other token must exist for
+        # the same object; all lookup use (token, content_type, object_id)
+        postings = SearchToken.objects.filter(content_type=ct)
+        matches = postings.filter(token=tokens[0])
+        rank = F('weight')
+
+        for token in tokens[1:]:
+            other = postings.filter(token=token, object_id=OuterRef('object_id'))
+            matches = matches.filter(Exists(other))
+            rank = rank + Subquery(other.values('weight')[:1])
+
+        matches = matches.annotate(rank=rank)
+
+    rank = matches.filter(object_id=OuterRef('pk')).values('rank')[:1]
+    return queryset \
+        .filter(pk__in=matches.values('object_id')) \
+        .annotate(search_rank=Subquery(rank)) \
+        .order_by('-search_rank', '-pk')
@@ -1,5 +1,7 @@
 from django.apps import apps
 
+from . import blob, search
+
 Activity = apps.get_registered_model('generic', 'Activity')
 
 
@@ -27,3 +29,26 @@ def create_confirmation(sender, instance, created, **kwargs):
 def create_reaction(sender, instance, created, **kwargs):
     if created:
         _create_activity(instance)
+
+
+def update_search(sender, instance, raw=False, **kwargs):
+    if not raw:
+        search.index([instance])
+
+
+def delete_search(sender, instance, **kwargs):
+    search.remove(sender, [instance.pk])
+
+
+def update_search_location(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+
+    model, pk = search.get_location_parent(instance)
+    if model is not None:
+        search.index(model.objects.filter(pk=pk))
+
+
+def release_blob(sender, instance, **kwargs):
+    if instance.blob_id:
+        blob.release(instance.blob_id)
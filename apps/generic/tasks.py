@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .blob import collect_garbage
+
+
+@shared_task
+def collect_blob_garbage():
+    return {'removed': collect_garbage()}
@@ -1,9 +1,11 @@
 import uuid
 
 from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
 from django.db import transaction
+from django.db.models import CharField, OuterRef, Subquery
+from django.db.models.functions import Cast
 from django.urls import reverse
-from django.core.files.base import ContentFile
 
 from rest_framework import serializers
 
@@ -11,6 +13,23 @@ Hazard = apps.get_registered_model('threat', 'Hazard')
 Location = apps.get_registered_model('generic', 'Location')
 Impact = apps.get_registered_model('generic', 'Impact')
 Attachment = apps.get_registered_model('generic', 'Attachment')
+Activity = apps.get_registered_model('generic', 'Activity')
+
+# subtype field already in hazard
+RISK_EXCLUDE_FIELDS = ('id', 'hazard', 'create_at', 'update_at',)
+
+
+def require_when_created(serializer, attrs, fields):
+    """Item without `uuid` is created, `fields` optional only for update"""
+    if attrs.get('uuid'):
+        return attrs
+
+    missing = [x for x in fields if attrs.get(x) is None]
+    if missing:
+        raise serializers.ValidationError({
+            x: serializer.fields[x].error_messages['required'] for x in missing
+        }, code='required')
+    return attrs
 
 
 """
@@ -34,11 +53,14 @@ class ImpactFieldSerializer(serializers.Serializer):
     uuid = serializers.UUIDField(required=False)
     delete = serializers.BooleanField(required=False, allow_null=True)
 
-    identifier = serializers.CharField()
-    value = serializers.CharField()
-    metric = serializers.CharField()
+    identifier = serializers.CharField(required=False)
+    value = serializers.CharField(required=False)
+    metric = serializers.CharField(required=False)
     description = serializers.CharField(required=False)
 
+    def validate(self, attrs):
+        return require_when_created(self, attrs, ('identifier', 'value', 'metric'))
+
 
 class ImpactModelSerializer(serializers.ModelSerializer):
     class Meta:
@@ -76,9 +98,12 @@ class LocationFieldSerialiser(serializers.Serializer):
     uuid = serializers.UUIDField(required=False)
     delete = serializers.BooleanField(required=False, allow_null=True)
 
-    latitude = serializers.FloatField()
-    longitude = serializers.FloatField()
-    impacts = ImpactFieldSerializer(many=True)
+    latitude = serializers.FloatField(required=False)
+    longitude = serializers.FloatField(required=False)
+    impacts = ImpactFieldSerializer(many=True, required=False)
+
+    def validate(self, attrs):
+        return require_when_created(self, attrs, ('latitude', 'longitude'))
 
 
 class LocationModelSerializer(serializers.ModelSerializer):
@@ -128,64 +153,67 @@ class BaseHazardSerializer(serializers.ModelSerializer):
         super().__init__(*args, **kwargs)
         self.user = self.context.get('request').user
 
-    def verify_owned_attachments(self, attachments):
-        return [
-            x for x in attachments if getattr(x, 'activities')
-            and (x.activities.first().user.id == self.user.id)
-        ]
-
-    @transaction.atomic
-    def remove_attachments(self, instance, attachments):
-        # make user `attachments` owned by current user
-        attachments = self.verify_owned_attachments(attachments)
+    def get_attachment_map(self, uuids):
+        """
+        {uuid: attachment} of `uuids` owned by current user, in one query.
+        Owner is the user of the first `activity` of the attachment.
+        """
+        if not uuids:
+            return dict()
 
-        for attachment in attachments:
-            # attachments.delete()
-            instance.attachments.remove(attachment)
+        ct = ContentType.objects.get_for_model(Attachment)
+        owner = Activity.objects \
+            .filter(content_type=ct, object_id=Cast(OuterRef('pk'), CharField())) \
+            .order_by('id') \
+            .values('user_id')[:1]
 
-    @transaction.atomic
-    def set_attachments(self, instance, attachments):
-        # make user `attachments` owned by current user
-        attachments = self.verify_owned_attachments(attachments)
+        queryset = Attachment.objects \
+            .filter(uuid__in=uuids) \
+            .annotate(owner_id=Subquery(owner)) \
+            .filter(owner_id=self.user.id)
 
-        # attachments without `hazard`
-        attachments_without_hazard = [
-            x for x in attachments if not x.hazard.exists()
-        ]
+        return {x.uuid: x for x in queryset}
 
-        # attachments has `hazard`
-        attachments_with_hazard = [
-            x for x in attachments if x.hazard.exists()
-        ]
+    @transaction.atomic
+    def detach_attachments(self, instance, attachments):
+        """Unlink `attachments` from `instance`, the file kept"""
+        ct = ContentType.objects.get_for_model(instance)
+        Attachment.objects \
+            .filter(id__in=[x.id for x in attachments]) \
+            .filter(content_type=ct, object_id=str(instance.id)) \
+            .update(content_type=None, object_id=None)
 
-        # create new attachments if they has `hazard`
-        if len(attachments_with_hazard) > 0:
-            new_attachments = list()
+    @transaction.atomic
+    def set_attachments(self, instance, attachments):
+        """Link `attachments` to `instance`, cloned when already used by other object"""
+        ct = ContentType.objects.get_for_model(instance)
+        free = list()
 
-            # just copied it then reupload file
-            for attachment in attachments_with_hazard:
-                attachment.pk = None
-                attachment.uuid = uuid.uuid4()
-                attachment.file = ContentFile(
-                    attachment.file.read(),
-                    name=attachment.file.name
-                )
+        for attachment in attachments:
+            if attachment.object_id is None:
+                free.append(attachment.id)
+                continue
 
-                attachment.save()
-                new_attachments.append(attachment)
+            if attachment.content_type_id == ct.id and attachment.object_id == str(instance.id):
+                continue
 
-            # set as new attachments
-            instance.attachments.set(new_attachments, bulk=True)
+            # clone share the stored file (blob), nothing copied
+            attachment.pk = None
+            attachment.uuid = uuid.uuid4()
+            attachment.content_object = instance
+            attachment.save()
 
-        # set only
-        if len(attachments_without_hazard) > 0:
-            instance.attachments.set(attachments_without_hazard, bulk=True)
+        if free:
+            Attachment.objects \
+                .filter(id__in=free) \
+                .update(content_type=ct, object_id=str(instance.id))
 
 
 class RetrieveHazardSerializer(BaseHazardSerializer):
     locations = LocationObjectRelatedFieldSerializer(many=True, read_only=True)
     source = serializers.SerializerMethodField()
     classify_display = serializers.CharField()
+    risk = serializers.SerializerMethodField()
 
     class Meta(BaseHazardSerializer.Meta):
         fields = '__all__'
@@ -195,14 +223,29 @@ class RetrieveHazardSerializer(BaseHazardSerializer):
             return obj.source
         return obj.author_name
 
+    def get_risk(self, obj):
+        # use `prefetch_risk()` on queryset, otherwise one query each
+        risk = obj.risk
+        if risk is None:
+            return None
+
+        return {
+            x.name: x.value_from_object(risk) for x in risk._meta.concrete_fields
+            if x.name not in RISK_EXCLUDE_FIELDS
+        }
+
 
 class ListHazardSerializer(RetrieveHazardSerializer):
+    # kilometer, only with `near` filter
+    distance = serializers.FloatField(read_only=True)
+
     class Meta(RetrieveHazardSerializer.Meta):
         fields = '__all__'
 
 
 class CreateHazardSerializer(BaseHazardSerializer):
     locations = LocationSerializer(many=True, required=False)
+    attachments = serializers.ListField(child=serializers.UUIDField(), required=False)
 
     class Meta(BaseHazardSerializer.Meta):
         fields = ('classify', 'incident', 'description',
@@ -219,10 +262,20 @@ class CreateHazardSerializer(BaseHazardSerializer):
     @transaction.atomic
     def create(self, validated_data):
         locations = validated_data.pop('locations', None)
+        attachments = validated_data.pop('attachments', None)
+
+        # submitter name as `source`, so not resolved on every read
+        if not validated_data.get('source'):
+            validated_data['source'] = self.user.name
+
         instance = self.Meta.model.objects.create(**validated_data)
 
         if locations and instance:
-            instance.set_locations(locations)
+            instance.upsert_locations(locations)
+
+        if attachments:
+            attachment_map = self.get_attachment_map(attachments)
+            self.set_attachments(instance, attachment_map.values())
 
         # don't forget chreate `activity`
         instance.activities.create(user=self.user)
@@ -231,68 +284,10 @@ class CreateHazardSerializer(BaseHazardSerializer):
         instance.refresh_from_db()
         return instance
 
-    @transaction.atomic
-    def createx(self, validated_data):
-        locations = validated_data.pop('locations', None)
-        instance = self.Meta.model.objects.create(**validated_data)
-
-        if locations:
-            instance.locations.set(locations)
-
-        # don't forget create `activity`
-        instance.activities.create(user=self.user)
-        return instance
-
-    @transaction.atomic
-    def creates(self, validated_data):
-        attachments = validated_data.pop('attachments', [])
-        locations = validated_data.pop('locations', [])
-        impacts = [x.pop('impacts', []) for x in locations]
-
-        # create hazard
-        instance = self.Meta.model.objects.create(**validated_data)
-
-        # set attachments
-        if len(attachments) > 0:
-            self.set_attachments(instance, attachments)
-
-        # make locations as object
-        locations_objs = [
-            instance.locations.model(content_object=instance, **x) for x in locations
-        ]
-
-        # create the locations
-        locations_id = [
-            x.get('id') for x in instance.locations.bulk_create_return_id(locations_objs)
-        ]
-
-        # create impacts for each locations
-        impacts_objs = list()
-        impact_model = None
-
-        for i, v in enumerate(instance.locations.filter(id__in=locations_id)):
-            # get impact model
-            if i == 0:
-                impact_model = v.impacts.model
-
-            for x, y in enumerate(impacts[i]):
-                impacts_objs.append(v.impacts.model(content_object=v, **y))
-
-        if impact_model and len(impacts_objs) > 0:
-            impact_model.objects.bulk_create(impacts_objs)
-
-        # create `activity`
-        instance.activities.create(user=self.user)
-        return instance
-
 
 class UpdateHazardSerializer(CreateHazardSerializer):
-    remove_attachments = serializers.SlugRelatedField(
-        slug_field='uuid',
-        many=True,
-        queryset=Attachment.objects.all(),
-        required=False
-    )
+    locations = LocationFieldSerialiser(many=True, required=False)
+    remove_attachments = serializers.ListField(child=serializers.UUIDField(), required=False)
 
     class Meta(CreateHazardSerializer.Meta):
         fields = ('classify', 'incident', 'description',
@@ -301,141 +296,25 @@ class UpdateHazardSerializer(CreateHazardSerializer):
     @transaction.atomic
     def update(self, instance, validated_data):
         locations = validated_data.pop('locations', None)
-        instance = super().update(instance, validated_data)
-
-        if locations:
-            instance.set_locations(locations)
-
-        instance.refresh_from_db()
-        return instance
-
-    @transaction.atomic
-    def updatex(self, instance, validated_data):
-        """
-        Masalahnya adalah ketika `impacts` ada di `locations` yang belum
-        tersimpan. Locations baru tidak memiliki impacts walaupun telah diset.
-        """
         attachments = validated_data.pop('attachments', [])
         remove_attachments = validated_data.pop('remove_attachments', [])
-        locations = validated_data.pop('locations', [])
-        impacts = [x.pop('impacts', []) for x in locations]
-
         instance = super().update(instance, validated_data)
 
-        # set attachments
-        if len(attachments) > 0:
-            self.set_attachments(instance, attachments)
+        if locations:
+            instance.upsert_locations(locations)
+
+        # ownership of both list checked in one query
+        attachment_map = self.get_attachment_map(attachments + remove_attachments)
 
-        # delete attachments
-        if len(remove_attachments) > 0:
-            self.remove_attachments(instance, remove_attachments)
+        if attachments:
+            self.set_attachments(instance, [
+                attachment_map[x] for x in attachments if x in attachment_map
+            ])
 
-        # Maps for id->instance and id->data item.
-        locations_mapping = {x.uuid: x for x in instance.locations.all()}
-        locations_data_mapping = {
-            x.get('uuid', None): x for x in locations if not x.get('delete', False)
-        }
+        if remove_attachments:
+            self.detach_attachments(instance, [
+                attachment_map[x] for x in remove_attachments if x in attachment_map
+            ])
 
-        # Perform locations delete.
-        locations_delete_uuids = [
-            x.get('uuid', None) for x in locations if x.get('delete', False)
-        ]
-
-        if len(locations_delete_uuids) > 0:
-            locations_delete_instance = instance.locations \
-                .filter(uuid__in=locations_delete_uuids)
-
-            if locations_delete_instance.exists():
-                locations_delete_instance.delete()
-
-        # Perform locations creations and updates.
-        locations_update = list()
-        locations_update_fields = list()
-        locations_create = list()
-
-        for index, (uuid, data) in enumerate(locations_data_mapping.items()):
-            # remove unused field
-            data.pop('uuid', None)
-
-            # get current location
-            location_obj = locations_mapping.get(uuid)
-
-            # START IMPACTS
-            if location_obj:
-                impacts_mapping = {
-                    x.uuid: x for x in location_obj.impacts.all()
-                }
-
-                impacts_data_mapping = {
-                    x.get('uuid', None): x for x in impacts[index]
-                }
-
-                impacts_update = list()
-                impacts_update_fields = list()
-                impacts_create = list()
-
-                for impact_uuid, impact_data in impacts_data_mapping.items():
-                    # remove uuid
-                    impact_data.pop('uuid', None)
-
-                    # get current impact
-                    impact_obj = impacts_mapping.get(impact_uuid, None)
-
-                    if impact_obj:
-                        # update
-                        for x in impact_data:
-                            setattr(impact_obj, x, impact_data.get(x))
-                            impacts_update_fields.append(x)
-                        impacts_update.append(impact_obj)
-                    else:
-                        # create
-                        impacts_create.append(
-                            location_obj.impacts.model(
-                                content_object=location_obj,
-                                **impact_data
-                            )
-                        )
-
-                if len(impacts_update) > 0:
-                    location_obj.impacts.bulk_update(
-                        impacts_update,
-                        fields=impacts_update_fields
-                    )
-
-                if len(impacts_create) > 0:
-                    _impacts_id = [
-                        x.get('id') for x in location_obj.impacts.bulk_create_return_id(impacts_create)
-                    ]
-
-                # END OF IMPACTS
-
-            if location_obj:
-                # update
-                for x in data:
-                    setattr(location_obj, x, data.get(x))
-                    locations_update_fields.append(x)
-                locations_update.append(location_obj)
-            else:
-                # create
-                locations_create.append(
-                    instance.locations.model(content_object=instance, **data)
-                )
-
-        # perform location update
-        if len(locations_update) > 0:
-            instance.locations.bulk_update(
-                locations_update,
-                fields=locations_update_fields
-            )
-
-        # perform location create
-        # create the locations
-        if len(locations_create) > 0:
-            locations_id = [
-                x.get('id') for x in instance.locations.bulk_create_return_id(locations_create)
-            ]
-
-            print(instance.locations.filter(id__in=locations_id).count())
-            print(len(impacts))
         instance.refresh_from_db()
         return instance
@@ -1,21 +1,36 @@
+import math
+
 from copy import copy
+from datetime import datetime, time, timedelta
 
+from django.core.cache import cache
 from django.db import transaction
+from django.db.models import Prefetch
 from django.core.exceptions import ObjectDoesNotExist, ValidationError as DjangoValidationError
 from django.apps import apps
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.utils.http import urlencode
+from django.utils.translation import gettext_lazy as _
 
 from rest_framework import viewsets, status as response_status
+from rest_framework.decorators import action
 from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 
+from core.constant import HazardClassify
 from core.loading import build_pagination
+from apps.generic.search import search
+from apps.threat import heatmap, importer
+from apps.threat.conf import settings
 from .serializers import CreateHazardSerializer, ListHazardSerializer, RetrieveHazardSerializer, UpdateHazardSerializer
 from ....permissions import IsHazardCreatorOrReadOnly
-from ....models import HAZARD_CLASSIFY_MODEL_MAPPER
 
 Hazard = apps.get_registered_model('threat', 'Hazard')
+Activity = apps.get_registered_model('generic', 'Activity')
 
 
 class BaseViewSet(viewsets.ViewSet):
@@ -34,7 +49,11 @@ class HazardAPIViewSet(BaseViewSet):
     -----
 
         {
-            "classify": "101"
+            "classify": "101,103", // one or more, comma separated
+            "q": "banjir bekasi", // search, ordered by rank
+            "near": "-6.2,106.8,100", // earthquake within 100 km, ordered by distance
+            "magnitude": 5, // with `near`, at least
+            "days": 7 // with `near`, occur in the last days
         }
 
 
@@ -50,6 +69,7 @@ class HazardAPIViewSet(BaseViewSet):
             "incident": "banjir bro",
             "description": "lipsum",
             "occur_at": "2012-09-04 06:00:00.000000",
+            "attachments": ["uuid4"], // owned by user
             "locations": [
                 {
                     "latitude": 13.45151,
@@ -75,6 +95,8 @@ class HazardAPIViewSet(BaseViewSet):
             "incident": "banjir bro",
             "description": "lipsum",
             "occur_at": "2012-09-04 06:00:00.000000",
+            "attachments": ["uuid4"], // owned by user, cloned when used by other object
+            "remove_attachments": ["uuid4"], // unlinked, file kept
             "locations": [
                 {
                     "uuid": "uuid4", // for update or delete
@@ -94,6 +116,52 @@ class HazardAPIViewSet(BaseViewSet):
                 }
             ]
         }
+
+
+    GET heatmap/
+    -----
+
+        {
+            "classify": "101,103", // optional
+            "occur_from": "2020-01-01", // optional
+            "occur_to": "2021-12-31", // optional
+            "cell": 0.25, // degree
+            "bounds": "-11,94,6.5,141.5" // south,west,north,east
+        }
+
+        Number of hazard location per cell, `grid` is zlib compressed
+        little-endian uint32 in base64, `shape` rows from south;
+
+        {
+            "bounds": [-11.0, 94.0, 6.5, 141.5],
+            "cell": 0.25,
+            "shape": [70, 190],
+            "total": 1200,
+            "max": 37,
+            "dtype": "uint32",
+            "encoding": "zlib+base64",
+            "grid": "eJzt..."
+        }
+
+
+    POST import/
+    -----
+
+        Many hazard at once, as multipart `file` or as raw request body.
+        `input` is ndjson or csv, default from file extension or content type.
+        NDJSON line same as POST above, CSV columns;
+
+            classify,incident,occur_at,description,latitude,longitude,impacts
+
+        `impacts` is JSON list. Invalid row skipped and reported;
+
+        {
+            "created": 998,
+            "failed": 2,
+            "errors": [
+                {"line": 7, "errors": {"occur_at": ["This field is required."]}}
+            ]
+        }
     """
     lookup_field = 'uuid'
     permission_classes = (IsAuthenticated,)
@@ -101,6 +169,7 @@ class HazardAPIViewSet(BaseViewSet):
     permission_action = {
         'list': (AllowAny,),
         'retrieve': (AllowAny,),
+        'heatmap': (AllowAny,),
         'destroy': (IsHazardCreatorOrReadOnly,),
         'partial_update': (IsHazardCreatorOrReadOnly,),
     }
@@ -118,9 +187,14 @@ class HazardAPIViewSet(BaseViewSet):
             return [permission() for permission in self.permission_classes]
 
     def get_queryset(self):
+        activities = Activity.objects.select_related('user').order_by('id')
         queryset = Hazard.objects \
-            .prefetch_related('locations', 'locations__impacts', 'attachments') \
-            .order_by('-id')
+            .prefetch_related(
+                'locations', 'locations__impacts', 'attachments',
+                Prefetch('activities', queryset=activities)
+            ) \
+            .prefetch_risk() \
+            .order_by('-occur_at', '-id')
 
         return queryset
 
@@ -137,20 +211,85 @@ class HazardAPIViewSet(BaseViewSet):
 
         return instance
 
+    def _classifies(self):
+        classify = self.request.query_params.get('classify')
+        if not classify:
+            return []
+
+        classifies = [x.strip() for x in classify.split(',') if x.strip()]
+        invalid = [x for x in classifies if x not in HazardClassify.values]
+
+        if invalid:
+            raise ValidationError({'classify': _("Invalid classify %s") % ', '.join(invalid)})
+        return classifies
+
+    def _date(self, name):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            date = parse_date(value)
+        except ValueError:
+            date = None
+
+        if date is None:
+            raise ValidationError({name: _("Use YYYY-MM-DD format")})
+        return date
+
+    def _floats(self, name, *counts):
+        value = self.request.query_params.get(name)
+        if not value:
+            return None
+
+        try:
+            values = tuple(float(x) for x in value.split(','))
+        except ValueError:
+            values = ()
+
+        # `nan` and `inf` parsed by float, fail later as 500
+        if len(values) not in counts or not all(math.isfinite(x) for x in values):
+            raise ValidationError({name: _("Must be %s number") % ' or '.join(str(x) for x in counts)})
+        return values
+
+    def _near(self, queryset):
+        near = self._floats('near', 2, 3)
+        if not near:
+            return queryset
+
+        latitude, longitude = near[:2]
+        distance = near[2] if len(near) > 2 else settings.THREAT_NEAR_DISTANCE
+
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            raise ValidationError({'near': _("Invalid coordinate")})
+
+        if not 0 < distance <= settings.THREAT_NEAR_MAX_DISTANCE:
+            raise ValidationError({
+                'near': _("Distance must be greater than 0 and at most %s km") % settings.THREAT_NEAR_MAX_DISTANCE
+            })
+
+        magnitude = self._floats('magnitude', 1)
+        days = self._floats('days', 1)
+
+        queryset = queryset.near(latitude, longitude, distance, magnitude=magnitude[0] if magnitude else None)
+        if days:
+            queryset = queryset.filter(occur_at__gte=timezone.now() - timedelta(days=days[0]))
+
+        return queryset.order_by('distance', '-occur_at', '-id')
+
     def list(self, request):
-        classify = request.query_params.get('classify')
-        queryset = self.get_queryset().filter(landslide__isnull=False)
+        queryset = self.get_queryset()
 
-        if classify:
-            try:
-                model_name = HAZARD_CLASSIFY_MODEL_MAPPER[classify]._meta.model_name
-            except IndexError:
-                model_name = None
+        # `classify` is the hazard column, no join to risk table
+        classifies = self._classifies()
+        if classifies:
+            queryset = queryset.filter(classify__in=classifies)
 
-            if model_name:
-                queryset = queryset.filter(
-                    **{'%s__isnull' % model_name: False}
-                )
+        queryset = self._near(queryset)
+
+        q = request.query_params.get('q')
+        if q:
+            queryset = search(queryset, q)
 
         paginator = LimitOffsetPagination()
         paginate_queryset = paginator.paginate_queryset(queryset, request)
@@ -225,3 +364,81 @@ class HazardAPIViewSet(BaseViewSet):
         )
 
         return Response(serializer.data, status=response_status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_name='heatmap', url_path='heatmap')
+    def heatmap(self, request):
+        classifies = self._classifies()
+        start = self._date('occur_from')
+        end = self._date('occur_to')
+        bounds = self._floats('bounds', 4) or settings.THREAT_HEATMAP_BOUNDS
+        cell = (self._floats('cell', 1) or (settings.THREAT_HEATMAP_CELL,))[0]
+
+        south, west, north, east = bounds
+        if not (-90 <= south < north <= 90 and -180 <= west < east <= 180):
+            raise ValidationError({'bounds': _("Invalid bounds")})
+
+        if cell <= 0:
+            raise ValidationError({'cell': _("Must be greater than 0")})
+
+        rows, cols = heatmap.get_shape(bounds, cell)
+        if rows * cols > settings.THREAT_HEATMAP_MAX_CELLS:
+            raise ValidationError({'cell': _("Too small for the bounds")})
+
+        params = {
+            'classify': ','.join(sorted(classifies)),
+            'occur_from': start or '',
+            'occur_to': end or '',
+            'cell': cell,
+            'bounds': ','.join(str(x) for x in bounds),
+        }
+
+        # version changed by each hazard change, old key just expire
+        key = 'threat-heatmap:%s:%s' % (heatmap.get_version(), urlencode(params))
+        result = cache.get(key)
+
+        if result is None:
+            queryset = Hazard.objects.all()
+            if classifies:
+                queryset = queryset.filter(classify__in=classifies)
+
+            # full day in local time, range so `occur_at` index used
+            if start:
+                queryset = queryset.filter(
+                    occur_at__gte=timezone.make_aware(datetime.combine(start, time.min))
+                )
+
+            if end:
+                queryset = queryset.filter(
+                    occur_at__lt=timezone.make_aware(datetime.combine(end + timedelta(days=1), time.min))
+                )
+
+            result = heatmap.build(queryset, bounds=bounds, cell=cell)
+            cache.set(key, result, settings.THREAT_HEATMAP_CACHE_TIMEOUT)
+
+        return Response(result, status=response_status.HTTP_200_OK)
+
+    def _import_input(self, request, name=''):
+        value = request.query_params.get('input')
+        if not value:
+            csv = name.lower().endswith('.csv') or request.content_type.startswith('text/csv')
+            value = 'csv' if csv else 'ndjson'
+
+        if value not in importer.FORMATS:
+            raise ValidationError({'input': _("Choose %s") % ', '.join(importer.FORMATS)})
+        return value
+
+    @action(methods=['POST'], detail=False, url_name='import', url_path='import',
+            parser_classes=(MultiPartParser,))
+    def bulk_import(self, request):
+        if request.content_type.startswith('multipart/'):
+            upload = request.FILES.get('file')
+            if upload is None:
+                raise ValidationError({'file': _("This field is required.")})
+            lines, name = upload, upload.name
+        else:
+            # raw body read line by line, not loaded to memory
+            lines, name = request.stream or [], ''
+
+        rows = importer.read(lines, self._import_input(request, name))
+        result = importer.import_hazards(rows, user=request.user)
+        return Response(result, status=response_status.HTTP_200_OK)
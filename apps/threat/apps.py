@@ -1,5 +1,5 @@
 from django.apps import AppConfig
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 
 
 class ThreatConfig(AppConfig):
@@ -8,10 +8,19 @@ class ThreatConfig(AppConfig):
     label = 'threat'
 
     def ready(self):
-        from .signals import create_hazard
+        from .signals import create_hazard, invalidate_heatmap
+
+        Hazard = self.get_model('Hazard')
 
         post_save.connect(
             create_hazard,
-            sender=self.get_model('Hazard'),
+            sender=Hazard,
             dispatch_uid='create_hazard'
         )
+
+        for signal in (post_save, post_delete):
+            signal.connect(
+                invalidate_heatmap,
+                sender=Hazard,
+                dispatch_uid='invalidate_heatmap'
+            )
@@ -4,5 +4,27 @@ from appconf import AppConf
 
 
 class ThreatAppConf(AppConf):
+    # bulk hazard import
+    IMPORT_CHUNK_SIZE = 500
+    IMPORT_MAX_ERRORS = 1000  # errors reported, all invalid row still skipped
+
+    # hazard heatmap, bounds is (south, west, north, east) in degree
+    HEATMAP_BOUNDS = (-11.0, 94.0, 6.5, 141.5)  # indonesia
+    HEATMAP_CELL = 0.25  # degree, default when not requested
+    HEATMAP_MAX_CELLS = 1000000
+    HEATMAP_CHUNK_SIZE = 50000  # locations read per query
+    HEATMAP_CACHE_TIMEOUT = 3600  # seconds
+
+    # earthquake `near` query, run `build_earthquake_cells` after cell changed
+    EARTHQUAKE_CELL = 0.5  # degree
+    NEAR_DISTANCE = 100  # kilometer, when not requested
+    NEAR_MAX_DISTANCE = 500
+
+    # hazard to official disaster link, see `apps.threat.linker`
+    LINK_WINDOW = 86400  # seconds
+    LINK_DISTANCE = 50  # kilometer
+    LINK_CELL = 0.5  # degree
+    LINK_BATCH_SIZE = 2000
+
     class Meta:
         perefix = 'threat'
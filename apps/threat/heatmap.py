@@ -0,0 +1,116 @@
+"""
+Hazard density grid for heatmap.
+
+Location coordinates of matching hazards read in chunks as NumPy array
+and counted per lat/lon cell with `np.histogram2d`, memory stay at one
+chunk whatever the number of points. Grid returned as zlib compressed
+little-endian uint32, row 0 is the south edge;
+
+    grid = np.frombuffer(zlib.decompress(b64decode(data['grid'])), '<u4')
+    grid = grid.reshape(data['shape'])
+"""
+import base64
+import zlib
+
+from itertools import islice
+
+import numpy as np
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.db.models import CharField
+from django.db.models.functions import Cast
+
+from apps.threat.conf import settings
+
+Hazard = apps.get_registered_model('threat', 'Hazard')
+Location = apps.get_registered_model('generic', 'Location')
+
+VERSION_KEY = 'threat-heatmap:version'
+DTYPE = '<u4'
+
+
+def get_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def bump_version():
+    """Invalidate all cached grid"""
+    cache.add(VERSION_KEY, 1, None)
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def get_shape(bounds, cell):
+    south, west, north, east = bounds
+    return int(np.ceil((north - south) / cell)), int(np.ceil((east - west) / cell))
+
+
+def get_points(hazards, bounds=None, chunk_size=None):
+    """
+    Yield (n, 2) float array of latitude, longitude of `hazards` locations,
+    only inside `bounds` when given.
+    """
+    chunk_size = chunk_size or settings.THREAT_HEATMAP_CHUNK_SIZE
+
+    # object_id is char, compare with casted id so index still used
+    ids = hazards.order_by().annotate(object_pk=Cast('id', CharField())).values('object_pk')
+    queryset = Location.objects \
+        .filter(content_type=ContentType.objects.get_for_model(Hazard), object_id__in=ids) \
+        .order_by()
+
+    if bounds:
+        south, west, north, east = bounds
+        queryset = queryset.filter(latitude__range=(south, north), longitude__range=(west, east))
+
+    queryset = queryset \
+        .values_list('latitude', 'longitude') \
+        .iterator(chunk_size=chunk_size)
+
+    while True:
+        rows = list(islice(queryset, chunk_size))
+        if not rows:
+            return
+        yield np.array(rows, dtype=np.float64)
+
+
+def histogram(chunks, bounds, cell):
+    """Count points of `chunks` per cell, point outside `bounds` ignored"""
+    south, west, north, east = bounds
+    rows, cols = get_shape(bounds, cell)
+
+    # edge from cell size, last cell may go past north or east bound
+    extent = [[south, south + rows * cell], [west, west + cols * cell]]
+    grid = np.zeros((rows, cols), dtype=np.uint32)
+
+    for points in chunks:
+        counts, _, _ = np.histogram2d(points[:, 0], points[:, 1], bins=(rows, cols), range=extent)
+        grid += counts.astype(np.uint32)
+
+    return grid
+
+
+def encode(grid):
+    data = zlib.compress(grid.astype(DTYPE).tobytes(), 6)
+    return base64.b64encode(data).decode('ascii')
+
+
+def build(hazards, bounds=None, cell=None):
+    """Heatmap of `hazards` queryset, ready for response"""
+    bounds = bounds or settings.THREAT_HEATMAP_BOUNDS
+    cell = cell or settings.THREAT_HEATMAP_CELL
+    grid = histogram(get_points(hazards, bounds=bounds), bounds, cell)
+
+    return {
+        'bounds': list(bounds),
+        'cell': cell,
+        'shape': list(grid.shape),
+        'total': int(grid.sum()),
+        'max': int(grid.max()) if grid.size else 0,
+        'dtype': 'uint32',
+        'encoding': 'zlib+base64',
+        'grid': encode(grid),
+    }
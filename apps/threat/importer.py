@@ -0,0 +1,212 @@
+"""
+Bulk hazard import from NDJSON or CSV, eg; BPBD historical data.
+
+Rows read as stream and validated per chunk. Valid rows inserted with
+one bulk insert each for hazard (+ risk subtype), location, impact and
+activity; invalid row reported by line number and skipped, it never
+abort the import.
+
+NDJSON line is the same as hazard POST body. CSV row has one location
+from `latitude` and `longitude` column, `impacts` column is JSON list.
+
+    result = import_hazards(read(open('hazards.csv', 'rb'), 'csv'), user)
+    result['created'], result['errors']
+"""
+import csv
+import json
+
+from itertools import islice
+from uuid import UUID
+
+from django.apps import apps
+from django.db import DatabaseError, transaction
+
+from rest_framework import serializers
+
+from apps.generic.search import index
+from apps.threat.heatmap import bump_version
+from apps.threat.api.v1.hazard.serializers import LocationSerializer
+from apps.threat.conf import settings
+
+Hazard = apps.get_registered_model('threat', 'Hazard')
+Location = apps.get_registered_model('generic', 'Location')
+Impact = apps.get_registered_model('generic', 'Impact')
+Activity = apps.get_registered_model('generic', 'Activity')
+
+FORMATS = ('ndjson', 'csv')
+
+
+class HazardRowSerializer(serializers.ModelSerializer):
+    locations = LocationSerializer(many=True, required=False)
+
+    class Meta:
+        model = Hazard
+        fields = ('classify', 'source', 'incident', 'occur_at', 'description',
+                  'reason', 'chronology', 'status', 'locations',)
+
+
+def _decode(lines):
+    for line in lines:
+        yield line.decode('utf-8-sig') if isinstance(line, bytes) else line
+
+
+def read_ndjson(lines):
+    """Yield (line number, data, parse error)"""
+    for number, line in enumerate(_decode(lines), 1):
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield number, None, str(e)
+            continue
+
+        if isinstance(data, dict):
+            yield number, data, None
+        else:
+            yield number, None, "Row must be an object"
+
+
+def read_csv(lines):
+    """Yield (line number, data, parse error), empty cell as missing"""
+    reader = csv.DictReader(_decode(lines))
+
+    for row in reader:
+        data = {k: v for k, v in row.items() if k and v not in (None, '')}
+        latitude = data.pop('latitude', None)
+        longitude = data.pop('longitude', None)
+        impacts = data.pop('impacts', None)
+
+        if latitude is not None or longitude is not None:
+            try:
+                impacts = json.loads(impacts) if impacts else []
+            except ValueError as e:
+                yield reader.line_num, None, 'impacts: %s' % e
+                continue
+
+            data['locations'] = [
+                {'latitude': latitude, 'longitude': longitude, 'impacts': impacts}
+            ]
+
+        yield reader.line_num, data, None
+
+
+def read(lines, format):
+    if format not in FORMATS:
+        raise ValueError("Format must be one of %s" % ', '.join(FORMATS))
+    return read_csv(lines) if format == 'csv' else read_ndjson(lines)
+
+
+def _set_ids(model, objs, created):
+    """Set id of bulk inserted `objs` from returned `created` rows, matched by uuid"""
+    ids = {UUID(str(x['uuid'])): x['id'] for x in created}
+
+    # returned rows may miss some, read back like `_bulk_apply`
+    missing = [x.uuid for x in objs if x.uuid not in ids]
+    if missing:
+        ids.update(model.objects.filter(uuid__in=missing).values_list('uuid', 'id'))
+
+    for obj in objs:
+        obj.pk = ids[obj.uuid]
+        obj._state.adding = False
+
+
+def insert(rows, user=None):
+    """Insert validated rows, return the created hazards"""
+    hazards = list()
+    locations = list()
+    impacts = list()
+
+    for data in rows:
+        data = dict(data)
+        items = data.pop('locations', None) or []
+        hazard = Hazard(**data)
+
+        # same as `author_name` from activity
+        if not hazard.source and user:
+            hazard.source = user.name
+
+        hazards.append((hazard, items))
+
+    # risk subtype created by manager, no `create_hazard` signal
+    hazard_objs = [x for x, _ in hazards]
+    _set_ids(Hazard, hazard_objs, Hazard.objects.bulk_create_return_with_id(hazard_objs))
+
+    for hazard, items in hazards:
+        for item in items:
+            item = dict(item)
+            location = Location(content_object=hazard, **{
+                k: v for k, v in item.items() if k != 'impacts'
+            })
+            location.clean_terms()
+            locations.append((location, item.get('impacts') or []))
+
+    if locations:
+        location_objs = [x for x, _ in locations]
+        _set_ids(Location, location_objs, Location.objects.bulk_create_return_id(location_objs))
+
+        for location, items in locations:
+            impacts.extend(Impact(content_object=location, **x) for x in items)
+
+        if impacts:
+            Impact.objects.bulk_create(impacts)
+
+    if user:
+        Activity.objects.bulk_create([
+            Activity(user=user, content_object=x, identifier='threat_hazard')
+            for x in hazard_objs
+        ])
+
+    return hazard_objs
+
+
+def import_hazards(rows, user=None, chunk_size=None):
+    """
+    Import `rows` from `read()`, each chunk in its own transaction.
+    Return {'created', 'failed', 'errors'}, errors is list of
+    {'line', 'errors'} limited by `THREAT_IMPORT_MAX_ERRORS`.
+    """
+    chunk_size = chunk_size or settings.THREAT_IMPORT_CHUNK_SIZE
+    result = {'created': 0, 'failed': 0, 'errors': list()}
+
+    def fail(line, errors):
+        result['failed'] += 1
+        if len(result['errors']) < settings.THREAT_IMPORT_MAX_ERRORS:
+            result['errors'].append({'line': line, 'errors': errors})
+
+    # one instance so fields built once, like `many=True` does
+    serializer = HazardRowSerializer()
+
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            return result
+
+        valid = list()
+        for line, data, error in chunk:
+            if error:
+                fail(line, error)
+                continue
+
+            try:
+                valid.append((line, serializer.run_validation(data)))
+            except serializers.ValidationError as e:
+                fail(line, e.detail)
+
+        if not valid:
+            continue
+
+        try:
+            with transaction.atomic():
+                hazards = insert([x for _, x in valid], user=user)
+                index(hazards)
+                transaction.on_commit(bump_version)
+        except DatabaseError as e:
+            for line, _ in valid:
+                fail(line, str(e))
+            continue
+
+        result['created'] += len(hazards)
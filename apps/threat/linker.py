@@ -0,0 +1,242 @@
+"""
+Link hazard submitted by user to official disaster of the same event.
+
+Hazard and disaster match when their kind is the same (`IDENTIFIERS`),
+they occur within `THREAT_LINK_WINDOW` and any of their locations is
+within `THREAT_LINK_DISTANCE`. Locations of both side become points
+sorted by (grid cell, time) and joined in one merge pass, so a point
+only compared with points of nearby cell in the time window.
+
+Incremental, new hazards matched with disasters already processed, then
+new disasters with all hazards processed. Each pair checked once.
+
+    linked = link()
+    hazard.disaster_links.all()
+"""
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
+from django.db.models import CharField, Q
+from django.db.models.functions import Cast
+
+from apps.ews.utils import get_checkpoint, set_checkpoint
+from apps.threat.conf import settings
+from core.geo import get_cell, get_cells, haversine
+
+Hazard = apps.get_registered_model('threat', 'Hazard')
+DisasterLink = apps.get_registered_model('threat', 'DisasterLink')
+Location = apps.get_registered_model('generic', 'Location')
+Disaster = apps.get_registered_model('ews', 'Disaster')
+DisasterLocation = apps.get_registered_model('ews', 'DisasterLocation')
+
+CHECKPOINT = 'hazard-link'
+
+# hazard classify: disaster identifier of the same event
+IDENTIFIERS = {
+    '101': ('101',),  # banjir
+    '102': ('105',),  # badai, puting beliung
+    '103': ('102',),  # tanah longsor
+    '104': ('107',),  # kebakaran hutan dan lahan
+    '105': ('108', '110'),  # gempa bumi
+    '106': ('104',),  # abrasi
+    '107': ('106',),  # kekeringan
+    '108': ('109', '110'),  # tsunami
+    '109': ('111',),  # letusan gunung api
+}
+
+
+def _conditions(times, window):
+    """
+    Q of `occur_at` within `window` of any `times`, overlapped range
+    merged. Split per 100 range, don't send thousands OR at once.
+    """
+    ranges = list()
+
+    for time in sorted(times):
+        start, end = time - window, time + window
+        if ranges and ranges[-1][1] >= start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    return [
+        reduce(or_, [Q(occur_at__gte=start, occur_at__lte=end) for start, end in ranges[i:i + 100]])
+        for i in range(0, len(ranges), 100)
+    ]
+
+
+def _valid(latitude, longitude):
+    # default 0, 0 mean location without coordinate
+    return latitude is not None and longitude is not None \
+        and (latitude, longitude) != (0, 0)
+
+
+def hazard_points(queryset):
+    """[(timestamp, hazard_id, classify, latitude, longitude)] of each location"""
+    hazards = {
+        id: (occur_at.timestamp(), classify)
+        for id, occur_at, classify in queryset.values_list('id', 'occur_at', 'classify')
+    }
+
+    # object_id is char, compare with casted id so index still used
+    ids = queryset.order_by().annotate(object_pk=Cast('id', CharField())).values('object_pk')
+    locations = Location.objects \
+        .filter(content_type=ContentType.objects.get_for_model(Hazard), object_id__in=ids) \
+        .values_list('object_id', 'latitude', 'longitude')
+
+    points = list()
+    for object_id, latitude, longitude in locations:
+        hazard = hazards.get(int(object_id))
+        if hazard and _valid(latitude, longitude):
+            points.append((hazard[0], int(object_id), hazard[1], latitude, longitude))
+
+    return points
+
+
+def disaster_points(queryset):
+    """[(timestamp, disaster_id, identifier, latitude, longitude)] of each location"""
+    locations = DisasterLocation.objects \
+        .filter(disaster__in=queryset.order_by().values('id')) \
+        .values_list('disaster_id', 'disaster__occur_at', 'disaster__identifier',
+                     'latitude', 'longitude')
+
+    return [
+        (occur_at.timestamp(), id, identifier, latitude, longitude)
+        for id, occur_at, identifier, latitude, longitude in locations
+        if _valid(latitude, longitude)
+    ]
+
+
+def match(hazards, disasters, window=None, distance=None, size=None):
+    """
+    Sort-merge join of hazard and disaster points.
+
+    Hazard point copied to each cell its `distance` circle touch,
+    disaster point in its own cell. Both sorted by (cell, timestamp),
+    for each hazard the disaster window [t - window, t + window] in
+    the same cell only move forward, no disaster compared twice
+    per hazard point.
+
+    Return; {(hazard_id, disaster_id): (distance, lag)}
+    """
+    window = window or settings.THREAT_LINK_WINDOW
+    distance = distance or settings.THREAT_LINK_DISTANCE
+    size = size or settings.THREAT_LINK_CELL
+
+    left = sorted(
+        (cell, t, id, classify, lat, lon)
+        for t, id, classify, lat, lon in hazards if classify in IDENTIFIERS
+        for cell in get_cells(lat, lon, distance, size)
+    )
+    right = sorted(
+        (get_cell(lat, lon, size), t, id, identifier, lat, lon)
+        for t, id, identifier, lat, lon in disasters
+    )
+
+    links = dict()
+    start = 0
+
+    for cell, t, hazard_id, classify, lat, lon in left:
+        while start < len(right) and right[start][:2] < (cell, t - window):
+            start += 1
+
+        end = (cell, t + window)
+        identifiers = IDENTIFIERS[classify]
+
+        for i in range(start, len(right)):
+            d_cell, d_t, disaster_id, identifier, d_lat, d_lon = right[i]
+            if (d_cell, d_t) > end:
+                break
+
+            if identifier not in identifiers:
+                continue
+
+            km = haversine(lat, lon, d_lat, d_lon)
+            if km > distance:
+                continue
+
+            key = (hazard_id, disaster_id)
+            if key not in links or km < links[key][0]:
+                links[key] = (km, int(t - d_t))
+
+    return links
+
+
+def save(links):
+    DisasterLink.objects.bulk_create(
+        [
+            DisasterLink(hazard_id=h, disaster_id=d, distance=km, lag=lag)
+            for (h, d), (km, lag) in links.items()
+        ],
+        batch_size=1000,
+        ignore_conflicts=True
+    )
+    return len(links)
+
+
+def _batches(queryset, last_id, batch_size):
+    """Yield [(id, occur_at)] after `last_id` ordered by id"""
+    while True:
+        rows = list(
+            queryset
+            .filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', 'occur_at')
+            [:batch_size]
+        )
+
+        if not rows:
+            return
+
+        yield rows
+        last_id = rows[-1][0]
+
+
+def link(batch_size=None):
+    """Link new hazards and new disasters since last run, return pairs linked"""
+    batch_size = batch_size or settings.THREAT_LINK_BATCH_SIZE
+    window = timedelta(seconds=settings.THREAT_LINK_WINDOW)
+
+    checkpoint = get_checkpoint(CHECKPOINT)
+    hazard_id = checkpoint.get('hazard_id', 0)
+    disaster_id = checkpoint.get('disaster_id', 0)
+    linked = 0
+
+    hazards = Hazard.objects.filter(classify__in=IDENTIFIERS)
+    disasters = Disaster.objects.all()
+
+    # new hazard with processed disaster, new disaster checked below
+    for rows in _batches(hazards, hazard_id, batch_size):
+        ids = [x[0] for x in rows]
+        candidates = disasters.filter(id__lte=disaster_id)
+        points = [
+            x for condition in _conditions([x[1] for x in rows], window)
+            for x in disaster_points(candidates.filter(condition))
+        ]
+
+        with transaction.atomic():
+            linked += save(match(hazard_points(hazards.filter(id__in=ids)), points))
+
+            hazard_id = ids[-1]
+            set_checkpoint(CHECKPOINT, {'hazard_id': hazard_id, 'disaster_id': disaster_id})
+
+    # new disaster with all processed hazard
+    for rows in _batches(disasters, disaster_id, batch_size):
+        ids = [x[0] for x in rows]
+        candidates = hazards.filter(id__lte=hazard_id)
+        points = [
+            x for condition in _conditions([x[1] for x in rows], window)
+            for x in hazard_points(candidates.filter(condition))
+        ]
+
+        with transaction.atomic():
+            linked += save(match(points, disaster_points(disasters.filter(id__in=ids))))
+
+            disaster_id = ids[-1]
+            set_checkpoint(CHECKPOINT, {'hazard_id': hazard_id, 'disaster_id': disaster_id})
+
+    return linked
@@ -0,0 +1,49 @@
+from django.apps import apps
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+Hazard = apps.get_registered_model('threat', 'Hazard')
+Activity = apps.get_registered_model('generic', 'Activity')
+
+
+class Command(BaseCommand):
+    help = "Fill empty hazard `source` with the name of the submitter, run once"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        ct = ContentType.objects.get_for_model(Hazard)
+        queryset = Hazard.objects \
+            .filter(Q(source__isnull=True) | Q(source='')) \
+            .order_by('id')
+
+        total = 0
+        last_id = 0
+        while True:
+            objs = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not objs:
+                break
+
+            last_id = objs[-1].id
+            activities = Activity.objects \
+                .filter(content_type=ct, object_id__in=[str(x.id) for x in objs]) \
+                .exclude(user__isnull=True) \
+                .select_related('user') \
+                .order_by('-id')
+
+            # first activity is the submitter, later one win in dict
+            names = {x.object_id: x.user.name for x in activities}
+
+            updated = list()
+            for obj in objs:
+                name = names.get(str(obj.id))
+                if name:
+                    obj.source = name
+                    updated.append(obj)
+
+            Hazard.objects.bulk_update(updated, ['source'])
+            total += len(updated)
+
+        self.stdout.write('%s hazard source filled' % total)
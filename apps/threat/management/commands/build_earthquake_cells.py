@@ -0,0 +1,32 @@
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+Earthquake = apps.get_registered_model('threat', 'Earthquake')
+
+
+class Command(BaseCommand):
+    help = "Fill earthquake grid cell for `near` query, run after `THREAT_EARTHQUAKE_CELL` changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        queryset = Earthquake.objects \
+            .only('id', 'latitude', 'longitude', 'cell') \
+            .order_by('id')
+
+        total = 0
+        last_id = 0
+        while True:
+            objs = list(queryset.filter(id__gt=last_id)[:options['batch_size']])
+            if not objs:
+                break
+
+            last_id = objs[-1].id
+            for obj in objs:
+                obj.set_cell()
+
+            Earthquake.objects.bulk_update(objs, ['cell'])
+            total += len(objs)
+
+        self.stdout.write('%s earthquake cell built' % total)
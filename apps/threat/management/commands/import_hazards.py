@@ -0,0 +1,37 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.threat.importer import FORMATS, import_hazards, read
+
+
+class Command(BaseCommand):
+    help = "Import hazards from NDJSON or CSV file, invalid row skipped and reported"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file path")
+        parser.add_argument('--format', choices=FORMATS,
+                            help="Default from file extension")
+        parser.add_argument('--user', help="Username recorded as submitter")
+        parser.add_argument('--chunk-size', type=int)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        format = options.get('format') or ('csv' if path.lower().endswith('.csv') else 'ndjson')
+
+        user = None
+        if options.get('user'):
+            UserModel = get_user_model()
+            try:
+                user = UserModel.objects.get(**{UserModel.USERNAME_FIELD: options['user']})
+            except UserModel.DoesNotExist:
+                raise CommandError("User %s not found" % options['user'])
+
+        with open(path, 'rb') as f:
+            result = import_hazards(read(f, format), user=user, chunk_size=options.get('chunk_size'))
+
+        for error in result['errors']:
+            self.stderr.write('line %s: %s' % (error['line'], json.dumps(error['errors'])))
+
+        self.stdout.write('%s created, %s failed' % (result['created'], result['failed']))
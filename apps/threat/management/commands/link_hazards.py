@@ -0,0 +1,30 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.ews.utils import set_checkpoint
+from apps.threat.linker import CHECKPOINT, link
+
+
+class Command(BaseCommand):
+    help = "Link user submitted hazard to official disaster of the same event"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help="Start again from the first hazard and disaster"
+        )
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        if options.get('reset'):
+            set_checkpoint(CHECKPOINT, {'hazard_id': 0, 'disaster_id': 0})
+
+        start = time.perf_counter()
+        linked = link(batch_size=options.get('batch_size'))
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            '%s hazard disaster pair linked in %.2fs' % (linked, elapsed)
+        ))
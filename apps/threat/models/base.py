@@ -1,13 +1,156 @@
+import math
+
 from django.contrib.contenttypes.fields import GenericRelation
-from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ObjectDoesNotExist, ValidationError
 from django.db import models, transaction
+from django.db.models import F, prefetch_related_objects
+from django.db.models.functions import ASin, Cos, Power, Radians, Sin, Sqrt
+from django.db.models.query import ModelIterable
 from django.utils.translation import gettext_lazy as _
 
+from apps.threat.conf import settings
+from core.geo import EARTH_RADIUS, get_cells
 from core.models import AbstractCommonField, BulkCreateReturnIdManager
 from core.constant import HazardClassify
 
 
-class HazardManager(BulkCreateReturnIdManager, models.Manager):
+def load_risks(hazards):
+    """
+    Fetch risk subtype of `hazards` with one query per `classify`
+    and cache it on each hazard, so `hazard.risk` not hit database.
+    """
+    from . import HAZARD_CLASSIFY_MODEL_MAPPER
+
+    groups = dict()
+    for hazard in hazards:
+        if hazard.classify in HAZARD_CLASSIFY_MODEL_MAPPER:
+            groups.setdefault(hazard.classify, []).append(hazard)
+
+    for classify, items in groups.items():
+        model = HAZARD_CLASSIFY_MODEL_MAPPER[classify]
+        field = model._meta.get_field('hazard')
+        risks = model.objects.in_bulk([x.id for x in items], field_name='hazard_id')
+
+        for hazard in items:
+            risk = risks.get(hazard.id)
+
+            # None cached too, no query for hazard without risk
+            field.remote_field.set_cached_value(hazard, risk)
+            if risk is not None:
+                field.set_cached_value(risk, hazard)
+
+
+def get_distance(latitude, longitude, prefix=''):
+    """Haversine as database expression, kilometer from the point to `prefix` latitude and longitude"""
+    lat1 = math.radians(latitude)
+    lat2 = Radians(F(prefix + 'latitude'))
+    dlat = lat2 - lat1
+    dlon = Radians(F(prefix + 'longitude')) - math.radians(longitude)
+
+    a = Power(Sin(dlat / 2), 2) + math.cos(lat1) * Cos(lat2) * Power(Sin(dlon / 2), 2)
+    return 2 * EARTH_RADIUS * ASin(Sqrt(a))
+
+
+def _diff(items, existing, make):
+    """
+    Match `items` to `existing` {uuid: obj}, return (created, updated,
+    deleted, fields). Created and updated is list of (obj, item),
+    deleted is list of id, fields is all field name updated.
+    """
+    created, updated, deleted, fields = list(), list(), list(), set()
+
+    for item in items:
+        data = {
+            k: v for k, v in item.items() if k not in ('uuid', 'delete', 'impacts')
+        }
+
+        uuid = item.get('uuid')
+        if not uuid:
+            created.append((make(data), item))
+            continue
+
+        obj = existing.get(uuid)
+        if obj is None:
+            raise ValidationError(_("%(uuid)s not found") % {'uuid': uuid})
+
+        if item.get('delete'):
+            deleted.append(obj.id)
+            continue
+
+        for field, value in data.items():
+            setattr(obj, field, value)
+
+        fields.update(data)
+        updated.append((obj, item))
+
+    return created, updated, deleted, fields
+
+
+def _bulk_apply(model, created, updated, deleted, fields):
+    if created:
+        objs = [x for x, _ in created]
+        model.objects.bulk_create(objs)
+
+        # MySQL bulk create not return id
+        if any(x.pk is None for x in objs):
+            ids = dict(
+                model.objects
+                .filter(uuid__in=[x.uuid for x in objs])
+                .values_list('uuid', 'id')
+            )
+
+            for obj in objs:
+                obj.pk = ids[obj.uuid]
+
+    if updated and fields:
+        model.objects.bulk_update([x for x, _ in updated], fields)
+
+    if deleted:
+        # cascade to generic relation and send delete signal
+        model.objects.filter(id__in=deleted).delete()
+
+
+class HazardQuerySet(models.QuerySet):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._prefetch_risk = False
+
+    def _clone(self):
+        clone = super()._clone()
+        clone._prefetch_risk = self._prefetch_risk
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is not None
+        super()._fetch_all()
+
+        if self._prefetch_risk and not fetched and self._iterable_class is ModelIterable:
+            load_risks(self._result_cache)
+
+    def prefetch_risk(self):
+        """Like `prefetch_related` for the risk subtype of each hazard"""
+        clone = self._chain()
+        clone._prefetch_risk = True
+        return clone
+
+    def near(self, latitude, longitude, distance, magnitude=None):
+        """
+        Earthquake within `distance` kilometer of the point, annotated
+        with `distance`. Candidate taken by epicenter grid cell with
+        index, exact distance only computed for them.
+        """
+        cells = get_cells(latitude, longitude, distance, settings.THREAT_EARTHQUAKE_CELL)
+        queryset = self.filter(earthquake__cell__in=cells)
+
+        if magnitude is not None:
+            queryset = queryset.filter(earthquake__magnitude__gte=magnitude)
+
+        return queryset \
+            .annotate(distance=get_distance(latitude, longitude, prefix='earthquake__')) \
+            .filter(distance__lte=distance)
+
+
+class HazardManager(BulkCreateReturnIdManager.from_queryset(HazardQuerySet)):
     @transaction.atomic
     def create_risk(self, objs):
         from . import HAZARD_CLASSIFY_MODEL_MAPPER
@@ -19,20 +162,24 @@ class HazardManager(BulkCreateReturnIdManager, models.Manager):
 
             if model:
                 risk_obj = model(hazard_id=obj.get('id'))
+
+                # bulk create not call `save`, earthquake cell set here
+                if hasattr(risk_obj, 'set_cell'):
+                    risk_obj.set_cell()
+
                 risk_will_create.setdefault(classify, []).append(risk_obj)
 
+        # error raised, caller transaction not keep hazard without risk
         for classify, value in risk_will_create.items():
             model = HAZARD_CLASSIFY_MODEL_MAPPER.get(classify)
             if model:
-                try:
-                    model.objects.bulk_create(value)
-                except Exception as e:
-                    print(e)
+                model.objects.bulk_create(value)
 
     @transaction.atomic
     def bulk_create_return_with_id(self, *args, **kwargs):
         created_objs = super().bulk_create_return_id(*args, **kwargs)
         self.create_risk(created_objs)
+        return created_objs
 
 
 class AbstractHazard(AbstractCommonField):
@@ -97,6 +244,13 @@ class AbstractHazard(AbstractCommonField):
 
     class Meta:
         abstract = True
+        indexes = [
+            # list filtered by `classify` and ordered by `occur_at`
+            models.Index(
+                fields=['classify', 'occur_at'],
+                name='threat_hazard_classify_idx'
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.incident
@@ -118,72 +272,84 @@ class AbstractHazard(AbstractCommonField):
 
     @property
     def activity(self):
+        # use prefetched `activities` (with `user`) when available
+        if 'activities' in getattr(self, '_prefetched_objects_cache', {}):
+            return min(self.activities.all(), key=lambda x: x.id, default=None)
         return self.activities.first()
 
     @property
     def author_name(self):
-        # when this method access set `source` to user name `activity` submitter
-        if self.activity:
-            name = self.activity.user.name
-            if not self.source:
-                self.source = name
-                self.save(update_fields=('source',))
-            return name
+        # `source` filled with this at create time, read only
+        activity = self.activity
+        if activity and activity.user:
+            return activity.user.name
         return None
 
     @property
-    def classify_display(self):
-        return self.get_classify_display()
-
-    @transaction.atomic
-    def set_impacts(self, impacts, locations_obj):
-        for index, location in enumerate(locations_obj):
-            ct = ContentType.objects.get_for_model(location)
-            impact = impacts.get(index, None)
-            impacts_obj = list()
-
-            if impact:
-                defaults = {
-                    'content_type': ct,
-                    'object_id': location.id,
-                }
+    def risk(self):
+        """Risk subtype object of this hazard, eg; `Earthquake`"""
+        from . import HAZARD_CLASSIFY_MODEL_MAPPER
 
-                for x in impact:
-                    o, _created = location.impacts.get_or_create(
-                        defaults=defaults,
-                        **x
-                    )
+        model = HAZARD_CLASSIFY_MODEL_MAPPER.get(self.classify)
+        if model is None:
+            return None
 
-                    impacts_obj.append(o)
+        try:
+            return getattr(self, model._meta.get_field('hazard').remote_field.get_accessor_name())
+        except ObjectDoesNotExist:
+            return None
 
-                if len(impacts_obj) > 0:
-                    location.impacts.set(impacts_obj)
+    @property
+    def classify_display(self):
+        return self.get_classify_display()
 
     @transaction.atomic
-    def set_locations(self, locations):
-        locations_obj = list()
-        ct = ContentType.objects.get_for_model(self)
-
-        # extract and remove `impacts` from `locations`
-        impacts = {
-            i: v for i, v in enumerate([o.pop('impacts', None) for o in locations])
-        }
-
-        defaults = {
-            'content_type': ct,
-            'object_id': self.id,
-        }
-
-        for data in locations:
-            o, _create = self.locations.update_or_create(
-                defaults=defaults,
-                **data
+    def upsert_locations(self, locations):
+        """
+        Create, update and delete `locations` and their `impacts` in bulk.
+        Item with `uuid` update the existing row or delete it when `delete`
+        is true, item without `uuid` created. Row not listed left untouched.
+        """
+        from apps.generic.search import index
+        from apps.threat.heatmap import bump_version
+
+        location_model = self.locations.model
+        impact_model = location_model._meta.get_field('impacts').related_model
+
+        # no query when already prefetched
+        existing = {x.uuid: x for x in self.locations.all()}
+        prefetch_related_objects(list(existing.values()), 'impacts')
+
+        created, updated, deleted, fields = _diff(
+            locations,
+            existing,
+            lambda data: location_model(content_object=self, **data)
+        )
+
+        for obj, _data in created + updated:
+            obj.clean_terms()
+
+        _bulk_apply(location_model, created, updated, deleted, fields)
+
+        # `impacts` diffed after new location has id
+        impacts = ([], [], [], set())
+        for obj, data in created + updated:
+            current = obj.impacts.all() if obj.uuid in existing else []
+            result = _diff(
+                data.get('impacts') or [],
+                {x.uuid: x for x in current},
+                lambda data, obj=obj: impact_model(content_object=obj, **data)
             )
 
-            locations_obj.append(o)
+            for i in range(3):
+                impacts[i].extend(result[i])
+            impacts[3].update(result[3])
+
+        _bulk_apply(impact_model, *impacts)
 
-        # `impacts` created after `locations` created
-        self.set_impacts(impacts, locations_obj)
+        # prefetched locations outdated
+        getattr(self, '_prefetched_objects_cache', {}).pop('locations', None)
 
-        # set `locations` to instance
-        self.locations.set(locations_obj)
+        # bulk query not send signal
+        index([self])
+        transaction.on_commit(bump_version)
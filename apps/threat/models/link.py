@@ -0,0 +1,38 @@
+from django.db import models
+
+
+class AbstractDisasterLink(models.Model):
+    """
+    Hazard submitted by user describing the same event as official
+    disaster, matched by time and place.
+
+    Maintained by `apps.threat.linker`, don't edit by hand.
+    """
+    hazard = models.ForeignKey(
+        'threat.Hazard',
+        related_name='disaster_links',
+        on_delete=models.CASCADE
+    )
+    disaster = models.ForeignKey(
+        'ews.Disaster',
+        related_name='hazard_links',
+        on_delete=models.CASCADE
+    )
+
+    # closest pair of their locations, kilometer
+    distance = models.FloatField()
+    # hazard `occur_at` minus disaster `occur_at`, seconds
+    lag = models.IntegerField()
+    create_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        abstract = True
+        constraints = [
+            models.UniqueConstraint(
+                fields=['hazard', 'disaster'],
+                name='threat_disaster_link_unique'
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return '{} - {}'.format(self.hazard_id, self.disaster_id)
@@ -1,6 +1,7 @@
 from core.loading import is_model_registered
 
 from .base import *
+from .link import *
 from .risk import *
 
 __all__ = list()
@@ -92,3 +93,11 @@ if not is_model_registered('threat', 'Other'):
             pass
 
     __all__.append('Other')
+
+
+if not is_model_registered('threat', 'DisasterLink'):
+    class DisasterLink(AbstractDisasterLink):
+        class Meta(AbstractDisasterLink.Meta):
+            pass
+
+    __all__.append('DisasterLink')
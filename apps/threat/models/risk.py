@@ -1,6 +1,9 @@
 from decimal import Decimal
 
 from django.db import models
+
+from apps.threat.conf import settings
+from core.geo import get_cell
 from core.models import AbstractCommonField
 
 
@@ -92,12 +95,30 @@ class AbstractEarthquake(AbstractCommonField):
     latitude = models.FloatField(default=Decimal(0.0), db_index=True)
     longitude = models.FloatField(default=Decimal(0.0), db_index=True)
 
+    # grid cell of the epicenter for `near` query, see `core.geo.get_cell`
+    cell = models.BigIntegerField(null=True, blank=True, editable=False)
+
     class Meta:
         abstract = True
+        indexes = [
+            models.Index(fields=['cell', 'magnitude'], name='threat_earthquake_cell_idx')
+        ]
 
     def __str__(self):
         return self.hazard.incident
 
+    def set_cell(self):
+        # field default is Decimal until loaded from database
+        self.cell = get_cell(
+            float(self.latitude),
+            float(self.longitude),
+            settings.THREAT_EARTHQUAKE_CELL
+        )
+
+    def save(self, *args, **kwargs):
+        self.set_cell()
+        super().save(*args, **kwargs)
+
 
 # 7
 class AbstractTsunami(AbstractCommonField):
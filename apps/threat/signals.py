@@ -1,3 +1,6 @@
+from django.db import transaction
+
+from . import heatmap
 from .models import HAZARD_CLASSIFY_MODEL_MAPPER
 
 
@@ -9,3 +12,8 @@ def create_hazard(sender, instance, created, **kwargs):
 
         if model:
             model.objects.create(hazard=instance)
+
+
+def invalidate_heatmap(sender, instance, **kwargs):
+    # after commit so locations saved later in the same request counted
+    transaction.on_commit(heatmap.bump_version)
@@ -0,0 +1,8 @@
+from celery import shared_task
+
+from .linker import link
+
+
+@shared_task
+def link_hazards():
+    return {'linked': link()}
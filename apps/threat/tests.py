@@ -1,3 +1,135 @@
-from django.test import TestCase
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
 
-# Create your tests here.
+from apps.threat.api.v1.hazard.serializers import CreateHazardSerializer, UpdateHazardSerializer
+
+Hazard = apps.get_registered_model('threat', 'Hazard')
+Attachment = apps.get_registered_model('generic', 'Attachment')
+Activity = apps.get_registered_model('generic', 'Activity')
+
+
+class HazardAttachmentTestCase(TestCase):
+    def setUp(self):
+        UserModel = get_user_model()
+        self.owner = UserModel.objects.create_user(
+            username='owner', email='owner@example.com', password='secret'
+        )
+        self.other = UserModel.objects.create_user(
+            username='other', email='other@example.com', password='secret'
+        )
+
+        # content type cached, not counted below
+        ContentType.objects.get_for_model(Attachment)
+        ContentType.objects.get_for_model(Hazard)
+
+    def make_attachments(self, user, count):
+        objs = [Attachment.objects.create(name='file-%s' % i) for i in range(count)]
+        Activity.objects.bulk_create([
+            Activity(user=user, content_object=x, identifier='generic_attachment')
+            for x in objs
+        ])
+        return objs
+
+    def get_context(self, user):
+        request = RequestFactory().post('/')
+        request.user = user
+        return {'request': request}
+
+    def get_create_queries(self, attachments):
+        serializer = CreateHazardSerializer(
+            data={
+                'incident': 'banjir',
+                'occur_at': '2021-01-01 06:00:00',
+                'attachments': [str(x.uuid) for x in attachments],
+            },
+            context=self.get_context(self.owner)
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            instance = serializer.save()
+
+        self.assertEqual(instance.attachments.count(), len(attachments))
+        return len(ctx.captured_queries)
+
+    def get_update_queries(self, instance, attachments, remove_attachments):
+        serializer = UpdateHazardSerializer(
+            instance=instance,
+            data={
+                'attachments': [str(x.uuid) for x in attachments],
+                'remove_attachments': [str(x.uuid) for x in remove_attachments],
+            },
+            partial=True,
+            context=self.get_context(self.owner)
+        )
+        serializer.is_valid(raise_exception=True)
+
+        with CaptureQueriesContext(connection) as ctx:
+            serializer.save()
+        return len(ctx.captured_queries)
+
+    def test_attachment_map_one_query(self):
+        attachments = self.make_attachments(self.owner, 10)
+        serializer = CreateHazardSerializer(context=self.get_context(self.owner))
+
+        with self.assertNumQueries(1):
+            attachment_map = serializer.get_attachment_map([x.uuid for x in attachments])
+
+        self.assertEqual(set(attachment_map), {x.uuid for x in attachments})
+
+    def test_attachment_map_only_owned(self):
+        owned = self.make_attachments(self.owner, 2)
+        others = self.make_attachments(self.other, 2)
+        serializer = CreateHazardSerializer(context=self.get_context(self.owner))
+
+        attachment_map = serializer.get_attachment_map([x.uuid for x in owned + others])
+        self.assertEqual(set(attachment_map), {x.uuid for x in owned})
+
+    def test_create_queries_not_grow(self):
+        few = self.get_create_queries(self.make_attachments(self.owner, 2))
+        many = self.get_create_queries(self.make_attachments(self.owner, 25))
+        self.assertEqual(few, many)
+
+    def test_create_drop_other_user_attachment(self):
+        owned = self.make_attachments(self.owner, 2)
+        others = self.make_attachments(self.other, 2)
+
+        serializer = CreateHazardSerializer(
+            data={
+                'incident': 'banjir',
+                'occur_at': '2021-01-01 06:00:00',
+                'attachments': [str(x.uuid) for x in owned + others],
+            },
+            context=self.get_context(self.owner)
+        )
+        serializer.is_valid(raise_exception=True)
+        instance = serializer.save()
+
+        self.assertEqual(
+            set(instance.attachments.values_list('uuid', flat=True)),
+            {x.uuid for x in owned}
+        )
+        self.assertFalse(
+            Attachment.objects.filter(id__in=[x.id for x in others], object_id__isnull=False).exists()
+        )
+
+    def test_update_queries_not_grow(self):
+        instance = Hazard.objects.create(incident='banjir', occur_at='2021-01-01T06:00:00Z')
+        linked = self.make_attachments(self.owner, 27)
+        self.get_update_queries(instance, linked, [])
+
+        few = self.get_update_queries(instance, self.make_attachments(self.owner, 2), linked[:2])
+        many = self.get_update_queries(instance, self.make_attachments(self.owner, 25), linked[2:])
+        self.assertEqual(few, many)
+        self.assertEqual(instance.attachments.count(), 27)
+
+    def test_update_ignore_other_user_attachment(self):
+        instance = Hazard.objects.create(incident='banjir', occur_at='2021-01-01T06:00:00Z')
+        others = self.make_attachments(self.other, 2)
+
+        self.get_update_queries(instance, others, [])
+        self.assertEqual(instance.attachments.count(), 0)
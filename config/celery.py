@@ -6,6 +6,8 @@ from celery import Celery
 from celery.schedules import crontab
 from django.conf import settings
 
+from apps.ews.scheduler import adaptive
+
 # set the default Django settings module for the 'celery' program.
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 os.environ.setdefault('FORKED_BY_MULTIPROCESSING', '1')
@@ -31,32 +33,60 @@ def debug_task(self):
 
 app.conf.beat_schedule = {
     # Scheduler Name
-    'scraping-bnbp-dipi-each-4-hours': {
+    'scraping-bnbp-dipi-adaptive': {
         # Task Name (Name Specified in Decorator)
         'task': 'scraping_bnpb_dipi',
-        # Schedule
-        'schedule': crontab(minute=0, hour='*/4'),
+        # Schedule, interval follow new event found (see EWS_POLL_SOURCES)
+        'schedule': adaptive('bnpb-dipi'),
     },
 
-    'scraping-bmkg-quake-each-20-minutes': {
+    'scraping-bmkg-quake-adaptive': {
         # Task Name (Name Specified in Decorator)
         'task': 'scraping_bmkg_quake',
-        # Schedule
-        'schedule': crontab(minute='*/20'),
+        # Schedule, interval follow new event found (see EWS_POLL_SOURCES)
+        'schedule': adaptive('bmkg-tews-feel'),
     },
 
-    'scraping-bmkg-quake-recent-each-10-minutes': {
+    'scraping-bmkg-quake-recent-adaptive': {
         # Task Name (Name Specified in Decorator)
         'task': 'scraping_bmkg_quake_recent',
-        # Schedule
-        'schedule': crontab(minute='*/10'),
+        # Schedule, interval follow new event found (see EWS_POLL_SOURCES)
+        'schedule': adaptive('bmkg-tews-recent'),
     },
 
-    'scraping-bmkg-quake-realtime-each-5-minutes': {
+    'scraping-bmkg-quake-realtime-adaptive': {
         # Task Name (Name Specified in Decorator)
         'task': 'scraping_bmkg_quake_realtime',
+        # Schedule, interval follow new event found (see EWS_POLL_SOURCES)
+        'schedule': adaptive('bmkg-realtime'),
+    },
+
+    'scraping-bmkg-forecast-each-6-hours': {
+        # Task Name (Name Specified in Decorator)
+        'task': 'scraping_bmkg_forecast',
         # Schedule
-        'schedule': crontab(minute='*/5'),
+        'schedule': crontab(minute=30, hour='*/6'),
+    },
+
+    'rebuild-disaster-summary-nightly': {
+        # Task Name (Name Specified in Decorator)
+        'task': 'rebuild_disaster_summary',
+        # Schedule, fix drift from admin edit and deleted disaster
+        'schedule': crontab(minute=15, hour=2),
+    },
+
+    'collect-blob-garbage-nightly': {
+        # Task Name (Name Specified in Decorator)
+        'task': 'apps.generic.tasks.collect_blob_garbage',
+        # Schedule, remove attachment file nobody use
+        'schedule': crontab(minute=45, hour=3),
+    },
+
+    'link-hazards-each-15-minutes': {
+        # Task Name (Name Specified in Decorator)
+        'task': 'apps.threat.tasks.link_hazards',
+        # Schedule, only new hazard and disaster since last run
+        'schedule': crontab(minute='*/15'),
     },
 }
 
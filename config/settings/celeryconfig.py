@@ -1,6 +1,55 @@
 from django.conf import settings
+from kombu import Queue
 
 broker_url = settings.REDIS_URL
-broker_transport_options = {'visibility_timeout': 3600}
+broker_transport_options = {
+    'visibility_timeout': 3600,
+    # redis emulate priority with one list per step, 0 is highest
+    'priority_steps': list(range(10)),
+    'queue_order_strategy': 'priority',
+}
 result_backend = settings.REDIS_URL
 task_serializer = 'json'
+
+# Queues
+# burst of notification or bulk scraping must not delay realtime scraping,
+# run one worker per queue with their own concurrency, eg;
+#   celery -A config worker -Q ews-realtime -c 2 -O fair -n realtime@%h
+#   celery -A config worker -Q ews-bulk -c 2 -n bulk@%h
+#   celery -A config worker -Q notifications -c 8 -n notifications@%h
+#   celery -A config worker -Q auth-otp -c 2 -O fair -n otp@%h
+#   celery -A config worker -Q default -c 2 -n default@%h
+task_default_queue = 'default'
+task_default_priority = 5
+task_queue_max_priority = 10
+task_queues = (
+    Queue('default'),
+    Queue('ews-realtime'),
+    Queue('ews-bulk'),
+    Queue('notifications'),
+    Queue('auth-otp'),
+)
+task_routes = {
+    'scraping_bmkg_quake_realtime': {'queue': 'ews-realtime', 'priority': 0},
+    'scraping_bmkg_quake_recent': {'queue': 'ews-realtime', 'priority': 1},
+    'scraping_bmkg_quake': {'queue': 'ews-realtime', 'priority': 2},
+    'reconcile_bmkg_quake': {'queue': 'ews-realtime', 'priority': 3},
+    'process_shakemap': {'queue': 'ews-bulk', 'priority': 3},
+    'scraping_bnpb_dipi': {'queue': 'ews-bulk', 'priority': 5},
+    'scraping_bmkg_forecast': {'queue': 'ews-bulk', 'priority': 7},
+    'dedupe_disaster': {'queue': 'ews-bulk', 'priority': 7},
+    'rebuild_disaster_summary': {'queue': 'ews-bulk', 'priority': 9},
+    'backfill_dibi_partition': {'queue': 'ews-bulk', 'priority': 9},
+    'backfill_dibi_pages': {'queue': 'ews-bulk', 'priority': 9},
+    'backfill_dibi_done': {'queue': 'ews-bulk', 'priority': 9},
+    'apps.person.tasks.send_securecode_email': {'queue': 'auth-otp', 'priority': 0},
+    'apps.person.tasks.send_securecode_msisdn': {'queue': 'auth-otp', 'priority': 0},
+    'apps.notifier.tasks.send_notification': {'queue': 'notifications', 'priority': 5},
+    'apps.generic.tasks.collect_blob_garbage': {'queue': 'default', 'priority': 9},
+    'apps.threat.tasks.link_hazards': {'queue': 'default', 'priority': 7},
+}
+
+# worker take one task at a time so long task not hold
+# reserved realtime task, and task not lost when worker killed
+worker_prefetch_multiplier = 1
+task_acks_late = True
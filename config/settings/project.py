@@ -168,6 +168,14 @@ CACHES = {
 }
 
 
+# INSTRUMENTATION
+# scraping task timing and counter exposed at /metrics
+# for staff or `Authorization: Bearer <token>`, public only when opt in
+INSTRUMENTATION_ENABLED = True
+INSTRUMENTATION_TOKEN = None
+INSTRUMENTATION_PUBLIC = False
+
+
 # Static files (CSS, JavaScript, Images)
 # ------------------------------------------------------------------------------
 # https://docs.djangoproject.com/en/2.2/howto/static-files/
@@ -4,10 +4,12 @@ from django.conf import settings
 from django.conf.urls.static import static
 
 from api import routers as api_routers
+from api.views import MetricsView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/', include(api_routers)),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -97,6 +97,7 @@ class DamageMetric(models.TextChoices):
     DAM102 = '102', _("Unit")
     DAM103 = '103', _("Kilometer")
     DAM104 = '104', _("Rupiah")
+    DAM105 = '105', _("Juta Rupiah")
     DAM999 = '999', _("Lainnya")
 
 
@@ -112,3 +113,10 @@ class ReactionIdentifier(models.TextChoices):
     REI104 = '104', _("Love")
     REI105 = '105', _("Insightful")
     REI106 = '106', _("Curious")
+
+
+class AreaLevel(models.TextChoices):
+    ARL101 = '101', _("Provinsi")
+    ARL102 = '102', _("Kabupaten/Kota")
+    ARL103 = '103', _("Kecamatan")
+    ARL104 = '104', _("Desa/Kelurahan")
@@ -0,0 +1,64 @@
+import math
+
+EARTH_RADIUS = 6371.0  # kilometer
+KM_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+
+
+def to_float(value, default=None):
+    """Coordinates and magnitudes scraped as string, make sure it float"""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Great circle distance between two points in kilometer"""
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+
+    a = math.sin(dlat / 2) ** 2 \
+        + math.cos(lat1) * math.cos(lat2) * math.sin(dlon / 2) ** 2
+
+    return 2 * EARTH_RADIUS * math.asin(math.sqrt(a))
+
+
+def get_cell(latitude, longitude, size):
+    """
+    Grid cell number of a point, grid of `size` degree square cell
+    numbered row by row from south west.
+    """
+    cols = int(math.ceil(360 / size))
+    row = int((latitude + 90) // size)
+    col = int((longitude + 180) // size) % cols
+    return row * cols + col
+
+
+def get_bbox(latitude, longitude, km):
+    """(south, west, north, east) box containing circle of `km` radius"""
+    lat = km / KM_PER_DEGREE
+    south = max(latitude - lat, -90.0)
+    north = min(latitude + lat, 90.0)
+
+    # longitude degree shrink to the pole, use the widest latitude
+    widest = max(abs(south), abs(north))
+    if widest >= 90:
+        return south, -180.0, north, 180.0
+
+    lon = min(lat / math.cos(math.radians(widest)), 180.0)
+    return south, longitude - lon, north, longitude + lon
+
+
+def get_cells(latitude, longitude, km, size):
+    """All cell number touched by circle of `km` radius, wrap at antimeridian"""
+    south, west, north, east = get_bbox(latitude, longitude, km)
+    cols = int(math.ceil(360 / size))
+    rows = range(int((south + 90) // size), int((north + 90) // size) + 1)
+
+    first = int((west + 180) // size)
+    last = int((east + 180) // size)
+    columns = range(cols) if last - first + 1 >= cols \
+        else {x % cols for x in range(first, last + 1)}
+
+    return sorted(row * cols + col for row in rows for col in columns)
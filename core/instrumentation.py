@@ -0,0 +1,173 @@
+"""
+Lightweight timing and counter for scraping tasks.
+
+    with collect(task='scraping_bmkg_quake') as metrics:
+        with span('fetch'):
+            requests.get(...)
+        incr('rows_created', 10)
+
+    metrics.snapshot()
+    >>> {'stage_seconds{stage="fetch",task="scraping_bmkg_quake"}': 0.21, ...}
+
+Span and counter outside `collect()` do nothing, so scraper called
+from API view not pay anything. When `collect()` finish the values
+added to shared cache, read by `/metrics` as Prometheus text.
+"""
+import threading
+import time
+
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+
+PREFIX = 'mitigasi_'
+CACHE_KEY = 'instrumentation:%s'
+# append only index, number of slot and sample name of each slot
+INDEX_KEY = 'instrumentation:index'
+SLOT_KEY = 'instrumentation:index:%s'
+
+# cache only increment integer, value saved in micro unit
+SCALE = 1000000
+
+_local = threading.local()
+
+
+def is_enabled():
+    return getattr(settings, 'INSTRUMENTATION_ENABLED', True)
+
+
+def sample(name, labels):
+    """`stage_seconds`, {'stage': 'fetch'} -> `stage_seconds{stage="fetch"}`"""
+    if not labels:
+        return name
+
+    return '%s{%s}' % (name, ','.join(
+        '%s="%s"' % (k, str(labels[k]).replace('"', '\\"'))
+        for k in sorted(labels)
+    ))
+
+
+class Collector:
+    def __init__(self, **labels):
+        self.labels = labels
+        self.values = defaultdict(float)
+
+    def add(self, name, value, labels):
+        self.values[sample(name, {**self.labels, **labels})] += value
+
+    def snapshot(self):
+        return {k: round(v, 6) for k, v in self.values.items()}
+
+
+def _current():
+    stack = getattr(_local, 'stack', None)
+    return stack[-1] if stack else None
+
+
+@contextmanager
+def collect(**labels):
+    """Collect span and counter in this block, labels added to all"""
+    collector = Collector(**labels)
+
+    if not is_enabled():
+        yield collector
+        return
+
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = list()
+
+    stack.append(collector)
+    try:
+        yield collector
+    finally:
+        stack.pop()
+        publish(collector.values)
+
+
+@contextmanager
+def span(stage, **labels):
+    collector = _current()
+    if collector is None:
+        yield
+        return
+
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        labels['stage'] = stage
+        collector.add('stage_seconds', time.perf_counter() - start, labels)
+        collector.add('stage_calls', 1, labels)
+
+
+def incr(name, value=1, **labels):
+    collector = _current()
+    if collector is not None:
+        collector.add(name, value, labels)
+
+
+def publish(values):
+    """Add values to shared cache so all process (web and worker) counted"""
+    if not values:
+        return
+
+    for key, value in values.items():
+        cache_key = CACHE_KEY % key
+        # add is atomic, only the first process append new sample
+        if cache.add(cache_key, 0, None):
+            append(key)
+
+        try:
+            cache.incr(cache_key, int(value * SCALE))
+        except ValueError:
+            # removed between add and incr
+            cache.set(cache_key, int(value * SCALE), None)
+
+
+def append(key):
+    cache.add(INDEX_KEY, 0, None)
+    try:
+        slot = cache.incr(INDEX_KEY)
+    except ValueError:
+        # removed between add and incr
+        slot = 1
+        cache.set(INDEX_KEY, slot, None)
+    cache.set(SLOT_KEY % slot, key, None)
+
+
+def get_index():
+    """Sample names published, slot appended twice when value evicted"""
+    size = cache.get(INDEX_KEY) or 0
+    slots = cache.get_many([SLOT_KEY % x for x in range(1, size + 1)])
+    return set(slots.values())
+
+
+def render():
+    """All published values as Prometheus text exposition"""
+    # samples of one metric must be grouped under their TYPE line
+    keys = sorted(get_index(), key=lambda x: (x.partition('{')[0], x))
+    values = cache.get_many([CACHE_KEY % x for x in keys])
+    lines = list()
+    typed = set()
+
+    for key in keys:
+        value = values.get(CACHE_KEY % key)
+        if value is None:
+            continue
+
+        name, _, labels = key.partition('{')
+        name = '%s%s_total' % (PREFIX, name)
+        if name not in typed:
+            typed.add(name)
+            lines.append('# TYPE %s counter' % name)
+
+        lines.append('%s%s %s' % (
+            name,
+            '{' + labels if labels else '',
+            repr(value / SCALE)
+        ))
+
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,95 @@
+import re
+
+from functools import lru_cache
+
+# administrative prefix, full word from user input and
+# abbreviation from BMKG `Dirasakan`
+AREA_WORDS = ['Desa', 'Kelurahan', 'Kecamatan', 'Kabupaten', 'Provinsi']
+AREA_ABBREVIATIONS = ['Des', 'Kel', 'Kec', 'Kab']
+
+AREA_PREFIX_RE = re.compile(
+    r'\b(?:%s)\b|\b(?:%s)\.' % (
+        '|'.join(AREA_WORDS),
+        '|'.join(AREA_ABBREVIATIONS)
+    )
+)
+SPACE_RE = re.compile(r'\s+')
+
+# `III-IV Bandung, II - III Kab. Garut, II Kec. Cilacap`
+FELT_SPLIT_RE = re.compile(r'\s*,\s*')
+FELT_RE = re.compile(
+    r'^(?P<mmi>[IVX]+(?:\s*-\s*[IVX]+)?)\s+(?P<name>.*)$'
+)
+MMI_RE = re.compile(r'^([IVX]+)(?:\s*-\s*([IVX]+))?$')
+
+ROMAN = {
+    'I': 1, 'II': 2, 'III': 3, 'IV': 4, 'V': 5, 'VI': 6,
+    'VII': 7, 'VIII': 8, 'IX': 9, 'X': 10, 'XI': 11, 'XII': 12,
+}
+
+AREA_FIELDS = (
+    'administrative_area',
+    'sub_administrative_area',
+    'locality',
+    'sub_locality',
+)
+
+
+@lru_cache(maxsize=4096)
+def clean_area(value):
+    """`Kab. Garut ` -> `Garut`"""
+    if not value:
+        return value
+    return SPACE_RE.sub(' ', AREA_PREFIX_RE.sub('', value)).strip()
+
+
+@lru_cache(maxsize=256)
+def parse_mmi(value):
+    """`III-IV` -> (3, 4), `II` -> (2, 2), unknown -> (None, None)"""
+    match = MMI_RE.match((value or '').strip().upper())
+    if not match:
+        return (None, None)
+
+    low = ROMAN.get(match.group(1))
+    high = ROMAN.get(match.group(2) or match.group(1))
+    if low is None or high is None:
+        return (None, None)
+
+    return (min(low, high), max(low, high))
+
+
+def parse_felt(value):
+    """
+    Split BMKG felt area to list of (severity, name, mmi_min, mmi_max),
+    severity kept as written but without space around `-`.
+    """
+    result = list()
+
+    for item in FELT_SPLIT_RE.split((value or '').strip()):
+        if not item:
+            continue
+
+        match = FELT_RE.match(item)
+        if match:
+            severity = SPACE_RE.sub('', match.group('mmi'))
+            name = match.group('name')
+        else:
+            severity, name = None, item
+
+        name = clean_area(name)
+        if not name:
+            continue
+
+        result.append((severity, name, *parse_mmi(severity)))
+
+    return result
+
+
+def clean_location(obj):
+    """Remove administrative prefix from location area fields"""
+    for field in AREA_FIELDS:
+        value = getattr(obj, field, None)
+        if value:
+            setattr(obj, field, clean_area(value))
+
+    return obj